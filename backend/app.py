@@ -1,13 +1,23 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from sqlalchemy import text
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as StageTimeoutError
+from datetime import datetime, timedelta
+import collections
+import json
 import os
 import sys
 import threading
+import time
 import atexit
 from dotenv import load_dotenv
+from inference_worker import is_inference_child
+import stage_limits
+from review_pagination import (
+    REVIEW_PAGE_INDEXES, SENTIMENTS, backfill_created_at, decode_cursor, page_conditions, page_order, parse_date_bound,
+    split_page
+)
 
 # Load environment variables first
 load_dotenv()
@@ -45,7 +55,7 @@ def log_all_requests_early():
 # Import AI modules with error handling
 # Don't exit on import errors - allow app to start and handle errors at request time
 try:
-    from sentiment_analyzer import analyze_sentiment
+    from sentiment_analyzer import analyze_sentiment, analyze_sentiment_batch, analyze_sentiment_fast
     print("[INFO] Sentiment analyzer module loaded successfully")
 except Exception as e:
     print(f"[ERROR] Failed to load sentiment_analyzer module: {e}")
@@ -54,10 +64,15 @@ except Exception as e:
     # Don't exit - create a fallback function instead
     def analyze_sentiment(text):
         print("[WARNING] Using fallback sentiment analysis")
-        return {'label': 'neutral', 'score': 0.5}
+        return {'label': 'neutral', 'score': 0.5, 'tier': 'fallback'}
+    
+    analyze_sentiment_fast = analyze_sentiment
+    
+    def analyze_sentiment_batch(texts):
+        return [analyze_sentiment(text) for text in texts]
 
 try:
-    from key_points_extractor import extract_key_points
+    from key_points_extractor import extract_key_points, extract_key_points_batch, extract_key_points_local, stream_key_points
     print("[INFO] Key points extractor module loaded successfully")
 except Exception as e:
     print(f"[ERROR] Failed to load key_points_extractor module: {e}")
@@ -67,6 +82,14 @@ except Exception as e:
     def extract_key_points(text):
         print("[WARNING] Using fallback key points extraction")
         return "Poin penting tidak dapat diekstrak"
+    
+    extract_key_points_local = extract_key_points
+    
+    def extract_key_points_batch(texts):
+        return [extract_key_points(text) for text in texts]
+    
+    def stream_key_points(text):
+        yield extract_key_points(text)
 
 # CORS configuration - allow Vercel, Render, and local development
 allowed_origins_env = os.getenv('ALLOWED_ORIGINS', '')
@@ -267,12 +290,19 @@ db = SQLAlchemy(app)
 
 # Database Model
 class Review(db.Model):
+    # Keyset pagination of /api/reviews (see review_pagination.py)
+    __table_args__ = tuple(db.Index(name, *columns) for name, columns in REVIEW_PAGE_INDEXES)
     id = db.Column(db.Integer, primary_key=True)
     review_text = db.Column(db.Text, nullable=False)
     sentiment = db.Column(db.String(20), nullable=False)
     sentiment_score = db.Column(db.Float, nullable=True)
+    # Which tier labeled the review: 'transformer', 'fast' or 'fallback' (None for old rows)
+    sentiment_tier = db.Column(db.String(20), nullable=True)
     key_points = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # 'pending' while deferred key points are being extracted (see key_point_enrichment.py)
+    key_points_status = db.Column(db.String(20), nullable=True, default='done')
+    # NOT NULL: /api/reviews pages on (created_at, id)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     def to_dict(self):
         return {
@@ -280,11 +310,356 @@ class Review(db.Model):
             'review_text': self.review_text,
             'sentiment': self.sentiment,
             'sentiment_score': self.sentiment_score,
+            'sentiment_tier': self.sentiment_tier,
             'key_points': self.key_points,
+            'key_points_status': self.key_points_status or 'done',
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
 
+class ProviderRateLimit(db.Model):
+    """Token bucket state of the provider rate limiter (see rate_limiter.py)"""
+    __tablename__ = 'provider_rate_limit'
+    key = db.Column(db.String(160), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)  # epoch seconds
+
+
+class DatabaseRateLimitStore:
+    """
+    Keeps the provider token buckets in the database so they survive restarts
+    and are shared by all gunicorn workers. Each sync merges one process's
+    consumption into the stored bucket under a row lock.
+    """
+    
+    def sync(self, key, capacity, refill_per_second, consumed, now):
+        with app.app_context():
+            try:
+                row = db.session.query(ProviderRateLimit).filter_by(key=key).with_for_update().first()
+                if row is None:
+                    row = ProviderRateLimit(key=key, tokens=capacity, updated_at=now)
+                    db.session.add(row)
+                    if ':quota:' in key:
+                        # A new quota day started - drop counters older than a few days
+                        db.session.query(ProviderRateLimit).filter(
+                            ProviderRateLimit.key.like('%:quota:%'),
+                            ProviderRateLimit.updated_at < now - 3 * 86400
+                        ).delete(synchronize_session=False)
+                elif refill_per_second > 0:
+                    row.tokens = min(capacity, row.tokens + max(0.0, now - row.updated_at) * refill_per_second)
+                # Workers may overspend a little between syncs; negative tokens pay it back
+                row.tokens = max(row.tokens - consumed, -capacity)
+                row.updated_at = now
+                db.session.commit()
+                return row.tokens
+            except Exception:
+                db.session.rollback()
+                raise
+
+
+class KeyPointCacheEntry(db.Model):
+    """Provider key point answer, keyed on normalized text + provider + prompt version"""
+    __tablename__ = 'key_point_cache'
+    cache_key = db.Column(db.String(64), primary_key=True)
+    provider = db.Column(db.String(40), nullable=False)
+    prompt_version = db.Column(db.String(20), nullable=False)
+    key_points = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+class DatabaseKeyPointStore:
+    """Level 2 of the key point cache (see key_point_cache.py)"""
+    
+    def get_many(self, cache_keys, max_age_seconds):
+        with app.app_context():
+            query = db.session.query(KeyPointCacheEntry.cache_key, KeyPointCacheEntry.key_points).filter(
+                KeyPointCacheEntry.cache_key.in_(cache_keys)
+            )
+            if max_age_seconds > 0:
+                query = query.filter(KeyPointCacheEntry.created_at >= datetime.utcnow() - timedelta(seconds=max_age_seconds))
+            return {row[0]: row[1] for row in query.all()}
+    
+    def put(self, cache_key, provider, prompt_version, key_points):
+        with app.app_context():
+            try:
+                db.session.merge(KeyPointCacheEntry(
+                    cache_key=cache_key,
+                    provider=provider,
+                    prompt_version=prompt_version,
+                    key_points=key_points,
+                    created_at=datetime.utcnow()
+                ))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+    
+    def prune(self, max_rows, max_age_seconds):
+        """Drop expired entries, then the oldest ones beyond max_rows"""
+        with app.app_context():
+            try:
+                if max_age_seconds > 0:
+                    KeyPointCacheEntry.query.filter(
+                        KeyPointCacheEntry.created_at < datetime.utcnow() - timedelta(seconds=max_age_seconds)
+                    ).delete(synchronize_session=False)
+                cutoff = db.session.query(KeyPointCacheEntry.created_at).order_by(
+                    KeyPointCacheEntry.created_at.desc()
+                ).offset(max_rows).limit(1).scalar()
+                if cutoff is not None:
+                    KeyPointCacheEntry.query.filter(
+                        KeyPointCacheEntry.created_at <= cutoff
+                    ).delete(synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+
+class KeyPointJob(db.Model):
+    """Pending deferred key point extraction of a review (see key_point_enrichment.py)"""
+    __tablename__ = 'key_point_job'
+    review_id = db.Column(db.Integer, primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    worker_id = db.Column(db.String(40), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+
+class DatabaseEnrichmentStore:
+    """
+    Job queue of the key point enricher. Claiming a job pushes its
+    next_attempt_at out by the lease, so it's retried if the worker dies.
+    """
+
+    def claim_jobs(self, worker_id, limit, lease):
+        with app.app_context():
+            try:
+                now = datetime.utcnow()
+                due = db.session.query(KeyPointJob.review_id).filter(
+                    KeyPointJob.next_attempt_at <= now
+                ).order_by(KeyPointJob.next_attempt_at).limit(limit).with_for_update(skip_locked=True).all()
+                if not due:
+                    db.session.rollback()
+                    return []
+                # The next_attempt_at condition makes the claim safe without row locks (SQLite)
+                token = f"{worker_id}:{now.timestamp()}"[:40]
+                KeyPointJob.query.filter(
+                    KeyPointJob.review_id.in_([row[0] for row in due]),
+                    KeyPointJob.next_attempt_at <= now
+                ).update({
+                    'worker_id': token,
+                    'attempts': KeyPointJob.attempts + 1,
+                    'next_attempt_at': now + timedelta(seconds=lease)
+                }, synchronize_session=False)
+                db.session.commit()
+                rows = db.session.query(KeyPointJob.review_id, KeyPointJob.attempts, Review.review_text).outerjoin(
+                    Review, Review.id == KeyPointJob.review_id
+                ).filter(KeyPointJob.worker_id == token).all()
+                orphans = [review_id for review_id, _, review_text in rows if review_text is None]
+                if orphans:
+                    # Review was deleted while pending
+                    KeyPointJob.query.filter(KeyPointJob.review_id.in_(orphans)).delete(synchronize_session=False)
+                    db.session.commit()
+                return [
+                    {'review_id': review_id, 'attempts': attempts, 'review_text': review_text}
+                    for review_id, attempts, review_text in rows if review_text is not None
+                ]
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def complete(self, review_id, key_points):
+        """Store the key points and drop the job in one transaction"""
+        with app.app_context():
+            try:
+                Review.query.filter_by(id=review_id).update({
+                    'key_points': key_points,
+                    'key_points_status': 'done'
+                }, synchronize_session=False)
+                KeyPointJob.query.filter_by(review_id=review_id).delete(synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def retry(self, review_id, delay, error):
+        with app.app_context():
+            try:
+                KeyPointJob.query.filter_by(review_id=review_id).update({
+                    'worker_id': None,
+                    'next_attempt_at': datetime.utcnow() + timedelta(seconds=delay),
+                    'error': error
+                }, synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+
+class IngestJob(db.Model):
+    """Review file ingestion job (see ingest_jobs.py)"""
+    __tablename__ = 'ingest_job'
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued/running/completed/failed
+    filename = db.Column(db.String(255), nullable=True)
+    file_path = db.Column(db.String(500), nullable=False)
+    file_format = db.Column(db.String(10), nullable=False)
+    text_field = db.Column(db.String(100), nullable=True)
+    rows_total = db.Column(db.Integer, nullable=True)  # estimate from the upload's line count
+    rows_processed = db.Column(db.Integer, nullable=False, default=0)  # committed rows, the resume point
+    rows_failed = db.Column(db.Integer, nullable=False, default=0)
+    reviews_created = db.Column(db.Integer, nullable=False, default=0)
+    rows_at_start = db.Column(db.Integer, nullable=False, default=0)  # rows_processed when the current run started
+    worker_id = db.Column(db.String(40), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)  # start of the current run
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        elapsed = None
+        throughput = None
+        eta_seconds = None
+        if self.started_at:
+            elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+            done_this_run = self.rows_processed - self.rows_at_start
+            if elapsed > 0 and done_this_run > 0:
+                throughput = done_this_run / elapsed
+        if self.status == 'completed':
+            eta_seconds = 0
+        elif throughput and self.rows_total:
+            eta_seconds = round(max(0, self.rows_total - self.rows_processed) / throughput)
+        progress = None
+        if self.status == 'completed':
+            progress = 100.0
+        elif self.rows_total:
+            progress = round(min(99.9, self.rows_processed * 100.0 / self.rows_total), 1)
+        return {
+            'id': self.id,
+            'status': self.status,
+            'filename': self.filename,
+            'format': self.file_format,
+            'rows_total': self.rows_total,
+            'rows_processed': self.rows_processed,
+            'rows_failed': self.rows_failed,
+            'reviews_created': self.reviews_created,
+            'progress_percent': progress,
+            'throughput_rows_per_s': round(throughput, 2) if throughput else None,
+            'eta_seconds': eta_seconds,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class DatabaseIngestStore:
+    """
+    Job queue of the ingest runner. A job is claimed with a conditional
+    UPDATE, so only one worker gets it; a running job whose heartbeat is
+    older than stale_after is up for grabs again (its worker died).
+    """
+
+    def _job_dict(self, job):
+        return {
+            'id': job.id,
+            'file_path': job.file_path,
+            'file_format': job.file_format,
+            'text_field': job.text_field,
+            'rows_processed': job.rows_processed
+        }
+
+    def claim_job(self, worker_id, stale_after):
+        with app.app_context():
+            try:
+                now = datetime.utcnow()
+                claimable = db.or_(
+                    IngestJob.status == 'queued',
+                    db.and_(IngestJob.status == 'running', IngestJob.heartbeat_at < now - timedelta(seconds=stale_after))
+                )
+                candidates = db.session.query(IngestJob.id, IngestJob.worker_id).filter(claimable).order_by(
+                    IngestJob.id
+                ).limit(5).all()
+                for job_id, previous_worker in candidates:
+                    claimed = IngestJob.query.filter(IngestJob.id == job_id, claimable).filter(
+                        IngestJob.worker_id.is_(None) if previous_worker is None else IngestJob.worker_id == previous_worker
+                    ).update({
+                        'status': 'running',
+                        'worker_id': worker_id,
+                        'heartbeat_at': now,
+                        'started_at': now,
+                        'rows_at_start': IngestJob.rows_processed
+                    }, synchronize_session=False)
+                    db.session.commit()
+                    if claimed:
+                        return self._job_dict(db.session.get(IngestJob, job_id))
+                return None
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def heartbeat(self, job_id, worker_id):
+        with app.app_context():
+            try:
+                updated = IngestJob.query.filter_by(id=job_id, worker_id=worker_id, status='running').update(
+                    {'heartbeat_at': datetime.utcnow()}, synchronize_session=False
+                )
+                db.session.commit()
+                return updated == 1
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def commit_chunk(self, job_id, worker_id, rows, processed, failed):
+        """Bulk insert one chunk's reviews and advance the job in the same transaction"""
+        with app.app_context():
+            try:
+                updated = IngestJob.query.filter_by(id=job_id, worker_id=worker_id, status='running').update({
+                    'rows_processed': IngestJob.rows_processed + processed,
+                    'rows_failed': IngestJob.rows_failed + failed,
+                    'reviews_created': IngestJob.reviews_created + len(rows),
+                    'heartbeat_at': datetime.utcnow()
+                }, synchronize_session=False)
+                if updated != 1:
+                    db.session.rollback()
+                    return False
+                if rows:
+                    now = datetime.utcnow()
+                    db.session.execute(db.insert(Review), [dict(row, created_at=now) for row in rows])
+                db.session.commit()
+                return True
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def release_job(self, job_id, worker_id):
+        """Hand a running job back to the queue (its worker is shutting down)"""
+        with app.app_context():
+            try:
+                IngestJob.query.filter_by(id=job_id, worker_id=worker_id, status='running').update({
+                    'status': 'queued',
+                    'worker_id': None
+                }, synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def finish_job(self, job_id, worker_id, status, error=None):
+        with app.app_context():
+            try:
+                IngestJob.query.filter_by(id=job_id, worker_id=worker_id).update({
+                    'status': status,
+                    'error': error,
+                    'finished_at': datetime.utcnow()
+                }, synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+
 # Create tables - wrap in try-except to prevent crash
 try:
     with app.app_context():
@@ -303,11 +678,231 @@ try:
         except Exception as table_error:
             print(f"[WARNING] Could not create tables: {table_error}")
             print("[INFO] Tables may already exist")
+        
+        # Columns added after the first release (create_all doesn't alter existing tables)
+        try:
+            review_columns = {column['name'] for column in db.inspect(db.engine).get_columns('review')}
+            if_not_exists = 'IF NOT EXISTS ' if db.engine.dialect.name == 'postgresql' else ''
+            for column_name in ('key_points_status', 'sentiment_tier'):
+                if column_name not in review_columns:
+                    db.session.execute(text(f"ALTER TABLE review ADD COLUMN {if_not_exists}{column_name} VARCHAR(20)"))
+                    db.session.commit()
+                    print(f"[INFO] Added review.{column_name} column")
+        except Exception as migrate_error:
+            db.session.rollback()
+            print(f"[WARNING] Could not add review columns: {migrate_error}")
+        
+        # Reviews without created_at can't be paged past (see review_pagination.py)
+        try:
+            backfilled = backfill_created_at(db.session, Review.__table__)
+            if db.engine.dialect.name == 'postgresql':
+                db.session.execute(text("ALTER TABLE review ALTER COLUMN created_at SET NOT NULL"))
+            db.session.commit()
+            if backfilled:
+                print(f"[INFO] Backfilled created_at of {backfilled} reviews")
+        except Exception as backfill_error:
+            db.session.rollback()
+            print(f"[WARNING] Could not backfill review.created_at: {backfill_error}")
+        
+        # Indexes added to an existing review table (create_all only indexes new tables)
+        try:
+            for index in Review.__table__.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+        except Exception as index_error:
+            print(f"[WARNING] Could not create review indexes: {index_error}")
+        
+        # Provider rate limits persist in provider_rate_limit
+        try:
+            from rate_limiter import rate_limiter
+            rate_limiter.set_store(DatabaseRateLimitStore())
+        except Exception as limiter_error:
+            print(f"[WARNING] Rate limiter persistence disabled: {limiter_error}")
+        
+        # Key point answers persist in key_point_cache
+        try:
+            from key_point_cache import key_point_cache
+            key_point_cache.set_store(DatabaseKeyPointStore())
+        except Exception as cache_error:
+            print(f"[WARNING] Key point cache persistence disabled: {cache_error}")
+
+        # Review file ingestion jobs queue in ingest_job
+        try:
+            from ingest_jobs import ingest_runner
+            ingest_runner.set_store(DatabaseIngestStore())
+        except Exception as ingest_error:
+            print(f"[WARNING] Ingest jobs disabled: {ingest_error}")
+        
+        # Deferred key point extraction queues in key_point_job
+        try:
+            from key_point_enrichment import key_point_enricher
+            key_point_enricher.set_store(DatabaseEnrichmentStore())
+        except Exception as enrich_error:
+            print(f"[WARNING] Deferred key points disabled: {enrich_error}")
 except Exception as e:
     print(f"[WARNING] Database initialization error: {e}")
     print("[INFO] App will continue, but database operations may fail")
 
 
+# Sentiment and key points are independent stages: analyze_review runs them
+# side by side on this executor, each with its own timeout
+SENTIMENT_STAGE_TIMEOUT_S = float(os.getenv('SENTIMENT_STAGE_TIMEOUT_S', '10'))
+KEY_POINTS_STAGE_TIMEOUT_S = float(os.getenv('KEY_POINTS_STAGE_TIMEOUT_S', '20'))
+
+_stage_executor = None
+_stage_executor_pid = None
+_stage_executor_lock = threading.Lock()
+stage_stats = collections.Counter()
+
+
+def _get_stage_executor():
+    # Worker threads don't survive a fork - one executor per process
+    global _stage_executor, _stage_executor_pid
+    with _stage_executor_lock:
+        if _stage_executor is None or _stage_executor_pid != os.getpid():
+            _stage_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('ANALYZE_STAGE_WORKERS', '8')),
+                thread_name_prefix='analyze-stage'
+            )
+            _stage_executor_pid = os.getpid()
+        return _stage_executor
+
+
+def _timed_stage(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _submit_stage(name, func, *args):
+    """
+    Run a stage on the stage executor unless ANALYZE_STAGE_MAX_INFLIGHT stages
+    of its kind are still running (see stage_limits.py). Timed-out stages can't
+    be interrupted, so without the cap a slow provider would pile them up and
+    starve the executor.
+    Returns: the future, or None when the stage must use its fallback
+    """
+    if not stage_limits.try_acquire(name):
+        return None
+    
+    def run():
+        try:
+            return _timed_stage(func, *args)
+        finally:
+            stage_limits.release(name)
+    
+    try:
+        return _get_stage_executor().submit(run)
+    except Exception:
+        stage_limits.release(name)
+        raise
+
+
+def _stage_result(name, future, start, timeout, fallback, timings):
+    """
+    Wait for a stage submitted at start (time.monotonic()) for up to timeout
+    seconds. A stage that is too late keeps running in the background; its
+    result is dropped and fallback() answers instead, as it does right away
+    when the stage wasn't started (future is None, see _submit_stage).
+    """
+    if future is None:
+        stage_stats[f'{name}_overloaded'] += 1
+        print(f"[WARNING] Terlalu banyak stage {name} berjalan, menggunakan fallback")
+        result = fallback()
+        elapsed_ms = (time.monotonic() - start) * 1000
+        timings[f'{name}_overloaded'] = True
+    else:
+        try:
+            result, elapsed_ms = future.result(timeout=max(0.0, start + timeout - time.monotonic()))
+        except StageTimeoutError:
+            stage_stats[f'{name}_timeouts'] += 1
+            print(f"[WARNING] Stage {name} melewati batas waktu ({timeout:.0f}s), menggunakan fallback")
+            result = fallback()
+            elapsed_ms = (time.monotonic() - start) * 1000
+            timings[f'{name}_timed_out'] = True
+    timings[name] = round(elapsed_ms, 1)
+    stage_stats[f'{name}_count'] += 1
+    stage_stats[f'{name}_ms_total'] += elapsed_ms
+    return result
+
+
+def _finish_stage_timings(timings, db_start, start):
+    timings['db'] = round((time.perf_counter() - db_start) * 1000, 1)
+    timings['total'] = round((time.monotonic() - start) * 1000, 1)
+    for name in ('db', 'total'):
+        stage_stats[f'{name}_count'] += 1
+        stage_stats[f'{name}_ms_total'] += timings[name]
+    print(f"[INFO] Stage timings (ms): {timings}")
+    return timings
+
+
+def get_stage_stats():
+    stats = dict(stage_stats)
+    summary = {}
+    for name in ('sentiment', 'key_points', 'db', 'total'):
+        count = stats.get(f'{name}_count', 0)
+        summary[name] = {
+            'count': count,
+            'avg_ms': round(stats.get(f'{name}_ms_total', 0) / count, 1) if count else 0.0,
+            'timeouts': stats.get(f'{name}_timeouts', 0),
+            'overloaded': stats.get(f'{name}_overloaded', 0)
+        }
+    return summary
+
+
+def _safe_sentiment_fast(review_text):
+    try:
+        return analyze_sentiment_fast(review_text)
+    except Exception as e:
+        print(f"[ERROR] Fast sentiment fallback failed: {e}")
+        return {'label': 'neutral', 'score': 0.5, 'tier': 'fallback'}
+
+
+def _extract_review_key_points(review_text):
+    """Key points for one review; never raises"""
+    # Extract key points using AI (Groq/Hugging Face/Gemini) or smart extraction
+    print("[INFO] Mengekstrak poin penting...")
+    try:
+        key_points = extract_key_points(review_text)
+        print("[SUCCESS] Poin penting berhasil diekstrak")
+        return key_points
+    except Exception as kp_error:
+        print(f"[ERROR] Key points extraction failed: {kp_error}")
+        import traceback
+        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        # Use fallback if extraction fails
+        print("[WARNING] Using fallback key points extraction")
+        return "Poin penting tidak dapat diekstrak"
+
+
+def _analyze_review_sentiment(review_text):
+    """Sentiment for one review; never raises (falls back to neutral)"""
+    # Analyze sentiment using Hugging Face
+    print(f"[INFO] Menganalisis sentimen untuk review: {review_text[:50]}...")
+    try:
+        # Check if model is loaded (non-blocking)
+        from sentiment_analyzer import is_model_ready
+        
+        # If model is not loaded yet, use the fast classifier (don't wait for it)
+        if not is_model_ready():
+            print("[WARNING] Model still loading, using fast sentiment classifier")
+            return analyze_sentiment_fast(review_text)
+        # Model is loaded, use it
+        sentiment_result = analyze_sentiment(review_text)
+        print(f"[SUCCESS] Sentimen: {sentiment_result['label']} (score: {sentiment_result.get('score', 0):.2f})")
+        return sentiment_result
+    except Exception as sent_error:
+        print(f"[ERROR] Sentiment analysis failed: {sent_error}")
+        import traceback
+        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        # Use fallback instead of returning error
+        print("[WARNING] Using fallback sentiment analysis")
+        return {'label': 'neutral', 'score': 0.5, 'tier': 'fallback'}
+
+
+# Default for analyze-review's defer_key_points (see key_point_enrichment.py)
+DEFER_KEY_POINTS = os.getenv('DEFER_KEY_POINTS', 'false').lower() == 'true'
+
+
 @app.route('/api/analyze-review', methods=['POST', 'OPTIONS'])
 def analyze_review():
     # Handle OPTIONS preflight explicitly
@@ -345,51 +940,44 @@ def analyze_review():
             response.headers["Access-Control-Allow-Origin"] = "*"
             return response
         
-        # Analyze sentiment using Hugging Face
-        print(f"[INFO] Menganalisis sentimen untuk review: {review_text[:50]}...")
-        try:
-            # Check if model is loaded (non-blocking)
-            from sentiment_analyzer import sentiment_pipeline
-            
-            # If model is not loaded yet, use fallback (don't wait for it)
-            if sentiment_pipeline is None:
-                print("[WARNING] Model still loading, using fallback sentiment analysis")
-                sentiment_result = {'label': 'neutral', 'score': 0.5}
-            else:
-                # Model is loaded, use it
-                sentiment_result = analyze_sentiment(review_text)
-                print(f"[SUCCESS] Sentimen: {sentiment_result['label']} (score: {sentiment_result.get('score', 0):.2f})")
-        except Exception as sent_error:
-            print(f"[ERROR] Sentiment analysis failed: {sent_error}")
-            import traceback
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
-            # Use fallback instead of returning error
-            print("[WARNING] Using fallback sentiment analysis")
-            sentiment_result = {'label': 'neutral', 'score': 0.5}
+        # Deferred: answer with the sentiment only, the key points are filled in by the enricher
+        # Parsed like the env flags: JSON booleans, or "true"/"1"/"yes" from form-style clients
+        defer_key_points = str(data.get('defer_key_points', DEFER_KEY_POINTS)).lower() in ('1', 'true', 'yes')
         
-        # Extract key points using AI (Groq/Hugging Face/Gemini) or smart extraction
-        print("[INFO] Mengekstrak poin penting...")
-        try:
-            key_points = extract_key_points(review_text)
-            print("[SUCCESS] Poin penting berhasil diekstrak")
-        except Exception as kp_error:
-            print(f"[ERROR] Key points extraction failed: {kp_error}")
-            import traceback
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
-            # Use fallback if extraction fails
-            print("[WARNING] Using fallback key points extraction")
-            key_points = "Poin penting tidak dapat diekstrak"
+        # Sentiment (CPU) and key points (network) run concurrently;
+        # the request takes max(sentiment, key points) instead of the sum
+        start = time.monotonic()
+        stage_timings = {}
+        sentiment_future = _submit_stage('sentiment', _analyze_review_sentiment, review_text)
+        if not defer_key_points:
+            key_points_future = _submit_stage('key_points', _extract_review_key_points, review_text)
+        sentiment_result = _stage_result(
+            'sentiment', sentiment_future, start, SENTIMENT_STAGE_TIMEOUT_S,
+            lambda: _safe_sentiment_fast(review_text), stage_timings
+        )
+        key_points = None
+        if not defer_key_points:
+            key_points = _stage_result(
+                'key_points', key_points_future, start, KEY_POINTS_STAGE_TIMEOUT_S,
+                lambda: extract_key_points_local(review_text), stage_timings
+            )
         
         # Save to database
+        db_start = time.perf_counter()
         try:
             review = Review(
                 review_text=review_text,
                 sentiment=sentiment_result['label'],
                 sentiment_score=sentiment_result.get('score', 0.0),
-                key_points=key_points
+                sentiment_tier=sentiment_result.get('tier'),
+                key_points=key_points,
+                key_points_status='pending' if defer_key_points else 'done'
             )
             
             db.session.add(review)
+            if defer_key_points:
+                db.session.flush()
+                db.session.add(KeyPointJob(review_id=review.id))
             db.session.commit()
             print(f"[SUCCESS] Review saved with ID: {review.id}")
         except Exception as db_error:
@@ -397,25 +985,41 @@ def analyze_review():
             db.session.rollback()
             import traceback
             print(f"[ERROR] Traceback: {traceback.format_exc()}")
+            if defer_key_points:
+                # Nothing to enrich later without a saved review
+                key_points = extract_key_points_local(review_text)
             # Return result even if save fails
             response = jsonify({
                 'review_text': review_text,
                 'sentiment': sentiment_result['label'],
                 'sentiment_score': sentiment_result.get('score', 0.0),
+                'sentiment_windows': sentiment_result.get('windows'),
+                'sentiment_tier': sentiment_result.get('tier'),
                 'key_points': key_points,
+                'key_points_status': 'done',
+                'stage_timings_ms': _finish_stage_timings(stage_timings, db_start, start),
                 'warning': 'Review tidak dapat disimpan ke database'
             })
             response.status_code = 200
             response.headers["Access-Control-Allow-Origin"] = "*"
             return response
         
+        if defer_key_points:
+            from key_point_enrichment import key_point_enricher
+            key_point_enricher.start()
+            key_point_enricher.notify()
+        
         response = jsonify({
             'id': review.id,
             'review_text': review.review_text,
             'sentiment': review.sentiment,
             'sentiment_score': review.sentiment_score,
+            'sentiment_windows': sentiment_result.get('windows'),
+            'sentiment_tier': sentiment_result.get('tier'),
             'key_points': review.key_points,
-            'created_at': review.created_at.isoformat() if review.created_at else None
+            'key_points_status': review.key_points_status,
+            'created_at': review.created_at.isoformat() if review.created_at else None,
+            'stage_timings_ms': _finish_stage_timings(stage_timings, db_start, start)
         })
         response.status_code = 200
         response.headers["Access-Control-Allow-Origin"] = "*"
@@ -451,8 +1055,434 @@ def analyze_review():
             return resp
 
 
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/analyze-review/stream', methods=['POST', 'OPTIONS'])
+def analyze_review_stream():
+    """
+    Streaming variant of /api/analyze-review (Server-Sent Events).
+    Events, in order:
+        sentiment  - {sentiment, sentiment_score, sentiment_windows, sentiment_tier}
+        key_point  - {point}, one per key point as the provider produces it
+        done       - the saved review (same fields as /api/analyze-review)
+        error      - {error, details}; the stream ends after it
+    """
+    if request.method == 'OPTIONS':
+        response = jsonify({})
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+        response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
+        return response
+    
+    data = request.get_json(silent=True)
+    review_text = (data or {}).get('review_text') or ''
+    review_text = review_text.strip() if isinstance(review_text, str) else ''
+    
+    def generate():
+        if not review_text:
+            print("[ERROR] Missing or empty review_text in stream request")
+            yield _sse_event('error', {'error': 'review_text is required'})
+            return
+        
+        # Same per-kind caps as analyze_review's stages (see stage_limits.py)
+        if stage_limits.try_acquire('sentiment'):
+            try:
+                sentiment_result = _analyze_review_sentiment(review_text)
+            finally:
+                stage_limits.release('sentiment')
+        else:
+            stage_stats['sentiment_overloaded'] += 1
+            print("[WARNING] Terlalu banyak stage sentiment berjalan, menggunakan fallback")
+            sentiment_result = _safe_sentiment_fast(review_text)
+        yield _sse_event('sentiment', {
+            'sentiment': sentiment_result['label'],
+            'sentiment_score': sentiment_result.get('score', 0.0),
+            'sentiment_windows': sentiment_result.get('windows'),
+            'sentiment_tier': sentiment_result.get('tier')
+        })
+        
+        print("[INFO] Mengekstrak poin penting (streaming)...")
+        points = []
+        try:
+            if stage_limits.try_acquire('key_points'):
+                try:
+                    for point in stream_key_points(review_text):
+                        points.append(point)
+                        yield _sse_event('key_point', {'point': point})
+                finally:
+                    stage_limits.release('key_points')
+            else:
+                stage_stats['key_points_overloaded'] += 1
+                print("[WARNING] Terlalu banyak stage key_points berjalan, menggunakan fallback")
+                for point in extract_key_points_local(review_text).split('\n'):
+                    if point.strip():
+                        points.append(point.strip())
+                        yield _sse_event('key_point', {'point': point.strip()})
+        except Exception as kp_error:
+            print(f"[ERROR] Key points streaming failed: {kp_error}")
+            if not points:
+                points = ["Poin penting tidak dapat diekstrak"]
+                yield _sse_event('key_point', {'point': points[0]})
+        key_points = '\n'.join(points)
+        
+        result = {
+            'review_text': review_text,
+            'sentiment': sentiment_result['label'],
+            'sentiment_score': sentiment_result.get('score', 0.0),
+            'sentiment_windows': sentiment_result.get('windows'),
+            'sentiment_tier': sentiment_result.get('tier'),
+            'key_points': key_points
+        }
+        try:
+            review = Review(
+                review_text=review_text,
+                sentiment=sentiment_result['label'],
+                sentiment_score=sentiment_result.get('score', 0.0),
+                sentiment_tier=sentiment_result.get('tier'),
+                key_points=key_points
+            )
+            db.session.add(review)
+            db.session.commit()
+            print(f"[SUCCESS] Review saved with ID: {review.id}")
+            result['id'] = review.id
+            result['created_at'] = review.created_at.isoformat() if review.created_at else None
+        except Exception as db_error:
+            print(f"[ERROR] Database save failed: {db_error}")
+            db.session.rollback()
+            result['warning'] = 'Review tidak dapat disimpan ke database'
+        yield _sse_event('done', result)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers["Cache-Control"] = "no-cache"
+    # Don't let nginx / Render's proxy buffer the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+BULK_ANALYZE_MAX_REVIEWS = int(os.getenv('BULK_ANALYZE_MAX_REVIEWS', '100'))
+# Bulk stage timeouts are the single-review ones per this many reviews
+BULK_STAGE_TIMEOUT_REVIEWS = int(os.getenv('BULK_STAGE_TIMEOUT_REVIEWS', '10'))
+
+
+def _bulk_stage_timeout(timeout, count):
+    return timeout * max(1, -(-count // max(1, BULK_STAGE_TIMEOUT_REVIEWS)))
+
+
+def _analyze_sentiments_bulk(texts):
+    """Sentiment for many reviews in one batched model pass; never raises"""
+    try:
+        from sentiment_analyzer import is_model_ready
+        if not is_model_ready():
+            print("[WARNING] Model still loading, using fast sentiment classifier")
+            return [_safe_sentiment_fast(text) for text in texts]
+        return analyze_sentiment_batch(texts)
+    except Exception as e:
+        print(f"[ERROR] Batch sentiment analysis failed: {e}")
+        return [_safe_sentiment_fast(text) for text in texts]
+
+
+def _extract_key_points_bulk(texts):
+    """Key points for many reviews (batched provider calls); never raises"""
+    try:
+        return extract_key_points_batch(texts)
+    except Exception as e:
+        print(f"[ERROR] Batch key points extraction failed: {e}")
+        return [extract_key_points_local(text) for text in texts]
+
+
+@app.route('/api/analyze-reviews', methods=['POST', 'OPTIONS'])
+def analyze_reviews():
+    """
+    Bulk variant of /api/analyze-review for importers.
+    Body: {"reviews": ["text", ...]} (items may also be {"review_text": "..."}),
+    at most BULK_ANALYZE_MAX_REVIEWS per request.
+    Sentiment runs as one batched model pass and key points as batched provider
+    calls (concurrently, as stages capped like analyze_review's and with
+    timeouts scaled by the batch size), then all reviews are saved with a
+    single commit. A stage that is late or can't start answers with its
+    fallback (fast classifier / local key points) for the whole batch.
+    Returns: {"results": [...], "processed", "failed", "stage_timings_ms"}; each
+    result has the item's index and either the saved review or an error.
+    """
+    if request.method == 'OPTIONS':
+        response = jsonify({})
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+        response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
+        return response
+    
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('reviews') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            print("[ERROR] Missing reviews in bulk request")
+            response = jsonify({'error': 'reviews must be a non-empty list'})
+            response.status_code = 200  # Use 200 instead of 400
+            return response
+        if len(items) > BULK_ANALYZE_MAX_REVIEWS:
+            response = jsonify({'error': f'Maksimal {BULK_ANALYZE_MAX_REVIEWS} review per request'})
+            response.status_code = 200
+            return response
+        
+        print(f"[INFO] Received analyze-reviews request ({len(items)} reviews)")
+        results = [None] * len(items)
+        texts = []
+        indexes = []
+        for i, item in enumerate(items):
+            review_text = item.get('review_text') if isinstance(item, dict) else item
+            if not isinstance(review_text, str) or not review_text.strip():
+                results[i] = {'index': i, 'error': 'review_text is required'}
+                continue
+            texts.append(review_text.strip())
+            indexes.append(i)
+        
+        start = time.monotonic()
+        stage_timings = {}
+        reviews = []
+        sentiments = []
+        if texts:
+            sentiment_future = _submit_stage('sentiment', _analyze_sentiments_bulk, texts)
+            key_points_future = _submit_stage('key_points', _extract_key_points_bulk, texts)
+            sentiments = _stage_result(
+                'sentiment', sentiment_future, start, _bulk_stage_timeout(SENTIMENT_STAGE_TIMEOUT_S, len(texts)),
+                lambda: [_safe_sentiment_fast(text) for text in texts], stage_timings
+            )
+            key_points = _stage_result(
+                'key_points', key_points_future, start, _bulk_stage_timeout(KEY_POINTS_STAGE_TIMEOUT_S, len(texts)),
+                lambda: [extract_key_points_local(text) for text in texts], stage_timings
+            )
+            
+            reviews = [
+                Review(
+                    review_text=review_text,
+                    sentiment=sentiment['label'],
+                    sentiment_score=sentiment.get('score', 0.0),
+                    sentiment_tier=sentiment.get('tier'),
+                    key_points=item_key_points
+                )
+                for review_text, sentiment, item_key_points in zip(texts, sentiments, key_points)
+            ]
+        
+        db_start = time.perf_counter()
+        saved = False
+        if reviews:
+            try:
+                # One INSERT round trip for the whole batch
+                db.session.add_all(reviews)
+                db.session.commit()
+                saved = True
+                print(f"[SUCCESS] {len(reviews)} reviews saved")
+            except Exception as db_error:
+                print(f"[ERROR] Bulk database save failed: {db_error}")
+                db.session.rollback()
+        stage_timings['db'] = round((time.perf_counter() - db_start) * 1000, 1)
+        stage_timings['total'] = round((time.monotonic() - start) * 1000, 1)
+        
+        for i, review, sentiment in zip(indexes, reviews, sentiments):
+            result = {
+                'index': i,
+                'review_text': review.review_text,
+                'sentiment': review.sentiment,
+                'sentiment_score': review.sentiment_score,
+                'sentiment_tier': sentiment.get('tier'),
+                'key_points': review.key_points
+            }
+            if saved:
+                result['id'] = review.id
+                result['created_at'] = review.created_at.isoformat() if review.created_at else None
+            else:
+                result['warning'] = 'Review tidak dapat disimpan ke database'
+            results[i] = result
+        
+        failed = sum(1 for result in results if 'error' in result)
+        print(f"[INFO] Bulk analyze: {len(results) - failed} ok, {failed} gagal, timings (ms): {stage_timings}")
+        response = jsonify({
+            'results': results,
+            'processed': len(results) - failed,
+            'failed': failed,
+            'stage_timings_ms': stage_timings
+        })
+        response.status_code = 200
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        return response
+    except Exception as e:
+        import traceback
+        print(f"[ERROR] Unexpected error in analyze_reviews: {str(e)}")
+        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        try:
+            db.session.rollback()
+        except:
+            pass
+        response = jsonify({'error': 'Gagal menganalisis review', 'details': str(e)[:200]})
+        response.status_code = 200
+        return response
+
+
+INGEST_UPLOAD_DIR = os.getenv('INGEST_UPLOAD_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads'))
+INGEST_MAX_UPLOAD_MB = int(os.getenv('INGEST_MAX_UPLOAD_MB', '500'))
+
+
+def _save_upload(stream, path):
+    """
+    Copy the upload to disk 1 MB at a time.
+    Returns: (bytes written, newline count), or None if it's over INGEST_MAX_UPLOAD_MB
+    """
+    size = 0
+    newlines = 0
+    last = b'\n'
+    with open(path, 'wb') as f:
+        while True:
+            block = stream.read(1024 * 1024)
+            if not block:
+                break
+            size += len(block)
+            if size > INGEST_MAX_UPLOAD_MB * 1024 * 1024:
+                return None
+            newlines += block.count(b'\n')
+            last = block[-1:]
+            f.write(block)
+    # Count an unterminated last line too
+    return size, newlines + (last != b'\n')
+
+
+@app.route('/api/ingest-jobs', methods=['POST', 'OPTIONS'])
+def create_ingest_job():
+    """
+    Queue a CSV/JSONL review export for background analysis.
+    Body: multipart form with a 'file' field, or the raw file as the request
+    body (?filename=reviews.csv). Optional 'format' (csv/jsonl) and
+    'text_field' (column/key with the review; defaults to review_text,
+    review, text, ...). The upload is streamed to disk, never held in memory.
+    Returns: the job (see /api/ingest-jobs/<id>)
+    """
+    if request.method == 'OPTIONS':
+        response = jsonify({})
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+        response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
+        return response
+
+    path = None
+    try:
+        from ingest_jobs import detect_format, ingest_runner, resolve_csv_field
+
+        upload = request.files.get('file')
+        if upload is not None:
+            filename = upload.filename
+            content_type = upload.mimetype
+            stream = upload.stream
+        else:
+            filename = request.args.get('filename')
+            content_type = request.mimetype
+            stream = request.stream
+        options = request.form if upload is not None else request.args
+        file_format = detect_format(filename, content_type, options.get('format'))
+        text_field = options.get('text_field') or None
+        if file_format is None:
+            response = jsonify({'error': 'Format file tidak dikenali, gunakan CSV atau JSONL (format=csv|jsonl)'})
+            response.status_code = 200
+            return response
+
+        os.makedirs(INGEST_UPLOAD_DIR, exist_ok=True)
+        path = os.path.join(INGEST_UPLOAD_DIR, f"{int(time.time() * 1000)}-{os.getpid()}-{threading.get_ident()}.{file_format}")
+        saved = _save_upload(stream, path)
+        if saved is None:
+            os.remove(path)
+            response = jsonify({'error': f'File terlalu besar (maksimal {INGEST_MAX_UPLOAD_MB} MB)'})
+            response.status_code = 200
+            return response
+        size, lines = saved
+        if size == 0:
+            os.remove(path)
+            response = jsonify({'error': 'File kosong'})
+            response.status_code = 200
+            return response
+        if file_format == 'csv':
+            text_field = resolve_csv_field(path, text_field)
+            if text_field is None:
+                os.remove(path)
+                response = jsonify({'error': 'Kolom review tidak ditemukan di header CSV (gunakan text_field)'})
+                response.status_code = 200
+                return response
+            lines -= 1  # header
+
+        job = IngestJob(
+            filename=(filename or os.path.basename(path))[:255],
+            file_path=path,
+            file_format=file_format,
+            text_field=text_field,
+            rows_total=max(0, lines)
+        )
+        db.session.add(job)
+        db.session.commit()
+        print(f"[SUCCESS] Ingest job {job.id} queued ({job.filename}, {size} bytes, ~{job.rows_total} rows)")
+
+        ingest_runner.start()
+        ingest_runner.notify()
+        response = jsonify(job.to_dict())
+        response.status_code = 200
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        return response
+    except Exception as e:
+        import traceback
+        print(f"[ERROR] Unexpected error in create_ingest_job: {str(e)}")
+        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        try:
+            db.session.rollback()
+        except:
+            pass
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        response = jsonify({'error': 'Gagal membuat ingest job', 'details': str(e)[:200]})
+        response.status_code = 200
+        return response
+
+
+@app.route('/api/ingest-jobs/<int:job_id>', methods=['GET'])
+def get_ingest_job(job_id):
+    """Returns: the job's status, progress, throughput (rows/s) and ETA"""
+    try:
+        job = db.session.get(IngestJob, job_id)
+        if job is None:
+            response = jsonify({'error': 'Ingest job not found'})
+            response.status_code = 200
+            return response
+        response = jsonify(job.to_dict())
+        response.status_code = 200
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        return response
+    except Exception as e:
+        print(f"[ERROR] Failed to get ingest job: {str(e)}")
+        response = jsonify({'error': 'Failed to get ingest job', 'details': str(e)[:200]})
+        response.status_code = 200
+        return response
+
+
+REVIEWS_PAGE_SIZE = int(os.getenv('REVIEWS_PAGE_SIZE', '50'))
+REVIEWS_MAX_PAGE_SIZE = int(os.getenv('REVIEWS_MAX_PAGE_SIZE', '200'))
+# Any of these selects the paged response of /api/reviews
+REVIEWS_PAGE_PARAMS = ('limit', 'cursor', 'sentiment', 'date_from', 'date_to')
+
+
 @app.route('/api/reviews', methods=['GET', 'OPTIONS'])
 def get_reviews():
+    """
+    One page of reviews, newest first.
+    Query: limit (default REVIEWS_PAGE_SIZE, max REVIEWS_MAX_PAGE_SIZE), cursor
+    (next_cursor of the previous page), sentiment, date_from, date_to (ISO
+    date/datetime, UTC; a plain date_to includes that day)
+    Returns: {"reviews": [...], "next_cursor": str or null}
+    
+    Deprecated: without any of these parameters the response is the pre-paging
+    one, a bare list of all reviews (with a Deprecation header), so existing
+    clients keep working. New clients should always send limit.
+    """
     # Handle OPTIONS preflight explicitly
     if request.method == 'OPTIONS':
         try:
@@ -467,6 +1497,9 @@ def get_reviews():
             response.headers["Access-Control-Allow-Origin"] = "*"
             return response
     
+    legacy = not any(name in request.args for name in REVIEWS_PAGE_PARAMS)
+    empty_page = [] if legacy else {'reviews': [], 'next_cursor': None}
+    
     # Wrap entire function to ensure we always return with CORS
     try:
         print("[INFO] Fetching reviews from database...")
@@ -483,21 +1516,55 @@ def get_reviews():
                 print("[INFO] Database reconnected")
             except Exception as reconnect_error:
                 print(f"[ERROR] Database reconnection failed: {reconnect_error}")
-                # Return empty list instead of error to prevent 502
-                return jsonify([]), 200
+                # Return empty page instead of error to prevent 502
+                return jsonify(empty_page), 200
+        
+        try:
+            limit = request.args.get('limit', str(REVIEWS_PAGE_SIZE))
+            if not limit.isdigit():
+                raise ValueError("limit harus berupa angka")
+            limit = min(max(1, int(limit)), REVIEWS_MAX_PAGE_SIZE)
+            sentiment = (request.args.get('sentiment') or '').strip().lower() or None
+            if sentiment is not None and sentiment not in SENTIMENTS:
+                raise ValueError(f"sentiment harus salah satu dari: {', '.join(SENTIMENTS)}")
+            date_from = parse_date_bound(request.args.get('date_from'))
+            date_to = parse_date_bound(request.args.get('date_to'), end=True)
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as param_error:
+            response = jsonify({'error': str(param_error)})
+            response.status_code = 400
+            response.headers["Access-Control-Allow-Origin"] = "*"
+            return response
         
         # Fetch reviews with error handling
         try:
-            reviews = Review.query.order_by(Review.created_at.desc()).all()
+            if legacy:
+                reviews = Review.query.order_by(*page_order(Review)).all()
+                print(f"[SUCCESS] Found {len(reviews)} reviews (unpaged, deprecated)")
+                response = jsonify([review.to_dict() for review in reviews])
+                response.status_code = 200
+                response.headers["Deprecation"] = "true"
+                response.headers["Access-Control-Allow-Origin"] = "*"
+                return response
+            
+            # One row more than the page tells whether there is a next page
+            rows = Review.query.filter(
+                *page_conditions(Review, sentiment, date_from, date_to, after)
+            ).order_by(*page_order(Review)).limit(limit + 1).all()
+            reviews, next_cursor = split_page(rows, limit)
             print(f"[SUCCESS] Found {len(reviews)} reviews")
-            response = jsonify([review.to_dict() for review in reviews])
+            response = jsonify({
+                'reviews': [review.to_dict() for review in reviews],
+                'next_cursor': next_cursor
+            })
             response.status_code = 200
             response.headers["Access-Control-Allow-Origin"] = "*"
             return response
         except Exception as query_error:
             print(f"[ERROR] Query failed: {query_error}")
-            # Return empty list instead of error
-            response = jsonify([])
+            # Return empty page instead of error
+            response = jsonify(empty_page)
             response.status_code = 200
             response.headers["Access-Control-Allow-Origin"] = "*"
             return response
@@ -515,9 +1582,9 @@ def get_reviews():
         except:
             pass
         
-        # Return empty list instead of error to prevent 502
+        # Return empty page instead of error to prevent 502
         # Set CORS headers immediately
-        response = jsonify([])
+        response = jsonify(empty_page)
         response.status_code = 200
         response.headers["Access-Control-Allow-Origin"] = "*"
         response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
@@ -525,6 +1592,33 @@ def get_reviews():
         return response
 
 
+@app.route('/api/reviews/<int:review_id>', methods=['GET'])
+def get_review(review_id):
+    """
+    Returns: the review; poll it while key_points_status is 'pending'
+    (deferred key points) until it turns 'done'
+    """
+    try:
+        review = db.session.get(Review, review_id)
+        if review is None:
+            response = jsonify({'error': 'Review tidak ditemukan'})
+            response.status_code = 200
+            return response
+        response = jsonify(review.to_dict())
+        response.status_code = 200
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        return response
+    except Exception as e:
+        print(f"[ERROR] Gagal memuat review: {str(e)}")
+        try:
+            db.session.rollback()
+        except:
+            pass
+        response = jsonify({'error': 'Gagal memuat review', 'details': str(e)[:200]})
+        response.status_code = 200
+        return response
+
+
 @app.route('/api/reviews/<int:review_id>', methods=['DELETE'])
 def delete_review(review_id):
     try:
@@ -534,6 +1628,7 @@ def delete_review(review_id):
             return jsonify({'error': 'Review tidak ditemukan'}), 404
         
         db.session.delete(review)
+        KeyPointJob.query.filter_by(review_id=review_id).delete(synchronize_session=False)
         db.session.commit()
         
         print(f"[SUCCESS] Review ID {review_id} berhasil dihapus")
@@ -558,19 +1653,74 @@ def health_check():
         
         # Check model loading status (non-blocking)
         model_status = 'unknown'
+        model_backend = None
+        model_load = None
+        sentiment_cache_stats = None
+        cascade_stats = None
+        inference_stats = None
         try:
-            from sentiment_analyzer import sentiment_pipeline
-            if sentiment_pipeline is not None:
+            import sentiment_analyzer
+            if sentiment_analyzer.inference_pool is not None:
+                # Model lives in the inference processes
+                inference_stats = sentiment_analyzer.inference_pool.get_stats()
+                model_status = 'loaded' if inference_stats['ready'] else 'loading'
+                model_backend = sentiment_analyzer.inference_pool.model_version
+            elif sentiment_analyzer.sentiment_pipeline is not None:
                 model_status = 'loaded'
+                model_backend = sentiment_analyzer.active_backend
+                model_load = dict(sentiment_analyzer.load_timings, revision=sentiment_analyzer.model_revision)
             else:
                 model_status = 'loading'
+            sentiment_cache_stats = sentiment_analyzer.sentiment_cache.get_stats()
+            cascade_stats = sentiment_analyzer.cascade_stats.get_stats()
         except:
             model_status = 'unknown'
         
+        # Keep-alive connection reuse and handshake latency per provider host
+        try:
+            from provider_client import get_provider_stats
+            provider_stats = get_provider_stats()
+        except Exception:
+            provider_stats = None
+        try:
+            from key_points_extractor import get_batch_stats, get_racing_stats
+            from gemini_client import gemini_registry
+            from circuit_breaker import get_breaker_states
+            from rate_limiter import rate_limiter
+            from key_point_cache import key_point_cache
+            from key_point_enrichment import key_point_enricher
+            key_points_stats = {
+                'circuit_breakers': get_breaker_states(),
+                'rate_limits': rate_limiter.get_state(),
+                'cache': key_point_cache.get_stats(),
+                'racing': get_racing_stats(),
+                'batch': get_batch_stats(),
+                'gemini': gemini_registry.get_stats(),
+                'enrichment': key_point_enricher.get_stats()
+            }
+        except Exception:
+            key_points_stats = None
+        
+        # Per-worker memory: uss_mb is what this worker doesn't share with the others
+        try:
+            from process_metrics import get_memory_usage
+            worker_memory = get_memory_usage()
+        except Exception:
+            worker_memory = None
+        
         return jsonify({
             'status': 'healthy',
             'database': db_status,
+            'worker': worker_memory,
             'model_status': model_status,
+            'model_backend': model_backend,
+            'model_load': model_load,
+            'sentiment_cache': sentiment_cache_stats,
+            'sentiment_cascade': cascade_stats,
+            'inference_pool': inference_stats,
+            'providers': provider_stats,
+            'key_points': key_points_stats,
+            'analyze_stages': get_stage_stats(),
             'timestamp': datetime.utcnow().isoformat()
         }), 200
     except Exception as e:
@@ -644,17 +1794,51 @@ def handle_exception(e):
     return response
 
 
+def train_fast_classifier_from_reviews(limit=5000):
+    """
+    Refit the fast sentiment classifier on stored reviews so it mimics the
+    transformer on our own data. Only transformer labels are used: training on
+    the fast tier's (or the fallback's) own answers would reinforce its mistakes.
+    """
+    from fast_classifier import retrain_fast_classifier
+    
+    with app.app_context():
+        rows = (
+            db.session.query(Review.review_text, Review.sentiment)
+            .filter(Review.sentiment_tier == 'transformer')
+            .order_by(Review.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+    samples = [(review_text, sentiment) for review_text, sentiment in rows if review_text]
+    retrain_fast_classifier(samples)
+    print(f"[SUCCESS] Fast sentiment classifier trained on {len(samples)} stored reviews")
+
+
 # Background model preloading function
 def preload_models():
     """Preload AI models in background after startup"""
     try:
         print("[INFO] Starting background model preloading...")
+        # Fast classifier first: it serves requests until the transformer is ready
+        try:
+            train_fast_classifier_from_reviews()
+        except Exception as e:
+            print(f"[WARNING] Failed to train fast classifier on stored reviews: {e}")
+        
         # Preload sentiment model (allow_loading=True for background thread)
         try:
-            from sentiment_analyzer import get_sentiment_pipeline
-            print("[INFO] Preloading sentiment analysis model...")
-            get_sentiment_pipeline(allow_loading=True)
-            print("[SUCCESS] Sentiment model preloaded")
+            from sentiment_analyzer import get_sentiment_pipeline, inference_pool, start_inference_pool
+            if inference_pool is not None:
+                # The model is loaded by the inference processes, not this process
+                if os.getenv('SENTIMENT_LOAD_BEFORE_FORK', 'false').lower() == 'true':
+                    print("[INFO] Inference processes will be started by each worker after fork")
+                else:
+                    start_inference_pool()
+            else:
+                print("[INFO] Preloading sentiment analysis model...")
+                get_sentiment_pipeline(allow_loading=True)
+                print("[SUCCESS] Sentiment model preloaded")
         except Exception as e:
             print(f"[WARNING] Failed to preload sentiment model: {e}")
             import traceback
@@ -680,11 +1864,43 @@ print("[INFO] Server is ready to accept requests")
 print("[INFO] Starting background model preloading...")
 print("=" * 50)
 
-# Start model preloading in background thread (non-blocking)
-# This ensures models are ready when needed, but doesn't block startup
-model_preload_thread = threading.Thread(target=preload_models, daemon=True)
-model_preload_thread.start()
-print("[INFO] Model preloading started in background thread")
+def start_model_preload():
+    """Start preload_models() in a background thread of this process"""
+    model_preload_thread = threading.Thread(target=preload_models, daemon=True)
+    model_preload_thread.start()
+    print("[INFO] Model preloading started in background thread")
+    return model_preload_thread
+
+
+# Under gunicorn with preload (see gunicorn.conf.py) the model is loaded here in the
+# master before workers are forked when it is baked into the image, so all workers
+# share its memory pages. Without a local model every worker loads it in the
+# background after fork instead: a background thread started here would not
+# survive the fork.
+if is_inference_child():
+    # A sentiment inference process re-importing app.py as __mp_main__ (`python app.py`):
+    # it loads the model itself and must not preload one or claim queued jobs
+    pass
+elif os.getenv('SENTIMENT_LOAD_BEFORE_FORK', 'false').lower() == 'true':
+    print("[INFO] Loading model before fork (shared by all workers)")
+    preload_models()
+elif os.getenv('SENTIMENT_PRELOAD_AFTER_FORK', 'false').lower() == 'true':
+    print("[INFO] Model preloading starts in each worker after fork")
+else:
+    # Start model preloading in background thread (non-blocking)
+    # This ensures models are ready when needed, but doesn't block startup
+    start_model_preload()
+    # Background queues (under gunicorn preload every worker starts them in post_fork)
+    try:
+        from ingest_jobs import ingest_runner
+        ingest_runner.start()
+    except Exception as e:
+        print(f"[WARNING] Ingest runner not started: {e}")
+    try:
+        from key_point_enrichment import key_point_enricher
+        key_point_enricher.start()
+    except Exception as e:
+        print(f"[WARNING] Key point enricher not started: {e}")
 
 if __name__ == '__main__':
     # Development mode
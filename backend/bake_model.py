@@ -0,0 +1,93 @@
+"""
+Build-time step: download the sentiment model + tokenizer once and store them
+in a versioned local directory, so containers start without touching the
+Hugging Face Hub.
+
+Layout:
+    <output>/<model-name>/<revision>/   config.json, model.safetensors, tokenizer files, manifest.json
+    <output>/current -> <model-name>/<revision>
+
+Usage:
+    python bake_model.py [--output models] [--revision main]
+
+Then run the app with SENTIMENT_MODEL_DIR=<output>/current
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def bake_model(output=DEFAULT_OUTPUT, revision='main', model_name=MODEL_NAME):
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    print("=" * 60)
+    print(f"Baking {model_name} ({revision})")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=revision)
+    # Pin the exact commit so the directory name identifies the weights
+    commit = getattr(model.config, '_commit_hash', None) or revision
+    print(f"[OK] Downloaded in {time.perf_counter() - start:.1f}s (commit {commit})")
+
+    model_dir = os.path.join(output, model_name.replace('/', '--'), commit)
+    os.makedirs(model_dir, exist_ok=True)
+    # safetensors can be memory-mapped at load time (see local_model.py)
+    model.save_pretrained(model_dir, safe_serialization=True)
+    tokenizer.save_pretrained(model_dir)
+
+    files = {}
+    for name in sorted(os.listdir(model_dir)):
+        path = os.path.join(model_dir, name)
+        if os.path.isfile(path) and name != 'manifest.json':
+            files[name] = {'bytes': os.path.getsize(path), 'sha256': _sha256(path)}
+
+    manifest = {
+        'model_name': model_name,
+        'revision': revision,
+        'commit': commit,
+        'baked_at': datetime.utcnow().isoformat(),
+        'files': files
+    }
+    with open(os.path.join(model_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Stable path for SENTIMENT_MODEL_DIR
+    current = os.path.join(output, 'current')
+    if os.path.islink(current) or os.path.exists(current):
+        os.remove(current)
+    os.symlink(os.path.relpath(model_dir, output), current)
+
+    total_mb = sum(f['bytes'] for f in files.values()) / (1024 * 1024)
+    print(f"[SUCCESS] Model baked to {model_dir} ({total_mb:.0f}MB)")
+    print(f"          Set SENTIMENT_MODEL_DIR={current}")
+    return model_dir
+
+
+def _arg_value(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+if __name__ == '__main__':
+    bake_model(
+        output=_arg_value('--output', DEFAULT_OUTPUT),
+        revision=_arg_value('--revision', 'main')
+    )
@@ -0,0 +1,75 @@
+"""
+Golden corpus check for the smart key point extraction (key_point_rules.py).
+
+key_points_golden.json holds reviews with the key points the previous
+keyword-loop implementation of extract_key_points_simple produced for them
+(short reviews that hit its `.trim()` crash are recorded with the intended
+output). Any rule or lexicon change that alters the output shows up here.
+
+Usage:
+    python check_key_point_rules.py [--runs 20] [--show 10]
+"""
+
+import json
+import os
+import sys
+import time
+
+from key_point_rules import key_point_rules
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'key_points_golden.json')
+
+
+def _arg_value(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+def check_golden(runs=20, show=10):
+    with open(GOLDEN_FILE, encoding='utf-8') as f:
+        cases = json.load(f)
+    reviews = [case['review'] for case in cases]
+
+    print("=" * 60)
+    print("Key Point Rules: golden corpus check")
+    print("=" * 60)
+    print()
+
+    mismatches = 0
+    for case, actual in zip(cases, key_point_rules.extract_many(reviews)):
+        if actual == case['key_points']:
+            continue
+        mismatches += 1
+        if mismatches <= show:
+            print(f"   [MISMATCH] {case['review'][:50]!r}")
+            print(f"      expected: {case['key_points']!r}")
+            print(f"      actual:   {actual!r}")
+    print(f"   Matching: {len(cases) - mismatches}/{len(cases)}")
+    print()
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        for review in reviews:
+            key_point_rules.extract(review)
+    single_ms = (time.perf_counter() - start) * 1000 / (runs * len(reviews))
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        key_point_rules.extract_many(reviews)
+    batch_ms = (time.perf_counter() - start) * 1000 / (runs * len(reviews))
+
+    print(f"   per review (single): {single_ms:.4f} ms")
+    print(f"   per review (batch):  {batch_ms:.4f} ms")
+    print()
+
+    if mismatches:
+        print(f"[ERROR] {mismatches} review(s) berbeda dari golden corpus")
+        return False
+    print("[SUCCESS] Output sama dengan golden corpus")
+    return True
+
+
+if __name__ == '__main__':
+    ok = check_golden(runs=int(_arg_value('--runs', '20')), show=int(_arg_value('--show', '10')))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,196 @@
+"""
+Per-provider circuit breakers for the key point providers.
+
+A provider that keeps failing, or that is out of quota, is skipped instantly
+instead of every review waiting for its error first:
+
+    closed     -> calls go through; consecutive failures are counted
+    open       -> calls are skipped until the open window ends
+    half_open  -> one probe call is let through; success closes, failure reopens
+
+A 429 opens the circuit for the provider's Retry-After delay, or until the
+daily reset for per-day quotas.
+"""
+import os
+import re
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class QuotaExceededError(Exception):
+    """Provider answered 429; retry_after is in seconds when the provider said so"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """The provider is skipped because its circuit is open"""
+
+
+# Explicit quota wording only: a bare "exceeded" also matches requests'
+# "Max retries exceeded with url" of every ConnectionError / ConnectTimeout
+QUOTA_MESSAGE = re.compile(
+    r'\b429\b|quota|resource(?: has been)?[ _]exhausted|too many requests|rate[ _]limit(?:ed)?[ _]exceeded',
+    re.IGNORECASE
+)
+
+
+def is_quota_error(error):
+    """
+    error: exception or message
+    Returns: True for QuotaExceededError, an HTTP 429 response, or explicit
+             quota / resource exhausted text
+    """
+    if isinstance(error, QuotaExceededError):
+        return True
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    code = getattr(error, 'code', None)
+    if code == 429 or getattr(code, 'value', None) == 429:
+        return True
+    return bool(QUOTA_MESSAGE.search(str(error)))
+
+
+def seconds_until_daily_reset():
+    # Free tier daily quotas reset at midnight Pacific time (UTC-8, an hour early in summer)
+    pacific_now = time.time() - 8 * 3600
+    return 86400 - (pacific_now % 86400)
+
+
+def quota_cooldown_seconds(error_msg, default):
+    """How long to back off after a quota error, judging by its message"""
+    match = re.search(r'retry(?:_delay)?[^0-9]{0,20}(\d+(?:\.\d+)?)\s*s', error_msg, re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    if 'perday' in error_msg.lower().replace(' ', '').replace('_', ''):
+        return seconds_until_daily_reset()
+    return default
+
+
+def parse_retry_after(headers):
+    """Returns: seconds from a Retry-After header (delta-seconds form), or None"""
+    value = (headers or {}).get('Retry-After') or (headers or {}).get('retry-after')
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=3, reset_timeout=30.0, max_reset_timeout=600.0, quota_cooldown=60.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.quota_cooldown = quota_cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.open_reason = None
+        self.times_opened = 0
+        self.skipped = 0
+        self._current_timeout = reset_timeout
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """True while calls would be skipped (doesn't claim the half-open probe)"""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() < self.open_until
+            return self.state == HALF_OPEN and self._probe_in_flight
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() >= self.open_until:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                print(f"[INFO] Circuit {self.name} half-open, mencoba satu request")
+                return True
+            self.skipped += 1
+            return False
+
+    def release_probe(self):
+        """The allowed call was never sent - let the next one probe instead"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"[SUCCESS] Circuit {self.name} tertutup kembali")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.open_reason = None
+            self._current_timeout = self.reset_timeout
+            self._probe_in_flight = False
+
+    def record_failure(self, error):
+        error_msg = str(error)
+        with self._lock:
+            self.consecutive_failures += 1
+            if is_quota_error(error):
+                retry_after = getattr(error, 'retry_after', None)
+                seconds = retry_after if retry_after is not None else quota_cooldown_seconds(error_msg, self.quota_cooldown)
+                self._open(seconds, f"quota: {error_msg[:80]}")
+            elif self.state == HALF_OPEN:
+                # Probe failed - back off longer each time
+                self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+                self._open(self._current_timeout, error_msg[:80])
+            elif self.consecutive_failures >= self.failure_threshold:
+                self._open(self._current_timeout, error_msg[:80])
+            self._probe_in_flight = False
+
+    def _open(self, seconds, reason):
+        self.state = OPEN
+        self.open_until = time.monotonic() + seconds
+        self.open_reason = reason
+        self.times_opened += 1
+        print(f"[WARNING] Circuit {self.name} terbuka selama {seconds:.0f}s ({reason})")
+
+    def get_state(self):
+        with self._lock:
+            remaining = self.open_until - time.monotonic() if self.state == OPEN else 0
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'open_for_s': round(max(0.0, remaining), 1),
+                'reason': self.open_reason,
+                'times_opened': self.times_opened,
+                'skipped': self.skipped
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv('PROVIDER_BREAKER_FAILURES', '3')),
+                reset_timeout=float(os.getenv('PROVIDER_BREAKER_RESET_S', '30')),
+                quota_cooldown=float(os.getenv('PROVIDER_QUOTA_COOLDOWN_S', '60'))
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def get_breaker_states():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_state() for breaker in breakers}
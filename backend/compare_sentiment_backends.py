@@ -0,0 +1,163 @@
+"""
+Parity and performance check: PyTorch pipeline vs ONNX Runtime int8 backend.
+
+Checks that both backends return the same labels (and close scores) for a set
+of sample reviews, then compares latency and memory. Each backend is measured
+in its own subprocess so RSS numbers don't include the other backend.
+
+Usage:
+    python compare_sentiment_backends.py [--runs 20] [--max-score-diff 0.1]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+SAMPLE_REVIEWS = [
+    "Produk ini sangat bagus! Kualitas bahan sangat baik dan awet.",
+    "jelek oi",
+    "mantap",
+    "Pengiriman lambat sekali, barang datang rusak dan penjual tidak responsif.",
+    "Harga terjangkau tapi kualitas biasa saja.",
+    "baunya aneh, tidak enak dimulut ketika dimakan",
+    "produk ini sangat menarik, saya jadi ketagihan",
+    "The battery life is amazing and the screen is great.",
+    "Terrible experience, the item broke after two days. Not worth the money.",
+    "It's okay, nothing special.",
+    "gajelas apaan ini",
+    "Barang sesuai deskripsi, pengiriman cepat, recommended seller!",
+]
+
+
+def _rss_mb():
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_backend(backend, runs):
+    """Load one backend, run the sample reviews and return raw scores + timings"""
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    if backend == 'onnx':
+        from onnx_sentiment import load_onnx_pipeline
+        pipe = load_onnx_pipeline()
+    else:
+        from transformers import pipeline
+        pipe = pipeline(
+            "sentiment-analysis",
+            model="cardiffnlp/twitter-roberta-base-sentiment-latest",
+            return_all_scores=True,
+            device=-1
+        )
+    load_seconds = time.perf_counter() - start
+
+    outputs = pipe(SAMPLE_REVIEWS, batch_size=len(SAMPLE_REVIEWS))
+
+    single_latencies = []
+    for _ in range(runs):
+        for text in SAMPLE_REVIEWS:
+            t0 = time.perf_counter()
+            pipe(text)
+            single_latencies.append((time.perf_counter() - t0) * 1000)
+
+    batch_latencies = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        pipe(SAMPLE_REVIEWS, batch_size=len(SAMPLE_REVIEWS))
+        batch_latencies.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        'backend': backend,
+        'load_seconds': load_seconds,
+        'rss_before_mb': rss_before,
+        'peak_rss_mb': _rss_mb(),
+        'single_p50_ms': _percentile(single_latencies, 50),
+        'single_p95_ms': _percentile(single_latencies, 95),
+        'batch_p50_ms': _percentile(batch_latencies, 50),
+        'batch_size': len(SAMPLE_REVIEWS),
+        'outputs': [{r['label'].lower(): r['score'] for r in result} for result in outputs],
+    }
+
+
+def _measure_in_subprocess(backend, runs):
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', backend, '--runs', str(runs)]
+    completed = subprocess.run(cmd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(completed.stdout)
+        print(completed.stderr)
+        raise RuntimeError(f"Backend {backend} gagal dijalankan")
+    # Last line of stdout is the JSON report
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare_backends(runs=20, max_score_diff=0.1):
+    print("=" * 60)
+    print("Sentiment Backend Comparison: torch vs ONNX int8")
+    print("=" * 60)
+    print()
+
+    torch_report = _measure_in_subprocess('torch', runs)
+    onnx_report = _measure_in_subprocess('onnx', runs)
+
+    # Parity check
+    print("1. Parity check")
+    mismatches = 0
+    worst_diff = 0.0
+    for text, expected, actual in zip(SAMPLE_REVIEWS, torch_report['outputs'], onnx_report['outputs']):
+        expected_label = max(expected, key=expected.get)
+        actual_label = max(actual, key=actual.get)
+        diff = max(abs(expected[label] - actual.get(label, 0.0)) for label in expected)
+        worst_diff = max(worst_diff, diff)
+        status = "[OK]" if expected_label == actual_label and diff <= max_score_diff else "[MISMATCH]"
+        if status != "[OK]":
+            mismatches += 1
+        print(f"   {status} {text[:40]:<40} torch={expected_label:<8} onnx={actual_label:<8} diff={diff:.3f}")
+    print()
+    print(f"   Label agreement: {len(SAMPLE_REVIEWS) - mismatches}/{len(SAMPLE_REVIEWS)}")
+    print(f"   Max score diff:  {worst_diff:.4f} (limit {max_score_diff})")
+    print()
+
+    # Latency and memory
+    print("2. Latency and memory")
+    print(f"   {'':<22}{'torch':>12}{'onnx int8':>12}")
+    rows = [
+        ('load time (s)', 'load_seconds'),
+        ('peak RSS (MB)', 'peak_rss_mb'),
+        ('single p50 (ms)', 'single_p50_ms'),
+        ('single p95 (ms)', 'single_p95_ms'),
+        (f"batch of {torch_report['batch_size']} p50 (ms)", 'batch_p50_ms'),
+    ]
+    for title, key in rows:
+        print(f"   {title:<22}{torch_report[key]:>12.1f}{onnx_report[key]:>12.1f}")
+    print()
+
+    if mismatches:
+        print(f"[ERROR] {mismatches} review(s) berbeda antara torch dan ONNX")
+        return False
+    print("[SUCCESS] ONNX backend konsisten dengan torch")
+    return True
+
+
+def _arg_value(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+if __name__ == '__main__':
+    runs = int(_arg_value('--runs', '20'))
+    if '--worker' in sys.argv:
+        report = run_backend(_arg_value('--worker', 'torch'), runs)
+        print(json.dumps(report))
+        sys.exit(0)
+    ok = compare_backends(runs=runs, max_score_diff=float(_arg_value('--max-score-diff', '0.1')))
+    sys.exit(0 if ok else 1)
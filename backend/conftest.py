@@ -0,0 +1,21 @@
+"""
+Shared pytest fixtures.
+
+backend_app imports app.py against a throwaway SQLite database (never the
+DATABASE_URL of the environment) and empties the review table before each test.
+"""
+import os
+import tempfile
+
+import pytest
+
+
+@pytest.fixture
+def backend_app():
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='reviewinsight-test-'), 'test.db')
+    import app as backend
+
+    with backend.app.app_context():
+        backend.Review.query.delete()
+        backend.db.session.commit()
+    return backend
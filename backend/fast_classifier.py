@@ -0,0 +1,171 @@
+"""
+Lightweight in-process sentiment classifier.
+
+Hashed word/char n-gram features with a NumPy softmax regression. It is trained
+at import from the keyword lexicons (a few milliseconds), then can be refit in
+the background with stored reviews. It serves requests while the transformer
+model is still loading, and acts as the cheap first tier of the cascade.
+"""
+import threading
+import zlib
+
+import numpy as np
+
+from sentiment_lexicon import SENTIMENT_LEXICON, NEUTRAL_SEED_PHRASES
+
+LABELS = ('negative', 'neutral', 'positive')
+N_FEATURES = 2 ** 18
+
+# Which lexicon categories teach which label
+LEXICON_LABELS = {
+    'strong_positive': 'positive',
+    'very_positive': 'positive',
+    'strong_negative': 'negative',
+    'very_negative': 'negative',
+    'negative_slang': 'negative',
+    'frustration': 'negative',
+    'negative_tone': 'negative',
+}
+
+
+def extract_features(text, n_features=N_FEATURES):
+    """
+    Hashed features: word unigrams, word bigrams and char 3/4-grams per word.
+    crc32 is used instead of hash() so features are stable across processes.
+    Returns: (indices, values) with values L2-normalized
+    """
+    words = text.lower().split()
+    grams = ['w:' + w for w in words]
+    grams += ['b:' + a + ' ' + b for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = '<' + w + '>'
+        for n in (3, 4):
+            grams += ['c:' + padded[i:i + n] for i in range(len(padded) - n + 1)]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    hashed = np.fromiter((zlib.crc32(g.encode('utf-8')) % n_features for g in grams), dtype=np.int64, count=len(grams))
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = counts.astype(np.float32)
+    values /= np.linalg.norm(values)
+    return indices, values
+
+
+class FastSentimentClassifier:
+    """Softmax regression over hashed n-gram features"""
+
+    def __init__(self, n_features=N_FEATURES):
+        self.n_features = n_features
+        self.weights = np.zeros((len(LABELS), n_features), dtype=np.float32)
+        self.bias = np.zeros(len(LABELS), dtype=np.float32)
+        self.trained_samples = 0
+
+    def fit(self, texts, labels, epochs=150, learning_rate=2.0, l2=1e-4):
+        """
+        Full-batch gradient descent. Only the feature columns present in the
+        training data are touched, so training stays in the milliseconds range
+        for the lexicon and well under a second for a few thousand reviews.
+        """
+        label_index = {label: i for i, label in enumerate(LABELS)}
+        rows, cols, vals, targets = [], [], [], []
+        for text, label in zip(texts, labels):
+            if label not in label_index:
+                continue
+            indices, values = extract_features(text, self.n_features)
+            if len(indices) == 0:
+                continue
+            rows.append(np.full(len(indices), len(targets), dtype=np.int64))
+            cols.append(indices)
+            vals.append(values)
+            targets.append(label_index[label])
+        if not targets:
+            return self
+
+        rows = np.concatenate(rows)
+        vals = np.concatenate(vals)
+        # Compact the touched columns to a small dense range
+        used_columns, cols = np.unique(np.concatenate(cols), return_inverse=True)
+        n_samples, n_used, n_labels = len(targets), len(used_columns), len(LABELS)
+        y = np.zeros((n_samples, n_labels), dtype=np.float32)
+        y[np.arange(n_samples), targets] = 1.0
+
+        w = np.zeros((n_labels, n_used), dtype=np.float32)
+        b = np.zeros(n_labels, dtype=np.float32)
+        for _ in range(epochs):
+            logits = np.stack([np.bincount(rows, weights=w[k, cols] * vals, minlength=n_samples) for k in range(n_labels)], axis=1) + b
+            probs = _softmax(logits)
+            error = (probs - y) / n_samples
+            grad_w = np.stack([np.bincount(cols, weights=error[rows, k] * vals, minlength=n_used) for k in range(n_labels)])
+            w -= learning_rate * (grad_w + l2 * w)
+            b -= learning_rate * error.sum(axis=0)
+
+        weights = np.zeros((n_labels, self.n_features), dtype=np.float32)
+        weights[:, used_columns] = w
+        self.weights = weights
+        self.bias = b
+        self.trained_samples = n_samples
+        return self
+
+    def predict_proba(self, text):
+        indices, values = extract_features(text, self.n_features)
+        logits = self.weights[:, indices] @ values + self.bias
+        return _softmax(logits[np.newaxis, :])[0]
+
+    def predict(self, text):
+        """
+        Returns: list of {'label', 'score'} for every label, the same shape the
+        transformer pipeline returns, so the keyword overrides apply unchanged
+        """
+        probs = self.predict_proba(text)
+        return [{'label': label, 'score': float(p)} for label, p in zip(LABELS, probs)]
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def lexicon_training_data():
+    """Training samples derived from the sentiment keyword lexicons"""
+    texts, labels = [], []
+    for category, label in LEXICON_LABELS.items():
+        for phrase in SENTIMENT_LEXICON[category]:
+            texts.append(phrase)
+            labels.append(label)
+    for phrase in NEUTRAL_SEED_PHRASES:
+        texts.append(phrase)
+        labels.append('neutral')
+    return texts, labels
+
+
+def build_classifier(extra_samples=None):
+    """
+    Train a classifier on the lexicons plus optional (text, label) samples,
+    e.g. stored reviews labeled by the transformer model.
+    """
+    texts, labels = lexicon_training_data()
+    for text, label in extra_samples or []:
+        texts.append(text)
+        labels.append(label)
+    return FastSentimentClassifier().fit(texts, labels)
+
+
+_classifier_lock = threading.Lock()
+_classifier = build_classifier()
+
+
+def get_fast_classifier():
+    return _classifier
+
+
+def retrain_fast_classifier(samples):
+    """
+    Refit on the lexicons plus stored reviews, then swap the new model in.
+    Requests keep using the old model until the new one is ready.
+    """
+    global _classifier
+    classifier = build_classifier(samples)
+    with _classifier_lock:
+        _classifier = classifier
+    return classifier
@@ -0,0 +1,161 @@
+"""
+Process-wide Gemini client registry.
+
+genai.configure() runs once per API key, the list of models supporting
+generateContent is fetched once per GEMINI_MODELS_TTL_S, GenerativeModel
+instances are kept ready, and models that answered 429 are skipped until
+their quota window resets. A request then makes a single network call
+(generate_content) instead of list_models + generate.
+"""
+import os
+import threading
+import time
+
+import google.generativeai as genai
+
+from circuit_breaker import is_quota_error, quota_cooldown_seconds
+from provider_client import get_provider_client
+from rate_limiter import RateLimitedError, rate_limiter
+
+# Tried in this order (free tier quota is per model, so spreading helps)
+PREFERRED_MODELS = [
+    'gemini-pro-latest',  # Most stable
+    'gemini-2.5-flash-lite',  # Lighter model
+    'gemini-flash-lite-latest',  # Alternative
+    'gemini-2.0-flash-lite',  # Another option
+    'gemini-2.5-flash',  # If others fail
+]
+# Used when the model list can't be fetched
+DEFAULT_MODELS = ['gemini-pro', 'models/gemini-pro']
+# Other listed models tried after the preferred ones
+MAX_EXTRA_MODELS = 10
+
+
+class GeminiModelsExhaustedError(RateLimitedError):
+    """
+    Every model tried hit its own quota (or is cooling down after one).
+    A RateLimitedError, so the Gemini circuit breaker doesn't open: only the
+    exhausted models cool down and the others stay usable.
+    """
+
+
+class GeminiClientRegistry:
+    def __init__(self, models_ttl=3600, quota_cooldown=60):
+        self.models_ttl = models_ttl
+        self.quota_cooldown = quota_cooldown
+        self._lock = threading.Lock()
+        self._configured_key = None
+        self._model_names = None
+        self._models_fetched_at = 0.0
+        self._models = {}
+        self._cooldowns = {}
+        self.list_calls = 0
+
+    def _ensure_configured(self, api_key):
+        with self._lock:
+            if self._configured_key == api_key:
+                return
+            genai.configure(api_key=api_key)
+            self._configured_key = api_key
+            # A different key may see different models and quotas
+            self._model_names = None
+            self._models = {}
+            self._cooldowns = {}
+
+    def _available_models(self):
+        """Returns: model names supporting generateContent, or None if listing failed"""
+        with self._lock:
+            if self._models_fetched_at and time.monotonic() - self._models_fetched_at < self.models_ttl:
+                return self._model_names
+        try:
+            print("[INFO] Mencari model Gemini yang tersedia...")
+            available_models = get_provider_client('gemini').call(lambda: list(genai.list_models()))
+            model_names = [m.name for m in available_models if 'generateContent' in m.supported_generation_methods]
+            print(f"[SUCCESS] Model yang tersedia: {len(model_names)} models")
+        except Exception as list_error:
+            print(f"[WARNING] Tidak bisa list models, mencoba model default: {str(list_error)[:100]}")
+            model_names = None
+        with self._lock:
+            self.list_calls += 1
+            self._model_names = model_names
+            # Retry a failed listing sooner than the normal TTL
+            self._models_fetched_at = time.monotonic() - (0 if model_names is not None else self.models_ttl * 0.9)
+        return model_names
+
+    def candidate_models(self):
+        """Model names to try in order, without the ones cooling down after a 429"""
+        model_names = self._available_models()
+        if model_names is None:
+            candidates = list(DEFAULT_MODELS)
+        else:
+            short_names = [m.split('/')[-1] for m in model_names]
+            candidates = [m for m in PREFERRED_MODELS if m in short_names]
+            candidates += [m for m in short_names[:MAX_EXTRA_MODELS] if m not in PREFERRED_MODELS]
+        now = time.monotonic()
+        with self._lock:
+            return [m for m in candidates if self._cooldowns.get(m, 0) <= now]
+
+    def get_model(self, name):
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                model = genai.GenerativeModel(name)
+                self._models[name] = model
+            return model
+
+    def mark_quota_exhausted(self, name, error_msg=''):
+        seconds = quota_cooldown_seconds(error_msg, self.quota_cooldown)
+        with self._lock:
+            self._cooldowns[name] = time.monotonic() + seconds
+        print(f"[WARNING] Model {name} quota habis, dilewati selama {seconds:.0f}s")
+
+    def generate(self, api_key, prompt, max_attempts=3):
+        """
+        Generate with the first usable model that has rate limit budget left;
+        a 429 puts the model on cooldown and the next candidate is tried.
+        Returns: (response, model name)
+        Raises: GeminiModelsExhaustedError when every model tried is out of quota
+        """
+        self._ensure_configured(api_key)
+        candidates = self.candidate_models()
+        if not candidates:
+            raise GeminiModelsExhaustedError("Semua model Gemini quota habis. Tunggu beberapa saat atau gunakan fallback sederhana.")
+
+        last_error = None
+        attempts = 0
+        for name in candidates:
+            if attempts >= max_attempts:
+                break
+            # Free tier quotas are per model
+            if not rate_limiter.try_acquire(f"gemini:{name}"):
+                continue
+            attempts += 1
+            try:
+                model = self.get_model(name)
+                return get_provider_client('gemini').call(model.generate_content, prompt), name
+            except Exception as e:
+                if not is_quota_error(e):
+                    raise
+                self.mark_quota_exhausted(name, str(e))
+                last_error = e
+        if last_error is None:
+            raise RateLimitedError("Batas request semua model Gemini tercapai")
+        raise GeminiModelsExhaustedError(f"Quota model Gemini habis ({attempts} model dicoba): {str(last_error)[:100]}") from last_error
+
+    def get_stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'models_listed': len(self._model_names) if self._model_names is not None else None,
+                'models_ready': sorted(self._models),
+                'list_calls': self.list_calls,
+                'cooling_down': {
+                    name: round(until - now) for name, until in self._cooldowns.items() if until > now
+                }
+            }
+
+
+gemini_registry = GeminiClientRegistry(
+    models_ttl=float(os.getenv('GEMINI_MODELS_TTL_S', '3600')),
+    quota_cooldown=float(os.getenv('GEMINI_QUOTA_COOLDOWN_S', '60'))
+)
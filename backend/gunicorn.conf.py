@@ -0,0 +1,89 @@
+"""
+Gunicorn configuration for Render / Docker deployment.
+
+When the model is baked into the image (SENTIMENT_MODEL_DIR, see
+bake_model.py) it is loaded once in the master (preload_app) before workers
+are forked, so every worker shares the model's memory pages copy-on-write
+instead of loading its own copy. Without a local model the master would block
+on the Hub download before binding the port, so each worker loads the model
+in the background after fork instead. Scale with WEB_CONCURRENCY.
+
+With SENTIMENT_INFERENCE_PROCESSES the model is not loaded in the master;
+each worker starts its inference processes in post_fork instead.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+threads = int(os.getenv('GUNICORN_THREADS', '2'))
+worker_class = 'gthread'
+worker_connections = 1000
+# Increased timeout to 300s because AI model processing can take time
+timeout = 300
+max_requests = 1000
+max_requests_jitter = 50
+loglevel = 'info'
+accesslog = '-'
+errorlog = '-'
+
+# Import the app (and load a local model) in the master before forking
+preload_app = True
+os.environ.setdefault('SENTIMENT_LOAD_BEFORE_FORK', 'true' if os.path.isdir(os.getenv('SENTIMENT_MODEL_DIR', '')) else 'false')
+load_before_fork = os.environ['SENTIMENT_LOAD_BEFORE_FORK'].lower() == 'true'
+if not load_before_fork:
+    os.environ['SENTIMENT_PRELOAD_AFTER_FORK'] = 'true'
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far (model, modules) into the permanent GC
+    # generation: collections in the workers then never write to those pages,
+    # which keeps them shared instead of being copied into every worker
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    try:
+        # The master opened connections (create_all, migrations) before forking;
+        # sockets shared with the master must not be reused by the worker
+        from app import db, app
+        with app.app_context():
+            db.engine.dispose(close=False)
+    except Exception as e:
+        server.log.warning(f"Failed to reset database connections in worker: {e}")
+    try:
+        import sentiment_analyzer
+        sentiment_analyzer.configure_worker_process(workers)
+    except Exception as e:
+        server.log.warning(f"Failed to configure sentiment model in worker: {e}")
+    if not load_before_fork:
+        try:
+            from app import start_model_preload
+            start_model_preload()
+        except Exception as e:
+            server.log.warning(f"Failed to start model preloading in worker: {e}")
+    try:
+        from ingest_jobs import ingest_runner
+        ingest_runner.start()
+    except Exception as e:
+        server.log.warning(f"Failed to start ingest runner in worker: {e}")
+    try:
+        from key_point_enrichment import key_point_enricher
+        key_point_enricher.start()
+    except Exception as e:
+        server.log.warning(f"Failed to start key point enricher in worker: {e}")
+
+
+def worker_exit(server, worker):
+    try:
+        import sentiment_analyzer
+        if sentiment_analyzer.inference_pool is not None:
+            sentiment_analyzer.inference_pool.shutdown()
+    except Exception as e:
+        server.log.warning(f"Failed to stop sentiment inference processes: {e}")
+    try:
+        from ingest_jobs import ingest_runner
+        # Requeue the job now rather than after INGEST_STALE_S (max_requests recycles workers)
+        ingest_runner.release()
+    except Exception as e:
+        server.log.warning(f"Failed to release ingest job: {e}")
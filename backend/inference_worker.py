@@ -0,0 +1,278 @@
+"""
+Out-of-process sentiment inference.
+
+With SENTIMENT_INFERENCE_PROCESSES > 0 the transformer runs in a small pool of
+long-lived processes fed through a multiprocessing queue. The gunicorn request
+threads then only do I/O (database, Groq / Hugging Face calls) and never
+compete with torch for the GIL; each inference process gets its own share of
+the CPU cores for the intra-op threads of torch or ONNX Runtime.
+
+Processes are started with 'spawn' (a clean interpreter, no inherited locks or
+thread pools) and load the model themselves - from SENTIMENT_MODEL_DIR this is
+a memory-mapped file, so the weights are shared through the page cache.
+A process that dies (e.g. OOM-killed) is replaced; one that exits because its
+model failed to load is not.
+"""
+import collections
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+# Service times kept for the p95 in get_stats()
+STATS_WINDOW = 512
+# Set in the environment of inference processes. Under `python app.py` they
+# re-import app.py as __mp_main__, and app.py skips its startup side effects
+# (model preload, ingest runner, key point enricher) when this is set.
+CHILD_ENV = 'SENTIMENT_INFERENCE_CHILD'
+# Minimum seconds between replacing dead processes
+RESTART_INTERVAL_S = 5.0
+
+
+def is_inference_child():
+    return os.getenv(CHILD_ENV) == '1'
+
+
+def _inference_main(requests, results, threads, max_batch_items, parent_pid):
+    """Entry point of an inference process"""
+    os.environ['SENTIMENT_MICRO_BATCHING'] = 'false'
+    os.environ['SENTIMENT_TORCH_THREADS'] = str(threads)
+    # ONNX Runtime sizes its intra-op pool from the session options (onnx_sentiment.py)
+    if int(os.getenv('SENTIMENT_ONNX_THREADS', '0')) <= 0:
+        os.environ['SENTIMENT_ONNX_THREADS'] = str(threads)
+    os.environ.setdefault('OMP_NUM_THREADS', str(threads))
+    pid = os.getpid()
+
+    try:
+        import sentiment_analyzer
+        if sentiment_analyzer.get_sentiment_pipeline(allow_loading=True) is None:
+            raise RuntimeError("model failed to load")
+        # torch only when it serves the model: the ONNX image doesn't have it
+        if sentiment_analyzer.active_backend == 'torch':
+            import torch
+            torch.set_num_threads(threads)
+    except Exception as e:
+        results.put(('failed', pid, str(e)))
+        return
+    results.put(('ready', pid, sentiment_analyzer.get_model_version()))
+
+    while True:
+        try:
+            item = requests.get(timeout=1.0)
+        except queue.Empty:
+            # Exit with the gunicorn worker that owns us, even if it died without cleanup
+            if os.getppid() != parent_pid:
+                return
+            continue
+        if item is None:
+            return
+
+        # Merge whatever else is already queued into the same forward pass
+        batch = [item]
+        n_texts = len(item[1])
+        while n_texts < max_batch_items:
+            try:
+                item = requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                requests.put(None)
+                break
+            batch.append(item)
+            n_texts += len(item[1])
+
+        start = time.perf_counter()
+        texts = [text for _, batch_texts in batch for text in batch_texts]
+        sentiments = sentiment_analyzer._analyze_uncached_batch(texts)
+        service_s = time.perf_counter() - start
+
+        offset = 0
+        for request_id, batch_texts in batch:
+            results.put(('result', request_id, sentiments[offset:offset + len(batch_texts)], service_s))
+            offset += len(batch_texts)
+
+
+class _PendingRequest:
+    def __init__(self, n_texts):
+        self.n_texts = n_texts
+        self.submitted_at = time.perf_counter()
+        self.result = None
+        self.done = threading.Event()
+
+
+class InferencePool:
+    """
+    Pool of inference processes owned by one (gunicorn worker) process.
+    submit() blocks the calling thread until a process has scored the texts.
+    """
+
+    def __init__(self, num_processes=1, torch_threads=0, max_batch_items=32, timeout=60.0):
+        self.num_processes = max(1, num_processes)
+        self.torch_threads = torch_threads
+        self.max_batch_items = max(1, max_batch_items)
+        self.timeout = timeout
+        self.model_version = None
+        self._lock = threading.Lock()
+        self._owner_pid = None
+        self._processes = []
+        self._ready = set()
+        self._pending = {}
+        self._request_ids = itertools.count()
+        self._service_times = collections.deque(maxlen=STATS_WINDOW)
+        self._wait_times = collections.deque(maxlen=STATS_WINDOW)
+        self.requests_completed = 0
+        self.requests_timed_out = 0
+        self.texts_completed = 0
+        self.failures = []
+        self.restarts = 0
+        self._next_restart_at = 0.0
+
+    def start(self, num_workers=1):
+        """
+        Start the processes for the calling process (idempotent).
+        num_workers is the number of gunicorn workers sharing the machine; the
+        cores are split between all their inference processes.
+        """
+        with self._lock:
+            if self._owner_pid == os.getpid():
+                return
+            # Queues and the reader thread don't carry over a fork - start fresh
+            self._owner_pid = os.getpid()
+            self._processes = []
+            self._ready = set()
+            self._pending = {}
+            self.model_version = None
+
+            self._threads = self.torch_threads or max(1, (os.cpu_count() or 1) // (self.num_processes * max(1, num_workers)))
+            self._context = multiprocessing.get_context('spawn')
+            self._requests = self._context.Queue()
+            self._results = self._context.Queue()
+            self._processes = [self._spawn(i) for i in range(self.num_processes)]
+            threading.Thread(target=self._read_results, args=(self._results,), name="sentiment-inference-results", daemon=True).start()
+            print(f"[INFO] Started {self.num_processes} sentiment inference process(es), {self._threads} thread(s) each")
+
+    def _spawn(self, index):
+        # Spawned children re-import the main module (e.g. `python app.py`);
+        # the environment they inherit keeps that import from starting a pool
+        # or any of the app's background work (see CHILD_ENV)
+        previous = {name: os.environ.get(name) for name in ('SENTIMENT_INFERENCE_PROCESSES', CHILD_ENV)}
+        os.environ['SENTIMENT_INFERENCE_PROCESSES'] = '0'
+        os.environ[CHILD_ENV] = '1'
+        try:
+            process = self._context.Process(
+                target=_inference_main,
+                args=(self._requests, self._results, self._threads, self.max_batch_items, os.getpid()),
+                name=f"sentiment-inference-{index}",
+                daemon=True
+            )
+            process.start()
+            return process
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    def _replace_dead_processes(self):
+        """
+        Respawn processes that were killed or crashed (nonzero exit code). A
+        process whose model failed to load exits cleanly and stays down, so a
+        broken model doesn't restart in a loop.
+        """
+        if self._owner_pid != os.getpid() or time.monotonic() < self._next_restart_at:
+            return
+        with self._lock:
+            if self._owner_pid != os.getpid():
+                return
+            for index, process in enumerate(self._processes):
+                if process.is_alive() or process.exitcode in (None, 0):
+                    continue
+                self._ready.discard(process.pid)
+                print(f"[WARNING] Sentiment inference process {process.pid} mati (exit code {process.exitcode}), dijalankan ulang")
+                self._processes[index] = self._spawn(index)
+                self.restarts += 1
+                self._next_restart_at = time.monotonic() + RESTART_INTERVAL_S
+
+    def _read_results(self, results):
+        while True:
+            try:
+                message = results.get(timeout=1.0)
+            except queue.Empty:
+                # Doubles as the liveness check while no results come in
+                self._replace_dead_processes()
+                continue
+            kind = message[0]
+            if kind == 'result':
+                _, request_id, sentiments, service_s = message
+                with self._lock:
+                    pending = self._pending.pop(request_id, None)
+                if pending is None:
+                    continue
+                self._service_times.append(service_s)
+                self._wait_times.append(max(0.0, time.perf_counter() - pending.submitted_at - service_s))
+                self.requests_completed += 1
+                self.texts_completed += pending.n_texts
+                pending.result = sentiments
+                pending.done.set()
+            elif kind == 'ready':
+                _, pid, model_version = message
+                self._ready.add(pid)
+                self.model_version = model_version
+                print(f"[SUCCESS] Sentiment inference process {pid} siap ({model_version})")
+            elif kind == 'failed':
+                _, pid, error = message
+                self.failures.append(error)
+                print(f"[ERROR] Sentiment inference process {pid} gagal memuat model: {error}")
+
+    def is_ready(self):
+        """True once at least one living process has loaded the model"""
+        return self._owner_pid == os.getpid() and any(
+            process.pid in self._ready and process.is_alive() for process in self._processes
+        )
+
+    def submit(self, texts):
+        """
+        Score texts in an inference process.
+        Returns: list of sentiment dicts, or None if no process answered in time
+        """
+        self._replace_dead_processes()
+        pending = _PendingRequest(len(texts))
+        with self._lock:
+            request_id = next(self._request_ids)
+            self._pending[request_id] = pending
+        self._requests.put((request_id, list(texts)))
+        if not pending.done.wait(self.timeout):
+            with self._lock:
+                self._pending.pop(request_id, None)
+            self.requests_timed_out += 1
+            return None
+        return pending.result
+
+    def shutdown(self):
+        if self._owner_pid != os.getpid():
+            return
+        for _ in self._processes:
+            self._requests.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+
+    def get_stats(self):
+        service_ms = sorted(t * 1000 for t in self._service_times)
+        wait_ms = [t * 1000 for t in self._wait_times]
+        return {
+            'processes': len(self._processes),
+            'alive': sum(1 for process in self._processes if process.is_alive()),
+            'dead': sum(1 for process in self._processes if not process.is_alive()),
+            'restarts': self.restarts,
+            'ready': self.is_ready(),
+            'queue_depth': len(self._pending),
+            'requests': self.requests_completed,
+            'texts': self.texts_completed,
+            'timeouts': self.requests_timed_out,
+            'avg_service_ms': round(sum(service_ms) / len(service_ms), 2) if service_ms else 0.0,
+            'p95_service_ms': round(service_ms[int(len(service_ms) * 0.95)], 2) if service_ms else 0.0,
+            'avg_queue_wait_ms': round(sum(wait_ms) / len(wait_ms), 2) if wait_ms else 0.0
+        }
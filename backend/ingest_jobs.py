@@ -0,0 +1,337 @@
+"""
+Background ingestion of large review exports (CSV / JSONL).
+
+An upload is streamed to disk and becomes an ingest_job row (see app.py). An
+IngestRunner in each worker process claims queued jobs and reads the file
+lazily in chunks of INGEST_CHUNK_SIZE rows:
+
+    reader -> chunk -> analysis pool (sentiment batch + key point batch) -> ordered commit
+
+At most INGEST_MAX_INFLIGHT_CHUNKS chunks are in memory, so memory stays flat
+whatever the file size, and only INGEST_WORKERS chunks call the providers at
+a time. Before a chunk's key points are extracted the worker waits (up to
+INGEST_PROVIDER_WAIT_S) for a remote provider to have rate limit budget;
+after that the chunk is answered locally (TextRank / smart extraction).
+
+Chunks are committed strictly in file order, each in one transaction with
+the job's progress counter. After a restart the job is claimed again and
+resumes right after its last committed row. A job is held under a lease: a
+worker that stops heartbeating for INGEST_STALE_S loses it to another one.
+Only a problem with the file itself fails a job; any other error (a dropped
+database connection, a deadlock) hands the job back to the queue, so it
+resumes from its last committed chunk.
+"""
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from stage_limits import stage_slot
+
+# Column / key holding the review text, when the upload doesn't name one
+TEXT_FIELDS = ('review_text', 'review', 'text', 'content', 'comment', 'ulasan')
+FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(filename=None, content_type=None, requested=None):
+    """Returns: 'csv' or 'jsonl', or None if the upload's format can't be told"""
+    if requested:
+        requested = requested.lower()
+        return 'jsonl' if requested in ('jsonl', 'ndjson', 'json') else requested if requested in FORMATS else None
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    content_type = (content_type or '').lower()
+    if 'csv' in content_type:
+        return 'csv'
+    if 'ndjson' in content_type or 'jsonl' in content_type or 'json' in content_type:
+        return 'jsonl'
+    return None
+
+
+def _pick_field(names, text_field):
+    if text_field:
+        return text_field if text_field in names else None
+    lowered = {name.lower().strip(): name for name in names if isinstance(name, str)}
+    for candidate in TEXT_FIELDS:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+
+def resolve_csv_field(path, text_field=None):
+    """Returns: the CSV column with the review text, or None if the header has none"""
+    with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        header = next(csv.reader(f), [])
+    return _pick_field(header, text_field)
+
+
+def iter_review_texts(path, file_format, text_field=None, skip_rows=0):
+    """
+    Read the upload lazily, one row at a time.
+    Yields: the review text of every data row after the first skip_rows, or
+            None for a row without usable text (counted as failed)
+    """
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    if file_format == 'csv':
+        field = resolve_csv_field(path, text_field)
+        if field is None:
+            raise ValueError("Kolom review tidak ditemukan di header CSV")
+        with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+            for row_number, row in enumerate(csv.DictReader(f)):
+                if row_number >= skip_rows:
+                    yield row.get(field)
+        return
+
+    row_number = 0
+    with open(path, encoding='utf-8-sig', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row_number += 1
+            if row_number <= skip_rows:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield None
+                continue
+            if isinstance(item, str):
+                yield item
+            elif isinstance(item, dict):
+                field = _pick_field(list(item), text_field)
+                yield item.get(field) if field else None
+            else:
+                yield None
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_chunk(texts, key_points_mode='providers', provider_wait=30.0):
+    """
+    Sentiment + key points for one chunk.
+    Returns: (review rows for the bulk insert, number of rows without usable text)
+    """
+    from key_points_extractor import available_remote_providers, extract_key_points_batch, extract_key_points_local_batch
+    from sentiment_analyzer import analyze_sentiment_batch, analyze_sentiment_fast, is_model_ready
+
+    valid = [text.strip() for text in texts if isinstance(text, str) and text.strip()]
+    failed = len(texts) - len(valid)
+    if not valid:
+        return [], failed
+
+    # Each stage waits for a slot shared with the request paths (see stage_limits.py)
+    with stage_slot('sentiment'):
+        if is_model_ready():
+            sentiments = analyze_sentiment_batch(valid)
+        else:
+            sentiments = [analyze_sentiment_fast(text) for text in valid]
+
+    if key_points_mode == 'local':
+        key_points = extract_key_points_local_batch(valid)
+    else:
+        # Backpressure: wait for provider budget instead of spilling the chunk to the local fallback
+        deadline = time.monotonic() + provider_wait
+        while not available_remote_providers() and time.monotonic() < deadline:
+            time.sleep(1.0)
+        with stage_slot('key_points'):
+            key_points = extract_key_points_batch(valid)
+
+    rows = [
+        {
+            'review_text': text,
+            'sentiment': sentiment['label'],
+            'sentiment_score': sentiment.get('score', 0.0),
+            'sentiment_tier': sentiment.get('tier'),
+            'key_points': points
+        }
+        for text, sentiment, points in zip(valid, sentiments, key_points)
+    ]
+    return rows, failed
+
+
+class JobLeaseLost(Exception):
+    """Another worker took over the job (this one missed its heartbeats)"""
+
+
+class JobInputError(Exception):
+    """The uploaded file can't be read (missing, or malformed CSV / JSONL) - retrying won't help"""
+
+
+def _input_rows(job, skip_rows):
+    """iter_review_texts for the job, with problems in the file raised as JobInputError"""
+    try:
+        yield from iter_review_texts(job['file_path'], job['file_format'], job.get('text_field'), skip_rows=skip_rows)
+    except (OSError, ValueError, csv.Error) as e:
+        raise JobInputError(str(e)) from e
+
+
+class IngestRunner:
+    def __init__(self, chunk_size=200, workers=2, max_inflight=4, poll_interval=5.0, stale_after=300.0,
+                 provider_wait=30.0, model_wait=600.0, key_points_mode='providers', keep_files=False):
+        self.chunk_size = max(1, chunk_size)
+        self.workers = max(1, workers)
+        self.max_inflight = max(self.workers, max_inflight)
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.provider_wait = provider_wait
+        self.model_wait = model_wait
+        self.key_points_mode = key_points_mode
+        self.keep_files = keep_files
+        self.worker_id = None
+        self._store = None
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.current_job = None
+
+    def set_store(self, store):
+        """
+        store.claim_job(worker_id, stale_after) -> job dict or None
+        store.commit_chunk(job_id, worker_id, rows, processed, failed) -> False if the lease is lost
+        store.heartbeat(job_id, worker_id) -> False if the lease is lost
+        store.finish_job(job_id, worker_id, status, error=None)
+        store.release_job(job_id, worker_id)
+        """
+        self._store = store
+
+    def start(self):
+        """Start this process's runner thread (no-op if it's already running here)"""
+        if self._store is None or self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            threading.Thread(target=self._loop, name="ingest-runner", daemon=True).start()
+            print(f"[INFO] Ingest runner started ({self.worker_id})")
+
+    def notify(self):
+        """A job was queued - check now instead of at the next poll"""
+        self._wakeup.set()
+
+    def release(self):
+        """Requeue the job this process is running, so another worker resumes it right away"""
+        job_id = self.current_job
+        if job_id is not None and self._thread_pid == os.getpid():
+            self._store.release_job(job_id, self.worker_id)
+            print(f"[INFO] Ingest job {job_id} dikembalikan ke antrian")
+
+    def _loop(self):
+        while True:
+            job = None
+            try:
+                job = self._store.claim_job(self.worker_id, self.stale_after)
+            except Exception as e:
+                print(f"[WARNING] Ingest job claim gagal: {str(e)[:100]}")
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            try:
+                self._run(job)
+            except Exception as e:
+                # Never let one job take the runner thread down with it
+                print(f"[ERROR] Ingest job {job['id']} berhenti tak terduga: {e}")
+
+    def _wait_for_model(self, job):
+        from sentiment_analyzer import is_model_ready
+        deadline = time.monotonic() + self.model_wait
+        while not is_model_ready() and time.monotonic() < deadline:
+            # Rows scored by the fast classifier would stay that way - give the model time to load
+            if not self._store.heartbeat(job['id'], self.worker_id):
+                raise JobLeaseLost()
+            time.sleep(2.0)
+
+    def _commit_oldest(self, job, inflight):
+        count, future = inflight.popleft()
+        while True:
+            try:
+                rows, failed = future.result(timeout=self.stale_after / 3)
+                break
+            except TimeoutError:
+                # Still analyzing (providers are slow or rate limited) - keep the lease
+                if not self._store.heartbeat(job['id'], self.worker_id):
+                    raise JobLeaseLost()
+        if not self._store.commit_chunk(job['id'], self.worker_id, rows, count, failed):
+            raise JobLeaseLost()
+
+    def _run(self, job):
+        job_id = job['id']
+        skip = job['rows_processed']
+        print(f"[INFO] Ingest job {job_id} dimulai dari baris {skip}")
+        self.current_job = job_id
+        inflight = deque()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f'ingest-{job_id}')
+        try:
+            self._wait_for_model(job)
+            for chunk in _chunks(_input_rows(job, skip), self.chunk_size):
+                # Backpressure: never read further ahead than max_inflight chunks
+                while len(inflight) >= self.max_inflight:
+                    self._commit_oldest(job, inflight)
+                inflight.append((len(chunk), executor.submit(
+                    analyze_chunk, chunk, self.key_points_mode, self.provider_wait
+                )))
+            while inflight:
+                self._commit_oldest(job, inflight)
+            self._store.finish_job(job_id, self.worker_id, 'completed')
+            print(f"[SUCCESS] Ingest job {job_id} selesai")
+            if not self.keep_files:
+                try:
+                    os.remove(job['file_path'])
+                except OSError:
+                    pass
+        except JobLeaseLost:
+            print(f"[WARNING] Ingest job {job_id} diambil alih worker lain, dihentikan di sini")
+        except JobInputError as e:
+            print(f"[ERROR] Ingest job {job_id} gagal: {e}")
+            try:
+                self._store.finish_job(job_id, self.worker_id, 'failed', str(e)[:500])
+            except Exception as finish_error:
+                print(f"[WARNING] Status job {job_id} tidak dapat disimpan: {finish_error}")
+        except Exception as e:
+            # Transient (database, network): requeue, the next claim resumes after the last committed chunk
+            print(f"[WARNING] Ingest job {job_id} terhenti, akan dilanjutkan: {e}")
+            try:
+                self._store.release_job(job_id, self.worker_id)
+            except Exception as release_error:
+                # The lease expires after stale_after and the job is claimed again
+                print(f"[WARNING] Job {job_id} tidak dapat dikembalikan ke antrian: {release_error}")
+            # Don't reclaim it right away while the database is still down
+            self._wakeup.wait(self.poll_interval)
+        finally:
+            for _, future in inflight:
+                future.cancel()
+            executor.shutdown(wait=False)
+            self.current_job = None
+
+
+ingest_runner = IngestRunner(
+    chunk_size=int(os.getenv('INGEST_CHUNK_SIZE', '200')),
+    workers=int(os.getenv('INGEST_WORKERS', '2')),
+    max_inflight=int(os.getenv('INGEST_MAX_INFLIGHT_CHUNKS', '4')),
+    poll_interval=float(os.getenv('INGEST_POLL_S', '5')),
+    stale_after=float(os.getenv('INGEST_STALE_S', '300')),
+    provider_wait=float(os.getenv('INGEST_PROVIDER_WAIT_S', '30')),
+    model_wait=float(os.getenv('INGEST_MODEL_WAIT_S', '600')),
+    key_points_mode=os.getenv('INGEST_KEY_POINTS_MODE', 'providers').lower(),
+    keep_files=os.getenv('INGEST_KEEP_FILES', 'false').lower() == 'true'
+)
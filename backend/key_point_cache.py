@@ -0,0 +1,130 @@
+"""
+Two-level cache for provider key point answers.
+
+Level 1 is an in-process LRUResultCache (microseconds). Level 2 is the
+key_point_cache table (see app.py), so answers survive deploys and restarts
+and are shared by all workers. Both are keyed on the normalized review text,
+the provider and the prompt version: the same review re-submitted with other
+whitespace or casing doesn't trigger another paid LLM call, and changing the
+prompts (KEY_POINTS_PROMPT_VERSION) starts over.
+"""
+import os
+import threading
+
+from result_cache import LRUResultCache, text_hash
+
+
+class KeyPointResultCache:
+    def __init__(self, max_size=4096, ttl_seconds=30 * 86400, db_max_rows=100000, prune_every=500):
+        # Level 1 entry per review: {provider: key_points}
+        self.memory = LRUResultCache(max_size=max_size, ttl_seconds=ttl_seconds, name='key_points')
+        self.ttl_seconds = ttl_seconds
+        self.db_max_rows = db_max_rows
+        self.prune_every = max(1, prune_every)
+        self._store = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.lookups = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.db_errors = 0
+
+    def set_store(self, store):
+        """
+        store.get_many(cache_keys, max_age_seconds) -> {cache_key: key_points}
+        store.put(cache_key, provider, prompt_version, key_points)
+        store.prune(max_rows, max_age_seconds)
+        """
+        self._store = store
+
+    @property
+    def enabled(self):
+        return self.memory.enabled
+
+    @staticmethod
+    def cache_key(text, provider, prompt_version):
+        return text_hash(text, provider, prompt_version)
+
+    def get(self, text, providers, prompt_version):
+        """
+        Returns: (provider, key_points) of the highest priority provider with a
+                 cached answer, or None
+        """
+        if not self.enabled or not providers:
+            return None
+        with self._lock:
+            self.lookups += 1
+        review_key = text_hash(text, prompt_version)
+
+        answers = self.memory.get(review_key) or {}
+        for provider in providers:
+            if provider in answers:
+                with self._lock:
+                    self.memory_hits += 1
+                return provider, answers[provider]
+
+        if self._store is None:
+            return None
+        keys = {self.cache_key(text, provider, prompt_version): provider for provider in providers}
+        try:
+            rows = self._store.get_many(list(keys), self.ttl_seconds)
+        except Exception as e:
+            with self._lock:
+                self.db_errors += 1
+            print(f"[WARNING] Key point cache lookup gagal: {str(e)[:100]}")
+            return None
+        found = {keys[cache_key]: key_points for cache_key, key_points in rows.items()}
+        for provider in providers:
+            if provider in found:
+                with self._lock:
+                    self.db_hits += 1
+                self._remember(review_key, provider, found[provider])
+                return provider, found[provider]
+        return None
+
+    def _remember(self, review_key, provider, key_points):
+        answers = self.memory.get(review_key) or {}
+        answers[provider] = key_points
+        self.memory.set(review_key, answers)
+
+    def put(self, text, provider, prompt_version, key_points):
+        if not self.enabled:
+            return
+        self._remember(text_hash(text, prompt_version), provider, key_points)
+        if self._store is None:
+            return
+        try:
+            self._store.put(self.cache_key(text, provider, prompt_version), provider, prompt_version, key_points)
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % self.prune_every == 0
+            if prune:
+                self._store.prune(self.db_max_rows, self.ttl_seconds)
+        except Exception as e:
+            with self._lock:
+                self.db_errors += 1
+            print(f"[WARNING] Key point cache simpan gagal: {str(e)[:100]}")
+
+    def get_stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            return {
+                'enabled': self.enabled,
+                'persistent': self._store is not None,
+                'lookups': self.lookups,
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'misses': self.lookups - hits,
+                'hit_ratio': round(hits / self.lookups, 4) if self.lookups else 0.0,
+                'memory_hit_ratio': round(self.memory_hits / self.lookups, 4) if self.lookups else 0.0,
+                'db_errors': self.db_errors,
+                'memory_size': self.memory.get_stats()['size'],
+                'memory_evictions': self.memory.evictions
+            }
+
+
+key_point_cache = KeyPointResultCache(
+    max_size=int(os.getenv('KEY_POINTS_CACHE_SIZE', '4096')) if os.getenv('KEY_POINTS_CACHE_ENABLED', 'true').lower() == 'true' else 0,
+    ttl_seconds=float(os.getenv('KEY_POINTS_CACHE_TTL_SECONDS', str(30 * 86400))),
+    db_max_rows=int(os.getenv('KEY_POINTS_CACHE_DB_MAX_ROWS', '100000'))
+)
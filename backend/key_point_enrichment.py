@@ -0,0 +1,149 @@
+"""
+Deferred key point enrichment.
+
+With deferred key points /api/analyze-review saves the review with its
+sentiment and key_points_status='pending' plus a key_point_job row, and
+answers in sentiment time. The KeyPointEnricher in each worker process picks
+up due jobs, extracts their key points as one batch (Groq batch prompt, then
+the usual provider failover) and stores them with key_points_status='done'.
+
+While no remote provider has rate limit budget (or breakers are open) jobs
+are rescheduled with exponential backoff instead of being answered locally;
+after ENRICH_MAX_ATTEMPTS they get local key points (TextRank / smart
+extraction) so nothing stays pending forever. Claimed jobs are leased for
+ENRICH_LEASE_S, so jobs of a worker that died are picked up again.
+"""
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from stage_limits import stage_slot
+
+
+class KeyPointEnricher:
+    def __init__(self, batch_size=10, workers=2, poll_interval=10.0, lease=120.0, max_attempts=5,
+                 retry_base=5.0, retry_max=300.0):
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.worker_id = None
+        self.stats = {'enriched': 0, 'local': 0, 'retried': 0, 'errors': 0}
+        self._store = None
+        self._thread_pid = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def set_store(self, store):
+        """
+        store.claim_jobs(worker_id, limit, lease) -> [{'review_id', 'review_text', 'attempts'}, ...]
+        store.complete(review_id, key_points)
+        store.retry(review_id, delay, error)
+        """
+        self._store = store
+
+    def start(self):
+        """Start this process's enrichment thread (no-op if it's already running here)"""
+        if self._store is None or self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='enrich')
+            threading.Thread(target=self._loop, name="key-point-enricher", daemon=True).start()
+            print(f"[INFO] Key point enricher started ({self.worker_id})")
+
+    def notify(self):
+        """A review was queued - claim it now instead of at the next poll"""
+        self._wakeup.set()
+
+    def get_stats(self):
+        return dict(self.stats)
+
+    def retry_delay(self, attempts):
+        """Returns: seconds until attempt number attempts + 1"""
+        return min(self.retry_max, self.retry_base * (2 ** max(0, attempts - 1)))
+
+    def _loop(self):
+        inflight = []
+        while True:
+            inflight = [future for future in inflight if not future.done()]
+            jobs = []
+            if len(inflight) < self.workers:
+                try:
+                    jobs = self._store.claim_jobs(self.worker_id, self.batch_size, self.lease)
+                except Exception as e:
+                    print(f"[WARNING] Key point job claim gagal: {str(e)[:100]}")
+            if jobs:
+                inflight.append(self._executor.submit(self._enrich, jobs))
+                continue
+            self._wakeup.wait(self.poll_interval if len(inflight) < self.workers else 1.0)
+            self._wakeup.clear()
+
+    def _enrich(self, jobs):
+        from key_points_extractor import available_remote_providers, extract_key_points_batch, extract_key_points_local_batch
+
+        remote = []
+        local = []
+        for job in jobs:
+            # attempts counts this claim too
+            if job['attempts'] >= self.max_attempts:
+                local.append(job)
+            else:
+                remote.append(job)
+
+        if remote and not available_remote_providers():
+            # Providers are rate limited or down: try again later instead of settling for local key points
+            for job in remote:
+                self._retry(job, "Tidak ada provider yang tersedia")
+            remote = []
+
+        for batch, extract in ((remote, extract_key_points_batch), (local, extract_key_points_local_batch)):
+            if not batch:
+                continue
+            try:
+                if batch is remote:
+                    # Provider calls share the per-kind cap with the request paths (see stage_limits.py)
+                    with stage_slot('key_points'):
+                        results = extract([job['review_text'] for job in batch])
+                else:
+                    results = extract([job['review_text'] for job in batch])
+            except Exception as e:
+                print(f"[WARNING] Key point enrichment gagal: {str(e)[:100]}")
+                for job in batch:
+                    self._retry(job, str(e))
+                continue
+            for job, key_points in zip(batch, results):
+                try:
+                    self._store.complete(job['review_id'], key_points)
+                    self.stats['local' if batch is local else 'enriched'] += 1
+                except Exception as e:
+                    print(f"[WARNING] Key points review {job['review_id']} tidak dapat disimpan: {str(e)[:100]}")
+                    self.stats['errors'] += 1
+
+    def _retry(self, job, error):
+        self.stats['retried'] += 1
+        try:
+            self._store.retry(job['review_id'], self.retry_delay(job['attempts']), error[:500])
+        except Exception as e:
+            # The lease runs out and the job is claimed again
+            print(f"[WARNING] Retry review {job['review_id']} tidak dapat dijadwalkan: {str(e)[:100]}")
+            self.stats['errors'] += 1
+
+
+key_point_enricher = KeyPointEnricher(
+    batch_size=int(os.getenv('ENRICH_BATCH_SIZE', '10')),
+    workers=int(os.getenv('ENRICH_WORKERS', '2')),
+    poll_interval=float(os.getenv('ENRICH_POLL_S', '10')),
+    lease=float(os.getenv('ENRICH_LEASE_S', '120')),
+    max_attempts=int(os.getenv('ENRICH_MAX_ATTEMPTS', '5')),
+    retry_base=float(os.getenv('ENRICH_RETRY_BASE_S', '5')),
+    retry_max=float(os.getenv('ENRICH_RETRY_MAX_S', '300'))
+)
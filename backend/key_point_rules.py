@@ -0,0 +1,247 @@
+"""
+Rule engine behind extract_key_points_simple (key point extraction without AI).
+
+Keywords live in KEY_POINT_LEXICON and the bullets in declarative rule tables.
+The lexicon is compiled once into a LexiconMatcher, so every sentence is
+scanned in a single pass and the rules only look up categories in the
+resulting set. Keywords match as substrings of the lowercased sentence, the
+same as the `keyword in sentence_lower` checks this replaces.
+
+check_key_point_rules.py compares the engine against key_points_golden.json.
+"""
+import re
+
+from lexicon_matcher import LexiconMatcher
+
+KEY_POINT_LEXICON = {
+    # A sentence needs one of these six categories to produce a key point
+    'positive': [
+        'bagus', 'baik', 'excellent', 'sempurna', 'perfect', 'menakjubkan', 'amazing',
+        'recommended', 'rekomendasi', 'puas', 'satisfied', 'senang', 'happy',
+        'worth', 'layak', 'value', 'nilai', 'mantap', 'top', 'terbaik', 'best',
+        'cepat', 'fast', 'efisien', 'efficient', 'mudah', 'easy', 'simple'
+    ],
+    'negative': [
+        'buruk', 'jelek', 'bad', 'disappointed', 'kecewa', 'tidak puas', 'unsatisfied',
+        'lambat', 'slow', 'rusak', 'broken', 'cacat', 'defect', 'masalah', 'problem',
+        'mahal', 'expensive', 'overpriced', 'tidak layak', 'not worth', 'waste',
+        'menyesal', 'regret', 'tidak recommended', 'tidak rekomendasi', 'weird', 'strange', 'aneh'
+    ],
+    'quality': [
+        'kualitas', 'quality', 'bahan', 'material', 'build', 'konstruksi',
+        'awet', 'durable', 'tahan lama', 'long lasting', 'sturdy', 'kokoh'
+    ],
+    'feature': [
+        'fitur', 'feature', 'fungsi', 'function', 'spesifikasi', 'spec',
+        'desain', 'design', 'tampilan', 'appearance', 'warna', 'color'
+    ],
+    'service': [
+        'pengiriman', 'shipping', 'delivery', 'pelayanan', 'service', 'customer service',
+        'packaging', 'kemasan', 'garansi', 'warranty', 'support', 'dukungan'
+    ],
+    'price': [
+        'harga', 'price', 'biaya', 'cost', 'murah', 'cheap', 'affordable', 'terjangkau',
+        'mahal', 'expensive', 'worth', 'layak', 'value', 'nilai', 'budget'
+    ],
+
+    # Used by the rules
+    'attractive': ['menarik', 'attractive', 'interesting'],
+    'addicted': ['ketagihan', 'addicted'],
+    'liked': ['suka', 'like', 'love', 'sangat suka'],
+    'smell': ['bau', 'smell', 'aroma'],
+    'smell_off': ['aneh', 'tidak enak', 'busuk', 'weird'],
+    'taste': ['rasa', 'taste', 'enak', 'dimakan', 'diminum'],
+    'fast': ['cepat', 'fast'],
+    'slow': ['lambat', 'slow'],
+    'pricey': ['mahal', 'expensive'],
+    'cheap': ['murah', 'cheap'],
+    'bad_quality': ['jelek', 'buruk'],
+    'odd': ['aneh', 'weird'],
+    'sensory': ['bau', 'smell', 'aroma', 'rasa', 'taste'],
+
+    # Short reviews (< 50 characters) without any sentence key point
+    'short_good': ['bagus', 'baik', 'good', 'great', 'excellent', 'mantap'],
+    'short_bad': ['jelek', 'buruk', 'bad', 'terrible'],
+    'short_price': ['harga', 'price', 'murah', 'mahal', 'cheap', 'expensive'],
+    'short_pricey': ['mahal', 'expensive', 'overpriced'],
+    'short_cheap': ['murah', 'cheap', 'affordable'],
+    'delivery': ['pengiriman', 'delivery', 'shipping'],
+}
+
+TRIGGER_CATEGORIES = frozenset(['positive', 'negative', 'quality', 'feature', 'service', 'price'])
+
+# Point that lists the sentence's first words instead of a fixed phrase
+KEY_WORDS = object()
+
+# Rules are (category, outcomes); outcomes are (condition, point) pairs and the
+# first one whose condition category is present (None = always) gives the
+# point. A None point adds nothing.
+#
+# Sentences: the first rule whose category is present decides the sentence's point.
+SENTENCE_RULES = [
+    ('attractive', [(None, "Produk menarik")]),
+    ('addicted', [(None, "Ketagihan")]),
+    ('liked', [(None, "Disukai")]),
+    ('quality', [('negative', "Kualitas buruk"), ('positive', "Kualitas baik"), (None, None)]),
+    ('smell', [('smell_off', "Bau tidak normal"), (None, "Bau produk")]),
+    ('taste', [('negative', "Rasa tidak enak"), (None, "Rasa enak")]),
+    ('service', [('fast', "Pengiriman cepat"), ('slow', "Pengiriman lambat"), (None, "Layanan")]),
+    ('price', [('pricey', "Harga mahal"), ('cheap', "Harga murah"), (None, "Harga")]),
+    ('feature', [(None, "Fitur produk")]),
+    ('negative', [('bad_quality', "Kualitas buruk"), ('odd', "Tidak normal"), (None, KEY_WORDS)]),
+    ('positive', [(None, "Positif")]),
+]
+
+# Short reviews: every rule whose category is present adds its point
+SHORT_REVIEW_RULES = [
+    ('attractive', [(None, "Produk menarik")]),
+    ('addicted', [(None, "Ketagihan")]),
+    ('liked', [(None, "Disukai")]),
+    ('short_good', [(None, "Kualitas baik")]),
+    ('short_bad', [(None, "Kualitas buruk")]),
+    ('smell', [('smell_off', "Bau tidak normal")]),
+    ('short_price', [('short_pricey', "Harga mahal"), ('short_cheap', "Harga murah")]),
+    ('delivery', [('fast', "Pengiriman cepat"), ('slow', "Pengiriman lambat")]),
+]
+
+# Last resort: sentences are labeled with the first matching rule
+LABEL_RULES = [
+    ('sensory', [(None, "[KUALITAS BAU & RASA]")]),
+    ('negative', [(None, "[KUALITAS]")]),
+    ('positive', [(None, "[KUALITAS]")]),
+]
+DEFAULT_LABEL = "[INFORMASI]"
+
+MAX_POINTS = 5
+MIN_POINTS = 3
+MIN_SENTENCE_LENGTH = 15
+SHORT_REVIEW_LENGTH = 50
+
+SENTENCE_SPLIT = re.compile(r'[.!?]\s+')
+
+
+def _outcome(outcomes, categories):
+    for condition, point in outcomes:
+        if condition is None or condition in categories:
+            return point
+    return None
+
+
+class KeyPointRuleEngine:
+    def __init__(self, lexicon=KEY_POINT_LEXICON, sentence_rules=SENTENCE_RULES,
+                 short_review_rules=SHORT_REVIEW_RULES, label_rules=LABEL_RULES):
+        self.matcher = LexiconMatcher(lexicon)
+        self.sentence_rules = sentence_rules
+        self.short_review_rules = short_review_rules
+        self.label_rules = label_rules
+
+    def _categories(self, text, memo):
+        if memo is None:
+            return self.matcher.match(text.lower())
+        categories = memo.get(text)
+        if categories is None:
+            categories = memo[text] = self.matcher.match(text.lower())
+        return categories
+
+    def _sentence_point(self, sentence, categories):
+        """Returns: the sentence's point, or None when its rule adds nothing"""
+        for category, outcomes in self.sentence_rules:
+            if category in categories:
+                point = _outcome(outcomes, categories)
+                if point is KEY_WORDS:
+                    words = [w for w in sentence.split() if len(w) > 3][:3]
+                    point = ' '.join(words)
+                return point
+        # Unreachable with the default tables (every trigger category has a rule)
+        words = [w for w in sentence.split() if len(w) > 2][:5]
+        return ' '.join(words) if words else sentence[:30]
+
+    def extract(self, text, memo=None):
+        """
+        Returns: 3-5 key points as "• point" lines (fewer for short reviews).
+        memo caches sentence categories across calls (see extract_many).
+        """
+        text = text.strip()
+        if not text:
+            return "Tidak ada teks untuk dianalisis"
+
+        sentences = [s.strip() for s in SENTENCE_SPLIT.split(text) if s.strip()]
+        key_points = []
+        seen_sentences = set()
+
+        # Priority 1: sentences with important keywords
+        for sentence in sentences:
+            if len(sentence) < MIN_SENTENCE_LENGTH:
+                continue
+            categories = self._categories(sentence, memo)
+            if not categories & TRIGGER_CATEGORIES:
+                continue
+            point = self._sentence_point(sentence, categories)
+            if point is not None:
+                key_points.append(f"• {point}")
+            seen_sentences.add(sentence)
+            if len(key_points) >= MAX_POINTS:
+                break
+
+        # Priority 2: sentences that look informative (numbers or long)
+        if len(key_points) < MIN_POINTS:
+            for sentence in sentences:
+                if len(sentence) > 30 and sentence not in seen_sentences and (
+                        len(sentence) > 50 or any(char.isdigit() for char in sentence)):
+                    key_points.append(f"• {sentence}")
+                    seen_sentences.add(sentence)
+                    if len(key_points) >= MAX_POINTS:
+                        break
+
+        if key_points:
+            # Top up to 3 points with the remaining sentences
+            if len(key_points) < MIN_POINTS and len(sentences) > len(key_points):
+                for sentence in sentences:
+                    if len(key_points) >= MAX_POINTS:
+                        break
+                    if sentence not in seen_sentences and len(sentence) > 20:
+                        if len(sentence) > 80:
+                            sentence = sentence[:80] + '...'
+                        key_points.append(f"• {sentence}")
+                        seen_sentences.add(sentence)
+            return "\n".join(key_points[:MAX_POINTS])
+
+        if len(text) < SHORT_REVIEW_LENGTH:
+            categories = self._categories(text, memo)
+            short_points = []
+            for category, outcomes in self.short_review_rules:
+                if category in categories:
+                    point = _outcome(outcomes, categories)
+                    if point is not None:
+                        short_points.append(f"• {point}")
+            if short_points:
+                return "\n".join(short_points[:MAX_POINTS])
+            words = text.split()
+            if len(text) > 5 and len(words) >= 3:
+                # Up to three points of three words each
+                return "\n".join(f"• {' '.join(words[i:i + 3])}" for i in range(0, min(len(words), 9), 3))
+            return f"• {text}"
+
+        meaningful = [s for s in sentences if len(s) > 20][:3]
+        if meaningful:
+            labeled = []
+            for sentence in meaningful:
+                categories = self._categories(sentence, memo)
+                label = next(
+                    (_outcome(outcomes, categories) for category, outcomes in self.label_rules if category in categories),
+                    DEFAULT_LABEL
+                )
+                labeled.append(f"{label}: {sentence}")
+            return "\n".join(labeled)
+        return "Tidak ada poin penting yang dapat diekstrak dari review ini"
+
+    def extract_many(self, texts):
+        """
+        Key points for a list of reviews, in order. Sentence categories are
+        shared across the batch, so repeated sentences are only scanned once.
+        """
+        memo = {}
+        return [self.extract(text, memo) for text in texts]
+
+
+key_point_rules = KeyPointRuleEngine()
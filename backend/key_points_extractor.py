@@ -1,267 +1,75 @@
-import google.generativeai as genai
+import collections
+import json
 import os
-import requests
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 
+from circuit_breaker import CircuitOpenError, QuotaExceededError, get_breaker, parse_retry_after
+from gemini_client import gemini_registry
+from key_point_cache import key_point_cache
+from key_point_rules import key_point_rules
+from textrank_extractor import textrank
+from rate_limiter import RateLimitedError, rate_limiter
+from provider_client import get_provider_client
+
 load_dotenv()
 
+# Part of the key point cache key: bump when the provider prompts change
+KEY_POINTS_PROMPT_VERSION = 'v1'
+
+# Returned by Gemini when it produced no text; never cached
+NO_KEY_POINTS_MESSAGE = "Tidak dapat mengekstrak poin penting"
+
+GROQ_MODEL = "llama-3.1-8b-instant"  # Free tier model
+
+# Points saying something is NOT mentioned in the review are dropped
+IRRELEVANT_POINT_PHRASES = [
+    "tidak ada komentar", "tidak disebutkan", "tidak ada", "no comment",
+    "not mentioned", "not discussed", "nothing about", "no mention",
+    "tidak ada informasi", "no information"
+]
+
+# Provider answers containing these are apologies / refusals, not key points
+# (checked in both Indonesian and English)
+INVALID_RESPONSE_PHRASES = [
+    "maaf", "saya tidak dapat", "tidak dapat melihat",
+    "silakan", "berikan review", "tuliskan review", "saya tidak bisa",
+    "sorry", "i cannot", "i can't", "cannot see", "please provide",
+    "please give", "i don't see", "i do not see", "unable to see"
+]
+
+
+def _is_invalid_response(content):
+    """True if a provider answer is empty or an apology instead of key points"""
+    if not content or not content.strip():
+        return True
+    content_lower = content.lower()
+    return any(phrase in content_lower for phrase in INVALID_RESPONSE_PHRASES)
+
 
 def extract_key_points_simple(text):
     """
     Smart key points extraction without AI (when Gemini quota is exhausted).
-    Uses pattern matching and keyword extraction to identify important points.
+    Uses pattern matching and keyword extraction to identify important points
+    (rules and keywords: key_point_rules.py).
     """
-    import re
-    
-    # Clean text
-    text = text.strip()
-    if not text:
-        return "Tidak ada teks untuk dianalisis"
-    
-    # Split into sentences (handle multiple delimiters)
-    sentences = re.split(r'[.!?]\s+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    
-    # Comprehensive keyword categories
-    positive_keywords = [
-        'bagus', 'baik', 'excellent', 'sempurna', 'perfect', 'menakjubkan', 'amazing',
-        'recommended', 'rekomendasi', 'puas', 'satisfied', 'senang', 'happy',
-        'worth', 'layak', 'value', 'nilai', 'mantap', 'top', 'terbaik', 'best',
-        'cepat', 'fast', 'efisien', 'efficient', 'mudah', 'easy', 'simple'
-    ]
-    
-    negative_keywords = [
-        'buruk', 'jelek', 'bad', 'disappointed', 'kecewa', 'tidak puas', 'unsatisfied',
-        'lambat', 'slow', 'rusak', 'broken', 'cacat', 'defect', 'masalah', 'problem',
-        'mahal', 'expensive', 'overpriced', 'tidak layak', 'not worth', 'waste',
-        'menyesal', 'regret', 'tidak recommended', 'tidak rekomendasi', 'weird', 'strange', 'aneh'
-    ]
-    
-    quality_keywords = [
-        'kualitas', 'quality', 'bahan', 'material', 'build', 'konstruksi',
-        'awet', 'durable', 'tahan lama', 'long lasting', 'sturdy', 'kokoh'
-    ]
-    
-    feature_keywords = [
-        'fitur', 'feature', 'fungsi', 'function', 'spesifikasi', 'spec',
-        'desain', 'design', 'tampilan', 'appearance', 'warna', 'color'
-    ]
-    
-    service_keywords = [
-        'pengiriman', 'shipping', 'delivery', 'pelayanan', 'service', 'customer service',
-        'packaging', 'kemasan', 'garansi', 'warranty', 'support', 'dukungan'
-    ]
-    
-    price_keywords = [
-        'harga', 'price', 'biaya', 'cost', 'murah', 'cheap', 'affordable', 'terjangkau',
-        'mahal', 'expensive', 'worth', 'layak', 'value', 'nilai', 'budget'
-    ]
-    
-    all_keywords = positive_keywords + negative_keywords + quality_keywords + feature_keywords + service_keywords + price_keywords
-    
-    # Extract key points
-    key_points = []
-    seen_sentences = set()  # Avoid duplicates
-    
-    # Priority 1: Sentences with important keywords
-    for sentence in sentences:
-        if len(sentence) < 15:  # Skip very short sentences
-            continue
-            
-        sentence_lower = sentence.lower()
-        
-        # Check for important keywords
-        found_keywords = []
-        for keyword in all_keywords:
-            if keyword.lower() in sentence_lower:
-                found_keywords.append(keyword)
-        
-        if found_keywords:
-            # Analyze and categorize the sentence with more context
-            category = ""
-            analysis = ""
-            
-            # Make points only - no explanations
-            if any(kw in sentence_lower for kw in ['menarik', 'attractive', 'interesting']):
-                key_points.append("• Produk menarik")
-            elif any(kw in sentence_lower for kw in ['ketagihan', 'addicted']):
-                key_points.append("• Ketagihan")
-            elif any(kw in sentence_lower for kw in ['suka', 'like', 'love', 'sangat suka']):
-                key_points.append("• Disukai")
-            elif any(kw in sentence_lower for kw in quality_keywords):
-                if any(kw in sentence_lower for kw in negative_keywords):
-                    key_points.append("• Kualitas buruk")
-                elif any(kw in sentence_lower for kw in positive_keywords):
-                    key_points.append("• Kualitas baik")
-            elif any(kw in sentence_lower for kw in ['bau', 'smell', 'aroma']):
-                if any(kw in sentence_lower for kw in ['aneh', 'tidak enak', 'busuk', 'weird']):
-                    key_points.append("• Bau tidak normal")
-                else:
-                    key_points.append("• Bau produk")
-            elif any(kw in sentence_lower for kw in ['rasa', 'taste', 'enak', 'dimakan', 'diminum']):
-                if any(kw in sentence_lower for kw in negative_keywords):
-                    key_points.append("• Rasa tidak enak")
-                else:
-                    key_points.append("• Rasa enak")
-            elif any(kw in sentence_lower for kw in service_keywords):
-                if any(kw in sentence_lower for kw in ['cepat', 'fast']):
-                    key_points.append("• Pengiriman cepat")
-                elif any(kw in sentence_lower for kw in ['lambat', 'slow']):
-                    key_points.append("• Pengiriman lambat")
-                else:
-                    key_points.append("• Layanan")
-            elif any(kw in sentence_lower for kw in price_keywords):
-                if any(kw in sentence_lower for kw in ['mahal', 'expensive']):
-                    key_points.append("• Harga mahal")
-                elif any(kw in sentence_lower for kw in ['murah', 'cheap']):
-                    key_points.append("• Harga murah")
-                else:
-                    key_points.append("• Harga")
-            elif any(kw in sentence_lower for kw in feature_keywords):
-                key_points.append("• Fitur produk")
-            elif any(kw in sentence_lower for kw in negative_keywords):
-                if 'jelek' in sentence_lower or 'buruk' in sentence_lower:
-                    key_points.append("• Kualitas buruk")
-                elif 'aneh' in sentence_lower or 'weird' in sentence_lower:
-                    key_points.append("• Tidak normal")
-                else:
-                    # Extract key words only
-                    words = [w for w in sentence.split() if len(w) > 3][:3]
-                    key_points.append(f"• {' '.join(words)}")
-            elif any(kw in sentence_lower for kw in positive_keywords):
-                key_points.append("• Positif")
-            else:
-                # Extract key words only - max 5 words
-                words = [w for w in sentence.split() if len(w) > 2][:5]
-                if words:
-                    key_points.append(f"• {' '.join(words)}")
-                else:
-                    key_points.append(f"• {sentence[:30]}")
-            
-            if sentence not in seen_sentences:
-                seen_sentences.add(sentence)
-                
-                # Limit to 5 points max
-                if len(key_points) >= 5:
-                    break
-    
-    # Priority 2: If not enough key points, add meaningful sentences
-    if len(key_points) < 3:
-        for sentence in sentences:
-            if len(sentence) > 30 and sentence not in seen_sentences:
-                # Check if sentence seems important (has numbers, specific terms, etc.)
-                if any(char.isdigit() for char in sentence) or len(sentence) > 50:
-                    key_points.append(f"• {sentence}")
-                    seen_sentences.add(sentence)
-                    if len(key_points) >= 5:
-                        break
-    
-    # Format output - ensure 3-5 points
-    if key_points:
-        # Ensure we have at least 3 points if possible
-        if len(key_points) < 3 and len(sentences) > len(key_points):
-            # Try to add more points from remaining sentences
-            for sentence in sentences:
-                if len(key_points) >= 5:
-                    break
-                if sentence not in seen_sentences and len(sentence) > 20:
-                    # Make it concise
-                    if len(sentence) > 80:
-                        sentence = sentence[:80] + '...'
-                    key_points.append(f"• {sentence}")
-                    seen_sentences.add(sentence)
-        
-        # Return 3-5 points
-        result = "\n".join(key_points[:5])
-        return result
-    else:
-        # For very short reviews, extract what we can
-        if len(text.strip()) < 50:
-            # Try to extract sentiment and key words from short text
-            text_lower = text.lower()
-            short_points = []
-            
-            # Analyze short reviews more intelligently - points only, no explanations
-            if any(word in text_lower for word in ['menarik', 'attractive', 'interesting']):
-                short_points.append("• Produk menarik")
-            if any(word in text_lower for word in ['ketagihan', 'addicted']):
-                short_points.append("• Ketagihan")
-            if any(word in text_lower for word in ['suka', 'like', 'love', 'sangat suka']):
-                short_points.append("• Disukai")
-            if any(word in text_lower for word in ['bagus', 'baik', 'good', 'great', 'excellent', 'mantap']):
-                short_points.append("• Kualitas baik")
-            if any(word in text_lower for word in ['jelek', 'buruk', 'bad', 'terrible']):
-                short_points.append("• Kualitas buruk")
-            if any(word in text_lower for word in ['bau', 'smell', 'aroma']) and any(word in text_lower for word in ['aneh', 'tidak enak', 'busuk', 'weird']):
-                short_points.append("• Bau tidak normal")
-            
-            # Check for specific aspects - points only
-            if any(word in text_lower for word in ['harga', 'price', 'murah', 'mahal', 'cheap', 'expensive']):
-                if any(word in text_lower for word in ['mahal', 'expensive', 'overpriced']):
-                    short_points.append("• Harga mahal")
-                elif any(word in text_lower for word in ['murah', 'cheap', 'affordable']):
-                    short_points.append("• Harga murah")
-            
-            if any(word in text_lower for word in ['pengiriman', 'delivery', 'shipping']):
-                if any(word in text_lower for word in ['cepat', 'fast']):
-                    short_points.append("• Pengiriman cepat")
-                elif any(word in text_lower for word in ['lambat', 'slow']):
-                    short_points.append("• Pengiriman lambat")
-            
-            # Ensure 3-5 points
-            if short_points:
-                # Limit to 5 points max
-                return "\n".join(short_points[:5])
-            else:
-                # Fallback: extract key words
-                if len(text.strip()) > 5:
-                    # Split into meaningful parts
-                    words = text.strip().split()
-                    if len(words) >= 3:
-                        return f"• {' '.join(words[:3])}\n• {' '.join(words[3:6]) if len(words) > 3 else ''}\n• {' '.join(words[6:9]) if len(words) > 6 else ''}".trim()
-                    return f"• {text.strip()}"
-                return f"• {text.strip()}"
-        
-        # Last resort: return first meaningful sentences with better formatting
-        meaningful = [s for s in sentences if len(s) > 20][:3]
-        if meaningful:
-            formatted_points = []
-            for s in meaningful:
-                # Try to categorize
-                s_lower = s.lower()
-                if any(kw in s_lower for kw in ['bau', 'smell', 'aroma', 'rasa', 'taste']):
-                    formatted_points.append(f"[KUALITAS BAU & RASA]: {s}")
-                elif any(kw in s_lower for kw in negative_keywords):
-                    formatted_points.append(f"[KUALITAS]: {s}")
-                elif any(kw in s_lower for kw in positive_keywords):
-                    formatted_points.append(f"[KUALITAS]: {s}")
-                else:
-                    formatted_points.append(f"[INFORMASI]: {s}")
-            return "\n".join(formatted_points)
-        return "Tidak ada poin penting yang dapat diekstrak dari review ini"
+    return key_point_rules.extract(text)
 
 
-def extract_key_points_groq(text):
-    """
-    Extract key points using Groq API (FREE - 14,400 requests/day).
-    Very fast GPU-accelerated inference.
-    """
-    try:
-        api_key = os.getenv('GROQ_API_KEY')
-        if not api_key:
-            raise ValueError("GROQ_API_KEY tidak dikonfigurasi")
-        
-        # Groq API endpoint
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Improved prompt - multilingual support (Indonesian & English)
-        if len(text.strip()) < 20:
-            # For short reviews, provide concise points only
-            prompt = f"""Review produk: "{text}"
+def extract_key_points_simple_batch(texts):
+    """Smart extraction for a list of reviews; returns key points in the same order"""
+    return key_point_rules.extract_many(texts)
+
+
+def _build_groq_request(text):
+    """Chat completion payload for one review (shared by the normal and streaming calls)"""
+    # Improved prompt - multilingual support (Indonesian & English)
+    if len(text.strip()) < 20:
+        # For short reviews, provide concise points only
+        prompt = f"""Review produk: "{text}"
 
 Ekstrak 3-5 poin penting dari review di atas. HANYA tulis poin-poin singkat saja, TANPA penjelasan apapun.
 
@@ -282,9 +90,9 @@ Contoh:
 • Ketagihan
 
 Jawab dalam bahasa yang sama dengan review. HANYA poin singkat, TANPA penjelasan."""
-        else:
-            # For longer reviews, use concise prompt
-            prompt = f"""Review produk: "{text}"
+    else:
+        # For longer reviews, use concise prompt
+        prompt = f"""Review produk: "{text}"
 
 Ekstrak 3-5 poin penting dari review di atas. HANYA tulis poin-poin singkat saja, TANPA penjelasan apapun.
 
@@ -309,19 +117,40 @@ Contoh:
 • Kepuasan tinggi
 
 Jawab dalam bahasa yang sama dengan review. HANYA poin singkat, TANPA penjelasan apapun."""
+    
+    data = {
+        "model": GROQ_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are an expert product review analyst. Your task is to extract 3-5 key points from product reviews. Format each point as: • [Short point only]. Do NOT provide explanations, analysis, or descriptions. Just list short points only. Each point should be maximum 10 words. Always respond in the same language as the review (Indonesian or English). Minimum 3 points, maximum 5 points."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 200,
+        "temperature": 0.1  # Lower temperature for more focused and accurate output
+    }
+    return data
+
+
+def extract_key_points_groq(text):
+    """
+    Extract key points using Groq API (FREE - 14,400 requests/day).
+    Very fast GPU-accelerated inference.
+    """
+    try:
+        api_key = os.getenv('GROQ_API_KEY')
+        if not api_key:
+            raise ValueError("GROQ_API_KEY tidak dikonfigurasi")
         
-        data = {
-            "model": "llama-3.1-8b-instant",  # Free tier model
-            "messages": [
-                {"role": "system", "content": "You are an expert product review analyst. Your task is to extract 3-5 key points from product reviews. Format each point as: • [Short point only]. Do NOT provide explanations, analysis, or descriptions. Just list short points only. Each point should be maximum 10 words. Always respond in the same language as the review (Indonesian or English). Minimum 3 points, maximum 5 points."},
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 200,
-            "temperature": 0.1  # Lower temperature for more focused and accurate output
+        # Groq API endpoint (relative to the pooled Groq client's base URL)
+        url = "/openai/v1/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
         }
         
+        data = _build_groq_request(text)
+        
         print("[INFO] Menggunakan Groq API...")
-        response = requests.post(url, json=data, headers=headers, timeout=30)
+        response = get_provider_client('groq').post(url, json=data, headers=headers)
         
         if response.status_code == 200:
             result = response.json()
@@ -329,27 +158,12 @@ Jawab dalam bahasa yang sama dengan review. HANYA poin singkat, TANPA penjelasan
                 content = result['choices'][0]['message']['content'].strip()
                 
                 # Validate response - if it contains apology or says it can't see, use fallback
-                # Check in both Indonesian and English
-                invalid_phrases = [
-                    "maaf", "saya tidak dapat", "tidak dapat melihat", 
-                    "silakan", "berikan review", "tuliskan review", "saya tidak bisa",
-                    "sorry", "i cannot", "i can't", "cannot see", "please provide",
-                    "please give", "i don't see", "i do not see", "unable to see"
-                ]
-                if any(phrase in content.lower() for phrase in invalid_phrases):
+                if _is_invalid_response(content):
                     print("[WARNING] Groq menghasilkan response tidak valid, menggunakan ekstraksi cerdas")
                     raise ValueError("Response tidak valid dari Groq")
                 
-                # Filter out irrelevant points and English translations
-                # Check for phrases that indicate something is NOT mentioned
-                irrelevant_phrases = [
-                    "tidak ada komentar", "tidak disebutkan", "tidak ada", "no comment",
-                    "not mentioned", "not discussed", "nothing about", "no mention",
-                    "tidak ada informasi", "no information"
-                ]
-                
+                # Filter out irrelevant points (IRRELEVANT_POINT_PHRASES) and English translations
                 # Remove English translations in parentheses (e.g., "Harga mahal (High price)")
-                import re
                 # Remove everything in parentheses (including nested)
                 content = re.sub(r'\([^()]*\)', '', content)
                 # Also remove any remaining English text patterns
@@ -366,7 +180,7 @@ Jawab dalam bahasa yang sama dengan review. HANYA poin singkat, TANPA penjelasan
                         continue
                     line_lower = line.lower()
                     # Skip lines that say something is not mentioned
-                    if not any(phrase in line_lower for phrase in irrelevant_phrases):
+                    if not any(phrase in line_lower for phrase in IRRELEVANT_POINT_PHRASES):
                         # Remove any remaining English translations
                         line = re.sub(r'\s*\([^)]*\)', '', line).strip()
                         if line:
@@ -391,7 +205,7 @@ Jawab dalam bahasa yang sama dengan review. HANYA poin singkat, TANPA penjelasan
             else:
                 raise Exception("Response tidak valid dari Groq API")
         elif response.status_code == 429:
-            raise Exception("Groq API quota habis")
+            raise QuotaExceededError("Groq API quota habis", retry_after=parse_retry_after(response.headers))
         else:
             raise Exception(f"Groq API error: {response.status_code} - {response.text[:100]}")
             
@@ -404,6 +218,172 @@ Jawab dalam bahasa yang sama dengan review. HANYA poin singkat, TANPA penjelasan
         raise
 
 
+def _clean_batch_points(points):
+    """
+    Validate one review's points from a batch answer.
+    Returns: key points formatted like the single-review answer, or None if invalid
+    """
+    if not isinstance(points, list):
+        return None
+    cleaned = []
+    for point in points:
+        if not isinstance(point, str):
+            return None
+        point = re.sub(r'\s*\([^)]*\)', '', point).strip().lstrip('•-* ').strip()
+        if not point or any(phrase in point.lower() for phrase in IRRELEVANT_POINT_PHRASES):
+            continue
+        if len(point.split()) > 15:
+            return None
+        cleaned.append(f"• {point}")
+    content = "\n".join(cleaned[:5])
+    if not cleaned or len(content) < 10 or _is_invalid_response(content):
+        return None
+    return content
+
+
+def extract_key_points_groq_batch(texts):
+    """
+    Extract key points for several reviews with one Groq request.
+    The reviews go in as a numbered list and the answer is JSON, so the
+    instructions are sent once per batch instead of once per review.
+    Returns: list with the key points per review, None where the answer for
+             that review is missing or fails validation
+    """
+    api_key = os.getenv('GROQ_API_KEY')
+    if not api_key:
+        raise ValueError("GROQ_API_KEY tidak dikonfigurasi")
+    
+    numbered = "\n".join(f'{i + 1}. "{" ".join(text.split())}"' for i, text in enumerate(texts))
+    prompt = f"""Review produk:
+{numbered}
+
+Untuk SETIAP review di atas, ekstrak 3-5 poin penting (poin singkat, maksimal 10 kata, TANPA penjelasan).
+Review yang sangat pendek boleh 1-2 poin. Jawab dalam bahasa yang sama dengan reviewnya.
+
+Jawab HANYA dengan JSON:
+{{"results": [{{"id": 1, "key_points": ["Poin singkat 1", "Poin singkat 2", "Poin singkat 3"]}}]}}"""
+    
+    data = {
+        "model": GROQ_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are an expert product review analyst. For each numbered review, extract 3-5 short key points (maximum 10 words each, no explanations) in the same language as that review. Respond with JSON only."},
+            {"role": "user", "content": prompt}
+        ],
+        "response_format": {"type": "json_object"},
+        "max_tokens": min(8000, 120 * len(texts) + 100),
+        "temperature": 0.1
+    }
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    
+    print(f"[INFO] Menggunakan Groq API (batch {len(texts)} review)...")
+    response = get_provider_client('groq').post("/openai/v1/chat/completions", json=data, headers=headers)
+    if response.status_code == 429:
+        raise QuotaExceededError("Groq API quota habis", retry_after=parse_retry_after(response.headers))
+    if response.status_code != 200:
+        raise Exception(f"Groq API error: {response.status_code} - {response.text[:100]}")
+    
+    result = response.json()
+    usage = result.get('usage') or {}
+    batch_stats['prompt_tokens'] += usage.get('prompt_tokens', 0)
+    try:
+        answer = json.loads(result['choices'][0]['message']['content'])
+        items = answer['results'] if isinstance(answer, dict) else answer
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise ValueError("Response batch Groq bukan JSON yang valid")
+    
+    key_points = [None] * len(texts)
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get('id')) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(texts) and key_points[index] is None:
+            key_points[index] = _clean_batch_points(item.get('key_points'))
+    return key_points
+
+
+def _clean_stream_point(line):
+    """Returns: one streamed Groq line as a "• point" bullet, or None to drop it"""
+    point = re.sub(r'\s*\([^)]*\)', '', line).strip().lstrip('•-*0123456789. ').strip()
+    if not point or any(phrase in point.lower() for phrase in IRRELEVANT_POINT_PHRASES):
+        return None
+    return f"• {point}"
+
+
+def stream_key_points_groq(text):
+    """
+    Extract key points with Groq's streaming completion (stream=true).
+    Yields each key point as soon as its line is complete instead of waiting
+    for the whole answer. Raises like extract_key_points_groq; a ValueError
+    raised after points were yielded means the rest of the answer was unusable.
+    """
+    api_key = os.getenv('GROQ_API_KEY')
+    if not api_key:
+        raise ValueError("GROQ_API_KEY tidak dikonfigurasi")
+    
+    data = dict(_build_groq_request(text), stream=True)
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    
+    print("[INFO] Menggunakan Groq API (streaming)...")
+    response = get_provider_client('groq').post("/openai/v1/chat/completions", json=data, headers=headers, stream=True)
+    try:
+        if response.status_code == 429:
+            raise QuotaExceededError("Groq API quota habis", retry_after=parse_retry_after(response.headers))
+        if response.status_code != 200:
+            raise Exception(f"Groq API error: {response.status_code} - {response.text[:100]}")
+        
+        buffer = ""
+        yielded = 0
+        
+        def complete_lines(final=False):
+            nonlocal buffer
+            lines = buffer.split('\n')
+            buffer = "" if final else lines.pop()
+            for line in lines:
+                if not line.strip():
+                    continue
+                if _is_invalid_response(line):
+                    print("[WARNING] Groq menghasilkan response tidak valid (streaming)")
+                    raise ValueError("Response tidak valid dari Groq")
+                point = _clean_stream_point(line)
+                if point:
+                    yield point
+        
+        for raw in response.iter_lines(decode_unicode=True):
+            if not raw or not raw.startswith('data:'):
+                continue
+            payload = raw[len('data:'):].strip()
+            if payload == '[DONE]':
+                break
+            try:
+                choices = json.loads(payload).get('choices') or []
+            except ValueError:
+                continue
+            buffer += ((choices[0].get('delta') or {}).get('content') or '') if choices else ''
+            if '\n' in buffer:
+                for point in complete_lines():
+                    yielded += 1
+                    yield point
+        for point in complete_lines(final=True):
+            yielded += 1
+            yield point
+        
+        if not yielded:
+            print("[WARNING] Semua poin tidak relevan, menggunakan ekstraksi cerdas")
+            raise ValueError("Semua poin tidak relevan")
+        print("[SUCCESS] Groq API (streaming) berhasil")
+    finally:
+        response.close()
+
+
 def extract_key_points_huggingface(text):
     """
     Extract key points using Hugging Face Inference API (FREE - 30,000 requests/month).
@@ -416,7 +396,7 @@ def extract_key_points_huggingface(text):
         
         # Use Facebook BART for summarization
         model = "facebook/bart-large-cnn"
-        url = f"https://api-inference.huggingface.co/models/{model}"
+        url = f"/models/{model}"
         headers = {"Authorization": f"Bearer {api_key}"}
         
         # For key points, we'll use summarization with max_length
@@ -430,7 +410,7 @@ def extract_key_points_huggingface(text):
         }
         
         print("[INFO] Menggunakan Hugging Face API...")
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = get_provider_client('huggingface').post(url, json=payload, headers=headers)
         
         if response.status_code == 200:
             result = response.json()
@@ -447,9 +427,9 @@ def extract_key_points_huggingface(text):
             # Model is loading, wait a bit
             raise Exception("Model sedang loading, coba lagi dalam beberapa detik")
         elif response.status_code == 429:
-            raise Exception("Hugging Face API quota habis")
+            raise QuotaExceededError("Hugging Face API quota habis", retry_after=parse_retry_after(response.headers))
         else:
-            raise Exception(f"Hugging Face API error: {response.status_code} - {str(result)[:100]}")
+            raise Exception(f"Hugging Face API error: {response.status_code} - {response.text[:100]}")
             
     except Exception as e:
         error_msg = str(e)
@@ -460,25 +440,318 @@ def extract_key_points_huggingface(text):
         raise
 
 
+def extract_key_points_gemini(text):
+    """
+    Extract key points using Google Gemini (FREE - 20 requests/day per model).
+    Raises on any error (quota, permission, missing model).
+    Model discovery and client setup are cached in gemini_client.gemini_registry.
+    """
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY tidak dikonfigurasi")
+    
+    prompt = f"""Ekstrak 3-5 poin penting dari review produk berikut. HANYA tulis poin-poin singkat saja, TANPA penjelasan apapun.
+
+Review: {text}
+
+Format output (minimal 3 poin, maksimal 5 poin):
+• [Poin singkat 1]
+• [Poin singkat 2]
+• [Poin singkat 3]
+• [Poin singkat 4] (jika ada)
+• [Poin singkat 5] (jika ada)
+
+Contoh format:
+• Bau tidak normal
+• Rasa tidak enak
+• Masalah kualitas
+
+Poin Penting:"""
+    
+    # Model list, client setup and 429 cooldowns are cached across requests;
+    # when every candidate is out of quota GeminiModelsExhaustedError (a
+    # RateLimitedError) skips Gemini without opening its circuit
+    response, used_model = gemini_registry.generate(api_key, prompt)
+    print(f"[SUCCESS] Gemini berhasil ({used_model})")
+    
+    if response and response.text:
+        return response.text.strip()
+    else:
+        return NO_KEY_POINTS_MESSAGE
+
+
+def extract_key_points_textrank(text):
+    """
+    Extract key points locally with TextRank (textrank_extractor.py).
+    No network and no quota - the provider left on offline / no-egress hosts.
+    """
+    content = textrank.extract(text)
+    if content is None:
+        raise ValueError("Review terlalu pendek untuk TextRank")
+    print("[SUCCESS] TextRank berhasil")
+    return content
+
+
+def extract_key_points_textrank_batch(texts):
+    """TextRank for many reviews at once; None where a review is too short to rank"""
+    return textrank.extract_many(texts)
+
+
+class ProviderLatencyTracker:
+    """Latencies of recent successful calls per provider (drives the hedge delay)"""
+    
+    def __init__(self, window=100):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+    
+    def record(self, provider, seconds):
+        with self._lock:
+            self._samples.setdefault(provider, collections.deque(maxlen=self.window)).append(seconds)
+    
+    def percentile(self, provider, q=0.95, min_samples=5):
+        """Returns: latency in seconds, or None with too few samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+    
+    def get_stats(self):
+        with self._lock:
+            providers = list(self._samples)
+        stats = {}
+        for provider in providers:
+            p50 = self.percentile(provider, 0.5, min_samples=1)
+            p95 = self.percentile(provider, 0.95, min_samples=1)
+            stats[provider] = {
+                'samples': len(self._samples[provider]),
+                'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                'p95_ms': round(p95 * 1000, 1) if p95 is not None else None
+            }
+        return stats
+
+
+provider_latency = ProviderLatencyTracker()
+race_stats = collections.Counter()
+batch_stats = collections.Counter()
+
+# (name, api key env, enable flag env, extractor) in priority order;
+# local providers need no API key
+KEY_POINT_PROVIDERS = [
+    ('groq', 'GROQ_API_KEY', 'USE_GROQ_KEY_POINTS', extract_key_points_groq),
+    ('huggingface', 'HUGGINGFACE_API_KEY', 'USE_HUGGINGFACE_KEY_POINTS', extract_key_points_huggingface),
+    ('gemini', 'GEMINI_API_KEY', 'USE_GEMINI', extract_key_points_gemini),
+    ('textrank', None, 'USE_TEXTRANK_KEY_POINTS', extract_key_points_textrank),
+]
+
+# Answered in-process: cheap to recompute, so never cached (a cached local
+# answer would also hide a better remote one once a provider is back)
+LOCAL_PROVIDERS = {'textrank'}
+
+_race_executor = None
+_race_executor_pid = None
+_race_executor_lock = threading.Lock()
+
+
+def _get_race_executor():
+    # Worker threads don't survive a fork - one executor per process
+    global _race_executor, _race_executor_pid
+    with _race_executor_lock:
+        if _race_executor is None or _race_executor_pid != os.getpid():
+            _race_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('KEY_POINTS_RACE_WORKERS', '8')),
+                thread_name_prefix='key-points-race'
+            )
+            _race_executor_pid = os.getpid()
+        return _race_executor
+
+
+def _admit_provider(name):
+    """
+    Returns: the provider's circuit breaker once a call is allowed
+    Raises: CircuitOpenError / RateLimitedError when the provider must be skipped
+    """
+    breaker = get_breaker(name)
+    if breaker.is_open():
+        raise CircuitOpenError(f"Circuit {name} terbuka, dilewati")
+    if not rate_limiter.try_acquire(name):
+        raise RateLimitedError(f"Batas request {name} tercapai, dilewati")
+    if not breaker.allow_request():
+        raise CircuitOpenError(f"Circuit {name} terbuka, dilewati")
+    return breaker
+
+
+def _call_provider(name, extractor, text, cache=True):
+    """
+    Call a provider through its rate limiter (rate_limiter.py) and circuit
+    breaker (circuit_breaker.py).
+    ValueError means the provider answered but the answer was unusable for
+    this review, so it doesn't count against the provider's health.
+    """
+    breaker = _admit_provider(name)
+    try:
+        content = extractor(text)
+    except RateLimitedError:
+        # Nothing was sent (e.g. every Gemini model is out of budget)
+        breaker.release_probe()
+        raise
+    except ValueError:
+        breaker.record_success()
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    if cache and name not in LOCAL_PROVIDERS and not _is_invalid_response(content) and content != NO_KEY_POINTS_MESSAGE:
+        key_point_cache.put(text, name, KEY_POINTS_PROMPT_VERSION, content)
+    return content
+
+
+def _configured_providers():
+    """Providers with an API key that are switched on, in priority order"""
+    return [
+        (name, extractor) for name, key_env, flag_env, extractor in KEY_POINT_PROVIDERS
+        if (key_env is None or os.getenv(key_env)) and os.getenv(flag_env, 'true').lower() == 'true'
+    ]
+
+
+def _enabled_providers():
+    """Configured providers in priority order, without the ones whose circuit is open or budget is spent"""
+    return [
+        (name, extractor) for name, extractor in _configured_providers()
+        if not get_breaker(name).is_open() and rate_limiter.has_capacity(name)
+    ]
+
+
+def available_remote_providers():
+    """Names of the remote providers a call could go to right now (configured, circuit closed, budget left)"""
+    return [name for name, _ in _enabled_providers() if name not in LOCAL_PROVIDERS]
+
+
+def _hedge_delay(provider):
+    """Seconds to wait for a provider before hedging: its p95 latency, or the default until known"""
+    p95 = provider_latency.percentile(provider)
+    if p95 is None:
+        return float(os.getenv('KEY_POINTS_HEDGE_DELAY_MS', '1500')) / 1000
+    return max(float(os.getenv('KEY_POINTS_HEDGE_MIN_MS', '200')) / 1000, p95)
+
+
+def _run_race_entry(name, extractor, text, cancelled):
+    if cancelled.is_set():
+        # The race was decided while this call was still queued
+        return None
+    start = time.perf_counter()
+    content = _call_provider(name, extractor, text)
+    if _is_invalid_response(content):
+        raise ValueError(f"Response tidak valid dari {name}")
+    provider_latency.record(name, time.perf_counter() - start)
+    return content
+
+
+def extract_key_points_racing(text):
+    """
+    Hedged racing over the configured providers (KEY_POINTS_RACING=true).
+    The primary provider starts first; when it hasn't answered within its p95
+    latency, or as soon as any running provider fails, the next provider is
+    fired as well. The first valid
+    answer wins. Past KEY_POINTS_DEADLINE_S the smart extraction is returned.
+    Losing calls that haven't started are cancelled; in-flight HTTP calls
+    can't be interrupted, so they finish in the background and are discarded.
+    """
+    providers = _enabled_providers()
+    if not providers:
+        return extract_key_points_simple(text)
+    
+    executor = _get_race_executor()
+    deadline = time.monotonic() + float(os.getenv('KEY_POINTS_DEADLINE_S', '10'))
+    cancelled = threading.Event()
+    running = {}
+    next_index = 0
+    hedge_at = None
+    
+    try:
+        while True:
+            launch = next_index < len(providers) and (not running or time.monotonic() >= hedge_at)
+            if launch:
+                name, extractor = providers[next_index]
+                if next_index > 0:
+                    race_stats['hedges'] += 1
+                    print(f"[INFO] Hedging key points ke {name}...")
+                running[executor.submit(_run_race_entry, name, extractor, text, cancelled)] = name
+                next_index += 1
+                hedge_at = time.monotonic() + _hedge_delay(name)
+            if not running:
+                break
+            
+            now = time.monotonic()
+            if now >= deadline:
+                race_stats['deadline_fallbacks'] += 1
+                print("[WARNING] Deadline key points terlewati, menggunakan ekstraksi cerdas")
+                break
+            wait_until = deadline if next_index >= len(providers) else min(deadline, hedge_at)
+            done, _ = wait(list(running), timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    content = future.result()
+                except Exception as e:
+                    print(f"[WARNING] {name} gagal dalam race: {str(e)[:80]}")
+                    # Don't sit out the rest of the hedge delay - fire the next provider now
+                    hedge_at = time.monotonic()
+                    continue
+                race_stats[f'won_{name}'] += 1
+                return content
+    finally:
+        cancelled.set()
+        for future in running:
+            future.cancel()
+    
+    print("[INFO] Semua AI provider gagal, menggunakan ekstraksi cerdas")
+    return extract_key_points_simple(text)
+
+
+def get_racing_stats():
+    return {
+        'enabled': os.getenv('KEY_POINTS_RACING', 'false').lower() == 'true',
+        'counters': dict(race_stats),
+        'latency': provider_latency.get_stats()
+    }
+
+
 def extract_key_points(text):
     """
     Extract key points from review text.
-    Tries multiple AI providers in order:
+    Tries multiple AI providers in order (a provider whose circuit breaker is
+    open or whose rate limit budget is spent is skipped without a request):
     1. Groq (if configured) - 14,400/day free
     2. Hugging Face (if configured) - 30,000/month free
     3. Gemini (if configured) - 20/day free
-    4. Smart extraction (always works, no quota)
+    4. TextRank (local, no network or quota; USE_TEXTRANK_KEY_POINTS)
+    5. Smart extraction (always works, no quota)
+    With KEY_POINTS_RACING=true the providers are raced instead (see
+    extract_key_points_racing).
+    Provider answers are cached (key_point_cache.py), so a review that was
+    seen before - up to whitespace and casing - costs no provider call.
     
     Returns: String containing key points
     """
-    # Priority order: Groq > Hugging Face > Gemini > Smart Extraction
+    cached = key_point_cache.get(text, [name for name, _ in _configured_providers()], KEY_POINTS_PROMPT_VERSION)
+    if cached is not None:
+        print(f"[INFO] Poin penting dari cache ({cached[0]})")
+        return cached[1]
+    
+    if os.getenv('KEY_POINTS_RACING', 'false').lower() == 'true':
+        return extract_key_points_racing(text)
+    
+    # Priority order: Groq > Hugging Face > Gemini > TextRank > Smart Extraction
     
     # Try Groq first (best free tier)
     if os.getenv('GROQ_API_KEY'):
         try:
             use_groq = os.getenv('USE_GROQ_KEY_POINTS', 'true').lower() == 'true'
             if use_groq:
-                return extract_key_points_groq(text)
+                return _call_provider('groq', extract_key_points_groq, text)
         except Exception as e:
             print(f"[WARNING] Groq gagal, mencoba alternatif: {str(e)[:50]}")
     
@@ -487,7 +760,7 @@ def extract_key_points(text):
         try:
             use_hf = os.getenv('USE_HUGGINGFACE_KEY_POINTS', 'true').lower() == 'true'
             if use_hf:
-                return extract_key_points_huggingface(text)
+                return _call_provider('huggingface', extract_key_points_huggingface, text)
         except Exception as e:
             print(f"[WARNING] Hugging Face gagal, mencoba alternatif: {str(e)[:50]}")
     
@@ -498,126 +771,9 @@ def extract_key_points(text):
         api_key = os.getenv('GEMINI_API_KEY')
         if api_key:
             try:
-                genai.configure(api_key=api_key)
-                
-                # First, try to list available models to see what's accessible
-                try:
-                    print("[INFO] Mencari model Gemini yang tersedia...")
-                    available_models = genai.list_models()
-                    model_names = [m.name for m in available_models if 'generateContent' in m.supported_generation_methods]
-                    print(f"[SUCCESS] Model yang tersedia: {len(model_names)} models")
-                    
-                    # Try multiple models in order of preference (to avoid quota issues)
-                    # Free tier has 20 requests/day per model, so try different models
-                    models_to_try = [
-                        'gemini-pro-latest',  # Most stable
-                        'gemini-2.5-flash-lite',  # Lighter model
-                        'gemini-flash-lite-latest',  # Alternative
-                        'gemini-2.0-flash-lite',  # Another option
-                        'gemini-2.5-flash',  # If others fail
-                    ]
-                    
-                    model = None
-                    used_model = None
-                    
-                    for model_name_attempt in models_to_try:
-                        # Check if model exists in available models
-                        full_model_name = f"models/{model_name_attempt}"
-                        model_exists = full_model_name in model_names or model_name_attempt in [m.split('/')[-1] for m in model_names]
-                        
-                        if model_exists:
-                            try:
-                                print(f"[INFO] Mencoba model: {model_name_attempt}...")
-                                model = genai.GenerativeModel(model_name_attempt)
-                                used_model = model_name_attempt
-                                print(f"[SUCCESS] Model siap digunakan: {model_name_attempt}")
-                                break
-                            except Exception as e:
-                                error_str = str(e)
-                                if "429" in error_str or "quota" in error_str.lower():
-                                    print(f"[WARNING] Model {model_name_attempt} quota habis, mencoba model lain...")
-                                    continue
-                                else:
-                                    # Other error, try next model
-                                    print(f"[WARNING] Model {model_name_attempt} error: {error_str[:50]}...")
-                                    continue
-                    
-                    # If all preferred models failed, try any available model
-                    if model is None:
-                        print("[WARNING] Semua model preferred quota habis, mencoba model lain...")
-                        for model_name in model_names[:10]:  # Try first 10 available models
-                            model_short = model_name.split('/')[-1]
-                            if model_short not in [m.split('/')[-1] for m in models_to_try]:
-                                try:
-                                    print(f"[INFO] Mencoba model: {model_short}...")
-                                    model = genai.GenerativeModel(model_short)
-                                    used_model = model_short
-                                    print(f"[SUCCESS] Menggunakan model: {model_short}")
-                                    break
-                                except Exception as e:
-                                    if "429" not in str(e):
-                                        continue
-                        
-                        if model is None:
-                            raise Exception("Semua model Gemini quota habis. Tunggu beberapa saat atau gunakan fallback sederhana.")
-                except Exception as list_error:
-                    print(f"[WARNING] Tidak bisa list models, mencoba model default: {str(list_error)[:100]}")
-                    # Fallback: try common model names
-                    models_to_try = [
-                        'gemini-pro',
-                        'models/gemini-pro', 
-                    ]
-                    
-                    model = None
-                    for model_name_attempt in models_to_try:
-                        try:
-                            print(f"[INFO] Mencoba model: {model_name_attempt}...")
-                            model = genai.GenerativeModel(model_name_attempt)
-                            print(f"[SUCCESS] Model berhasil dimuat: {model_name_attempt}")
-                            break
-                        except Exception as e:
-                            print(f"[WARNING] Model {model_name_attempt} tidak tersedia")
-                            continue
-                    
-                    if model is None:
-                        raise Exception("Tidak ada model Gemini yang tersedia. Pastikan API key valid dan memiliki akses ke Gemini API")
-                
-                if model is None:
-                    raise Exception("Tidak ada model yang tersedia")
-                
-                prompt = f"""Ekstrak 3-5 poin penting dari review produk berikut. HANYA tulis poin-poin singkat saja, TANPA penjelasan apapun.
-
-Review: {text}
-
-Format output (minimal 3 poin, maksimal 5 poin):
-• [Poin singkat 1]
-• [Poin singkat 2]
-• [Poin singkat 3]
-• [Poin singkat 4] (jika ada)
-• [Poin singkat 5] (jika ada)
-
-Contoh format:
-• Bau tidak normal
-• Rasa tidak enak
-• Masalah kualitas
-
-Poin Penting:"""
-                
-                try:
-                    response = model.generate_content(prompt)
-                    
-                    if response and response.text:
-                        return response.text.strip()
-                    else:
-                        return "Tidak dapat mengekstrak poin penting"
-                except Exception as gen_error:
-                    error_str = str(gen_error)
-                    if "429" in error_str or "quota" in error_str.lower() or "exceeded" in error_str.lower():
-                        # Quota habis saat generate, gunakan smart extraction
-                        print(f"[WARNING] Quota habis saat generate, menggunakan ekstraksi cerdas")
-                        return extract_key_points_simple(text)
-                    else:
-                        raise gen_error
+                return _call_provider('gemini', extract_key_points_gemini, text)
+            except (CircuitOpenError, RateLimitedError):
+                pass
             except Exception as e:
                 error_msg = str(e)
                 print(f"[ERROR] Error ekstraksi poin penting: {error_msg}")
@@ -628,12 +784,9 @@ Poin Penting:"""
                 elif "403" in error_msg or "permission" in error_msg.lower() or "forbidden" in error_msg.lower():
                     return f"API key tidak memiliki izin. Error: {error_msg[:200]}. Pastikan API key valid dan Gemini API diaktifkan."
                 elif "429" in error_msg or "quota" in error_msg.lower() or "resource exhausted" in error_msg.lower() or "exceeded" in error_msg.lower():
-                    # Quota exceeded - use smart extraction fallback
-                    print(f"[WARNING] Quota Gemini API habis (429), menggunakan ekstraksi cerdas sebagai fallback")
+                    # Quota exceeded - fall through to the local fallbacks
+                    print(f"[WARNING] Quota Gemini API habis (429), menggunakan fallback lokal")
                     print(f"          Error detail: {error_msg[:200]}")
-                    smart_result = extract_key_points_simple(text)
-                    # Return clean result without warning message (since it's working fine)
-                    return smart_result
                 elif "invalid" in error_msg.lower() or "401" in error_msg:
                     return f"API key tidak valid atau expired. Error: {error_msg[:200]}. Buat API key baru di: https://makersuite.google.com/app/apikey"
                 else:
@@ -641,7 +794,141 @@ Poin Penting:"""
                     print(f"[WARNING] Gemini error, menggunakan ekstraksi cerdas: {error_msg[:100]}")
                     # Fall through to smart extraction
     
+    print("[INFO] Semua AI provider tidak tersedia, menggunakan ekstraksi lokal")
+    return extract_key_points_local(text)
+
+
+def extract_key_points_local(text):
+    """
+    Key points without any remote provider: TextRank, then smart extraction
+    (always works) for reviews too short to rank. Also the fallback when the
+    providers take longer than analyze_review's key point stage timeout.
+    """
+    # Local TextRank (no network, no quota)
+    if os.getenv('USE_TEXTRANK_KEY_POINTS', 'true').lower() == 'true':
+        try:
+            return _call_provider('textrank', extract_key_points_textrank, text)
+        except Exception as e:
+            print(f"[INFO] TextRank tidak dipakai: {str(e)[:50]}")
+    
     # Final fallback: Smart extraction (always works)
-    print("[INFO] Semua AI provider tidak tersedia, menggunakan ekstraksi cerdas")
     return extract_key_points_simple(text)
 
+
+def stream_key_points(text):
+    """
+    Streaming variant of extract_key_points for /api/analyze-review/stream.
+    Yields key point lines one at a time: from the cache when the review was
+    seen before, otherwise as Groq's streaming completion produces them.
+    When Groq is unavailable or fails before the first point, the normal
+    provider chain (extract_key_points) answers and its lines are yielded.
+    """
+    providers = [name for name, _ in _configured_providers()]
+    cached = key_point_cache.get(text, providers, KEY_POINTS_PROMPT_VERSION)
+    if cached is not None:
+        print(f"[INFO] Poin penting dari cache ({cached[0]})")
+        for line in cached[1].split('\n'):
+            if line.strip():
+                yield line.strip()
+        return
+    
+    points = []
+    if 'groq' in providers:
+        try:
+            breaker = _admit_provider('groq')
+        except (CircuitOpenError, RateLimitedError) as e:
+            print(f"[INFO] {str(e)}")
+        else:
+            try:
+                for point in stream_key_points_groq(text):
+                    points.append(point)
+                    yield point
+            except GeneratorExit:
+                # Client went away mid-stream
+                breaker.release_probe()
+                raise
+            except ValueError as e:
+                breaker.record_success()
+                print(f"[WARNING] Groq streaming gagal: {str(e)[:50]}")
+            except Exception as e:
+                breaker.record_failure(e)
+                print(f"[WARNING] Groq streaming gagal, mencoba alternatif: {str(e)[:50]}")
+            else:
+                breaker.record_success()
+                key_point_cache.put(text, 'groq', KEY_POINTS_PROMPT_VERSION, '\n'.join(points))
+                return
+    if points:
+        # The client already has these; a second answer would only repeat them
+        return
+    
+    for line in extract_key_points(text).split('\n'):
+        if line.strip():
+            yield line.strip()
+
+
+def extract_key_points_batch(texts, batch_size=None):
+    """
+    Extract key points for many reviews (backfills, bulk uploads).
+    Cached reviews are answered from the cache; the rest go to Groq in
+    batches of KEY_POINTS_BATCH_SIZE (one request per batch). Only the
+    reviews whose batch answer is missing or invalid are re-run one by one
+    through extract_key_points, which also covers Groq being unavailable.
+    With no remote provider available at all, the rest is answered locally
+    in one pass (TextRank batch, smart extraction where it can't rank).
+    Returns: list of key point strings in the same order as texts
+    """
+    texts = list(texts)
+    batch_size = batch_size or int(os.getenv('KEY_POINTS_BATCH_SIZE', '10'))
+    providers = [name for name, _ in _configured_providers()]
+    results = [None] * len(texts)
+    
+    for i, text in enumerate(texts):
+        cached = key_point_cache.get(text, providers, KEY_POINTS_PROMPT_VERSION)
+        if cached is not None:
+            results[i] = cached[1]
+    
+    missing = [i for i, result in enumerate(results) if result is None]
+    if 'groq' in providers:
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            try:
+                answers = _call_provider('groq', extract_key_points_groq_batch, [texts[i] for i in chunk], cache=False)
+            except Exception as e:
+                print(f"[WARNING] Groq batch gagal, diproses satu per satu: {str(e)[:80]}")
+                continue
+            batch_stats['batch_requests'] += 1
+            batch_stats['batch_items'] += len(chunk)
+            for i, answer in zip(chunk, answers):
+                if answer is not None:
+                    results[i] = answer
+                    key_point_cache.put(texts[i], 'groq', KEY_POINTS_PROMPT_VERSION, answer)
+    
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing and not available_remote_providers():
+        # Nothing remote to try (offline host, or every provider down / out of budget):
+        # answer the rest locally in one pass instead of review by review
+        for i, answer in zip(missing, extract_key_points_local_batch([texts[i] for i in missing])):
+            results[i] = answer
+    
+    for i, result in enumerate(results):
+        if result is None:
+            batch_stats['items_retried'] += 1
+            results[i] = extract_key_points(texts[i])
+    return results
+
+
+def extract_key_points_local_batch(texts):
+    """extract_key_points_local for many reviews: one TextRank batch, smart extraction where it can't rank"""
+    texts = list(texts)
+    results = [None] * len(texts)
+    if os.getenv('USE_TEXTRANK_KEY_POINTS', 'true').lower() == 'true':
+        results = extract_key_points_textrank_batch(texts)
+        batch_stats['textrank_items'] += sum(1 for answer in results if answer is not None)
+    fallback = [i for i, answer in enumerate(results) if answer is None]
+    for i, answer in zip(fallback, extract_key_points_simple_batch([texts[i] for i in fallback])):
+        results[i] = answer
+    return results
+
+
+def get_batch_stats():
+    return dict(batch_stats)
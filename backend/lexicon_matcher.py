@@ -0,0 +1,65 @@
+"""
+Multi-pattern keyword matcher (Aho-Corasick).
+
+A lexicon maps category names to lists of phrases. It is compiled once into a
+single automaton, and one pass over the text returns every category with at
+least one phrase occurring in it. Phrases match as substrings, exactly like
+`phrase in text`.
+
+Uses the pyahocorasick C extension when installed, otherwise falls back to
+per-category substring scans with the same results.
+"""
+try:
+    import ahocorasick
+    HAS_PYAHOCORASICK = True
+except ImportError:
+    HAS_PYAHOCORASICK = False
+
+
+class LexiconMatcher:
+    """
+    Compiled lexicon: {category: [phrase, ...]} -> automaton.
+    Input text is matched as-is, so lowercase it first (lexicons are lowercase).
+    """
+
+    def __init__(self, lexicon):
+        # Normalize + dedupe: phrase -> set of categories it belongs to
+        self.lexicon = {}
+        phrase_categories = {}
+        for category, phrases in lexicon.items():
+            unique = []
+            for phrase in phrases:
+                phrase = phrase.lower()
+                if phrase and phrase not in unique:
+                    unique.append(phrase)
+                    phrase_categories.setdefault(phrase, set()).add(category)
+            self.lexicon[category] = tuple(unique)
+        self.categories = frozenset(self.lexicon)
+        self._phrase_categories = {p: frozenset(c) for p, c in phrase_categories.items()}
+
+        self._automaton = None
+        if HAS_PYAHOCORASICK and self._phrase_categories:
+            self._automaton = ahocorasick.Automaton()
+            for phrase, categories in self._phrase_categories.items():
+                self._automaton.add_word(phrase, categories)
+            self._automaton.make_automaton()
+
+    def match(self, text):
+        """
+        Single pass over text.
+        Returns: frozenset of category names with at least one phrase in text
+        """
+        if self._automaton is not None:
+            hits = set()
+            for _, categories in self._automaton.iter(text):
+                hits.update(categories)
+                if len(hits) == len(self.categories):
+                    break
+            return frozenset(hits)
+
+        # Without the C extension, C-level substring scans over the deduped
+        # phrases beat a pure-Python automaton loop
+        return frozenset(
+            category for category, phrases in self.lexicon.items()
+            if any(phrase in text for phrase in phrases)
+        )
@@ -0,0 +1,100 @@
+"""
+Offline loading of a model baked with bake_model.py.
+
+Weights are memory-mapped straight from model.safetensors instead of being
+read into freshly allocated memory: loading costs little more than opening
+the file, pages are only read when touched, and because they are file-backed
+they are shared through the page cache by every process on the box.
+"""
+import json
+import mmap
+import os
+import struct
+import time
+
+SAFETENSORS_DTYPES = {
+    'F64': 'float64', 'F32': 'float32', 'F16': 'float16', 'BF16': 'bfloat16',
+    'I64': 'int64', 'I32': 'int32', 'I16': 'int16', 'I8': 'int8', 'U8': 'uint8', 'BOOL': 'bool'
+}
+
+
+def read_manifest(model_dir):
+    """Returns: manifest written by bake_model.py, or {} if there is none"""
+    path = os.path.join(model_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def mmap_safetensors(path):
+    """
+    Map a .safetensors file and return {name: tensor} views into the mapping.
+    The mapping is private copy-on-write, so the file on disk is never modified.
+    """
+    import torch
+
+    with open(path, 'rb') as f:
+        header_len = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_len))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    data = torch.frombuffer(mapped, dtype=torch.uint8)
+    data_start = 8 + header_len
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        start, end = info['data_offsets']
+        dtype = getattr(torch, SAFETENSORS_DTYPES[info['dtype']])
+        raw = data[data_start + start:data_start + end]
+        try:
+            tensor = raw.view(dtype)
+        except RuntimeError:
+            # Misaligned for a zero-copy view - copy this one tensor
+            tensor = raw.clone().view(dtype)
+        tensors[name] = tensor.reshape(info['shape'])
+    return tensors
+
+
+def load_local_pipeline(model_dir, timings):
+    """
+    Build the sentiment pipeline from a local baked directory without network.
+    Fills timings with the seconds spent in each load phase.
+    """
+    from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    from transformers.modeling_utils import no_init_weights
+
+    phase_start = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+    timings['tokenizer_s'] = round(time.perf_counter() - phase_start, 3)
+
+    phase_start = time.perf_counter()
+    config = AutoConfig.from_pretrained(model_dir, local_files_only=True)
+    # Skeleton without random init - every parameter is replaced by a mapped tensor
+    with no_init_weights():
+        model = AutoModelForSequenceClassification.from_config(config)
+    timings['model_init_s'] = round(time.perf_counter() - phase_start, 3)
+
+    phase_start = time.perf_counter()
+    weights_path = os.path.join(model_dir, 'model.safetensors')
+    state_dict = mmap_safetensors(weights_path)
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    # Non-persistent buffers (e.g. position_ids) are not stored in the file
+    missing = [key for key in missing if key not in dict(model.named_buffers())]
+    if missing or unexpected:
+        raise RuntimeError(f"Weights don't match the model (missing={missing[:5]}, unexpected={unexpected[:5]})")
+    model.tie_weights()
+    model.eval()
+    timings['weights_s'] = round(time.perf_counter() - phase_start, 3)
+
+    phase_start = time.perf_counter()
+    sentiment_pipeline = pipeline(
+        "sentiment-analysis",
+        model=model,
+        tokenizer=tokenizer,
+        return_all_scores=True,
+        device=-1
+    )
+    timings['pipeline_s'] = round(time.perf_counter() - phase_start, 3)
+    return sentiment_pipeline
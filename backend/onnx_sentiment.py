@@ -0,0 +1,142 @@
+"""
+ONNX Runtime backend for the cardiffnlp sentiment model.
+
+The model is exported to ONNX once (at build time or on first load), quantized
+with dynamic int8 quantization and then served through onnxruntime, so torch is
+not needed at serving time.
+
+Export manually:
+    python onnx_sentiment.py --export
+"""
+import os
+import sys
+
+import numpy as np
+
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+ONNX_MODEL_DIR = os.getenv('SENTIMENT_ONNX_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'onnx_model'))
+FP32_FILENAME = "model.onnx"
+INT8_FILENAME = "model.int8.onnx"
+
+
+def export_onnx_model(model_name=MODEL_NAME, output_dir=ONNX_MODEL_DIR, quantize=True):
+    """
+    Export the sentiment model to ONNX and (optionally) apply dynamic int8 quantization.
+    Needs torch and onnx installed - only used at build time or on first load.
+    Returns: path to the model file that should be served
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = os.path.join(output_dir, FP32_FILENAME)
+
+    print(f"[INFO] Mengekspor {model_name} ke ONNX: {fp32_path}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+
+    dummy = tokenizer(["contoh review produk", "produk ini bagus sekali"], padding=True, return_tensors="pt")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy['input_ids'], dummy['attention_mask']),
+            fp32_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=14
+        )
+
+    # Tokenizer + config are needed at serving time (labels, vocab)
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    int8_path = os.path.join(output_dir, INT8_FILENAME)
+    print(f"[INFO] Kuantisasi dinamis int8: {int8_path}")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print("[SUCCESS] Model ONNX int8 siap")
+    return int8_path
+
+
+class OnnxSentimentPipeline:
+    """
+    Drop-in replacement for transformers' sentiment pipeline created with
+    return_all_scores=True: calling it returns one list of
+    {'label', 'score'} dicts per input text.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=True):
+        from transformers import AutoConfig, AutoTokenizer
+
+        filename = INT8_FILENAME if quantized else FP32_FILENAME
+        self.model_path = os.path.join(model_dir, filename)
+        self.quantized = quantized
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        config = AutoConfig.from_pretrained(model_dir)
+        self.id2label = {int(k): v for k, v in config.id2label.items()}
+
+        self._create_session()
+
+    def _create_session(self):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        threads = int(os.getenv('SENTIMENT_ONNX_THREADS', '0'))
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def reset_after_fork(self):
+        """onnxruntime thread pools don't survive fork - forked workers need their own session"""
+        self._create_session()
+
+    def __call__(self, texts, batch_size=None, **tokenizer_kwargs):
+        items = [texts] if isinstance(texts, str) else list(texts)
+        batch_size = batch_size or 1
+        outputs = []
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            encoded = self.tokenizer(chunk, padding=True, return_tensors="np", **tokenizer_kwargs)
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+            logits = self.session.run(['logits'], feeds)[0]
+            # Softmax over labels, numerically stable
+            logits = logits - logits.max(axis=-1, keepdims=True)
+            probs = np.exp(logits)
+            probs = probs / probs.sum(axis=-1, keepdims=True)
+            for row in probs:
+                outputs.append([
+                    {'label': self.id2label[i], 'score': float(score)}
+                    for i, score in enumerate(row)
+                ])
+        return outputs
+
+
+def load_onnx_pipeline(model_dir=ONNX_MODEL_DIR, quantized=True, auto_export=True):
+    """
+    Load the ONNX sentiment pipeline, exporting the model first if it doesn't exist yet.
+    """
+    filename = INT8_FILENAME if quantized else FP32_FILENAME
+    if not os.path.exists(os.path.join(model_dir, filename)):
+        if not auto_export:
+            raise FileNotFoundError(f"Model ONNX tidak ditemukan di {model_dir}. Jalankan: python onnx_sentiment.py --export")
+        export_onnx_model(output_dir=model_dir, quantize=quantized)
+    return OnnxSentimentPipeline(model_dir=model_dir, quantized=quantized)
+
+
+if __name__ == '__main__':
+    if '--export' in sys.argv:
+        export_onnx_model(quantize='--no-quantize' not in sys.argv)
+    else:
+        print("Usage: python onnx_sentiment.py --export [--no-quantize]")
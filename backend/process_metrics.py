@@ -0,0 +1,44 @@
+"""
+Per-process memory metrics.
+
+With pre-forked gunicorn workers plain RSS double-counts the pages every
+worker shares with the master (the model weights), so we also report PSS
+(proportional share) and USS (pages unique to this worker).
+"""
+import os
+import resource
+
+
+def _read_smaps_rollup():
+    # Linux >= 4.14; values are in kB
+    values = {}
+    with open('/proc/self/smaps_rollup', 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def get_memory_usage():
+    """
+    Returns: {'pid', 'rss_mb', 'pss_mb', 'uss_mb', 'shared_mb'} for this process.
+    pss/uss/shared are None when /proc/self/smaps_rollup is not available.
+    """
+    usage = {
+        'pid': os.getpid(),
+        'rss_mb': None,
+        'pss_mb': None,
+        'uss_mb': None,
+        'shared_mb': None
+    }
+    try:
+        smaps = _read_smaps_rollup()
+        usage['rss_mb'] = round(smaps.get('Rss', 0) / 1024.0, 1)
+        usage['pss_mb'] = round(smaps.get('Pss', 0) / 1024.0, 1)
+        usage['uss_mb'] = round((smaps.get('Private_Clean', 0) + smaps.get('Private_Dirty', 0)) / 1024.0, 1)
+        usage['shared_mb'] = round((smaps.get('Shared_Clean', 0) + smaps.get('Shared_Dirty', 0)) / 1024.0, 1)
+    except Exception:
+        # Non-Linux: only peak RSS is available (kB on Linux, bytes on macOS)
+        usage['rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1)
+    return usage
@@ -0,0 +1,211 @@
+"""
+Shared HTTP client layer for the key point providers (Groq, Hugging Face, Gemini).
+
+Every provider gets one long-lived requests.Session with a keep-alive
+connection pool, so consecutive reviews reuse an open TLS connection instead
+of paying a TCP + TLS handshake each time. Connect and read timeouts are
+separate: a dead host fails fast, a slow completion still gets time to finish.
+
+Per host it counts requests, new connections (handshakes) and how long the
+handshakes took; get_provider_stats() is reported by /api/health.
+"""
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+CONNECT_TIMEOUT = float(os.getenv('PROVIDER_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('PROVIDER_READ_TIMEOUT', '30'))
+POOL_MAXSIZE = int(os.getenv('PROVIDER_POOL_MAXSIZE', '8'))
+
+PROVIDERS = {
+    'groq': 'https://api.groq.com',
+    'huggingface': 'https://api-inference.huggingface.co',
+    # google-generativeai manages its own transport; calls are only timed here
+    'gemini': None,
+}
+
+
+class HostStats:
+    """Request / connection counters for one remote host"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.handshake_total = 0.0
+        self.handshake_last = 0.0
+        self.latency_total = 0.0
+
+    def to_dict(self):
+        reused = max(0, self.requests - self.connections_opened)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'connections_opened': self.connections_opened,
+            'connection_reuse_ratio': round(reused / self.requests, 4) if self.requests else 0.0,
+            'avg_handshake_ms': round(self.handshake_total * 1000 / self.connections_opened, 2) if self.connections_opened else 0.0,
+            'last_handshake_ms': round(self.handshake_last * 1000, 2),
+            'avg_latency_ms': round(self.latency_total * 1000 / self.requests, 2) if self.requests else 0.0
+        }
+
+
+_stats_lock = threading.Lock()
+_host_stats = {}
+
+
+def _host_entry(host):
+    entry = _host_stats.get(host)
+    if entry is None:
+        entry = _host_stats.setdefault(host, HostStats())
+    return entry
+
+
+def _record_connect(host, seconds):
+    with _stats_lock:
+        entry = _host_entry(host)
+        entry.connections_opened += 1
+        entry.handshake_total += seconds
+        entry.handshake_last = seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _record_connect(self.host, time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # TCP connect + TLS handshake
+        start = time.perf_counter()
+        super().connect()
+        _record_connect(self.host, time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools report every new connection to the host stats"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
+
+class ProviderClient:
+    """Keep-alive HTTP session for one provider"""
+
+    def __init__(self, name, base_url=None, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 pool_maxsize=POOL_MAXSIZE):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_maxsize = pool_maxsize
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # Sockets must not be shared with a forked gunicorn worker - one session per process
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = _TimedAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """
+        Send a request through the pooled session.
+        url may be relative to the provider's base_url.
+        timeout defaults to (PROVIDER_CONNECT_TIMEOUT, PROVIDER_READ_TIMEOUT).
+        """
+        if self.base_url and not url.startswith(('http://', 'https://')):
+            url = self.base_url.rstrip('/') + '/' + url.lstrip('/')
+        host = urlsplit(url).hostname
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+        except Exception:
+            self._record(host, time.perf_counter() - start, error=True)
+            raise
+        self._record(host, time.perf_counter() - start, error=response.status_code >= 500)
+        return response
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def call(self, func, *args, **kwargs):
+        """
+        Time a call made through a provider SDK (e.g. Gemini). The SDK owns its
+        connections, so only latency and errors are recorded, under '<name> (sdk)'.
+        """
+        key = f"{self.name} (sdk)"
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self._record(key, time.perf_counter() - start, error=True)
+            raise
+        self._record(key, time.perf_counter() - start)
+        return result
+
+    def _record(self, host, seconds, error=False):
+        with _stats_lock:
+            entry = _host_entry(host)
+            entry.requests += 1
+            entry.latency_total += seconds
+            if error:
+                entry.errors += 1
+
+    def close(self):
+        with self._lock:
+            if self._session is not None and self._session_pid == os.getpid():
+                self._session.close()
+            self._session = None
+
+
+_clients_lock = threading.Lock()
+_clients = {}
+
+
+def get_provider_client(name):
+    """Returns: the shared ProviderClient for a provider in PROVIDERS"""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = ProviderClient(name, PROVIDERS.get(name))
+                _clients[name] = client
+    return client
+
+
+def get_provider_stats():
+    """Per-host counters for every provider host contacted by this process"""
+    with _stats_lock:
+        return {host: entry.to_dict() for host, entry in _host_stats.items()}
@@ -0,0 +1,227 @@
+"""
+Client-side token buckets that pace calls to the key point providers within
+their free-tier quotas.
+
+Every provider has up to three buckets:
+    minute  - RPM limit, refilled continuously
+    day     - paced daily budget: refills at RPD / 24h and holds at most a
+              RATE_LIMIT_DAY_BURST share of it, so a burst can't spend the
+              whole day's quota by mid-morning
+    quota   - hard daily counter for the provider's quota day (never refills;
+              a new row starts at every daily reset)
+Gemini quotas are per model, so each Gemini model gets buckets of its own
+('gemini:<model>').
+
+A call is only made when every bucket has a token, otherwise the provider is
+skipped before it runs into a 429. With a store registered (see app.py) the
+buckets are synced to the database every RATE_LIMIT_SYNC_S: their state
+survives restarts and is shared by all gunicorn workers.
+"""
+import os
+import threading
+import time
+
+from circuit_breaker import seconds_until_daily_reset
+
+DAY_SECONDS = 86400
+
+
+class RateLimitedError(Exception):
+    """The provider (or Gemini model) has no budget left right now"""
+
+
+def _env_limit(name, default):
+    return float(os.getenv(name, str(default)))
+
+
+# Per provider: requests per minute / per day (0 = no limit)
+DEFAULT_LIMITS = {
+    'groq': {'rpm': _env_limit('RATE_LIMIT_GROQ_RPM', 30), 'rpd': _env_limit('RATE_LIMIT_GROQ_RPD', 14400)},
+    # 30,000 requests/month
+    'huggingface': {'rpm': _env_limit('RATE_LIMIT_HUGGINGFACE_RPM', 30), 'rpd': _env_limit('RATE_LIMIT_HUGGINGFACE_RPD', 1000)},
+    'gemini': {'rpm': _env_limit('RATE_LIMIT_GEMINI_RPM', 15), 'rpd': 0},
+    # Applies to every 'gemini:<model>' key
+    'gemini:*': {'rpm': _env_limit('RATE_LIMIT_GEMINI_MODEL_RPM', 5), 'rpd': _env_limit('RATE_LIMIT_GEMINI_MODEL_RPD', 20)},
+}
+
+
+def quota_day_key():
+    """Identifies the current provider quota day (they reset at midnight Pacific)"""
+    return str(int((time.time() + seconds_until_daily_reset()) // DAY_SECONDS))
+
+
+class TokenBucket:
+    def __init__(self, key, capacity, refill_per_second):
+        self.key = key
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated_at = time.time()
+        # Tokens taken since the last sync with the store
+        self.unsynced = 0.0
+        self.synced = False
+
+    def refill(self, now=None):
+        now = now or time.time()
+        if self.refill_per_second > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def take(self, n=1):
+        self.tokens -= n
+        self.unsynced += n
+
+
+class ProviderRateLimiter:
+    def __init__(self, limits=None, day_burst=0.05, sync_interval=5.0):
+        self.limits = limits if limits is not None else DEFAULT_LIMITS
+        self.day_burst = day_burst
+        self.sync_interval = sync_interval
+        self._buckets = {}
+        self._lock = threading.Lock()
+        # Serializes store round trips (held without self._lock)
+        self._sync_lock = threading.Lock()
+        self._store = None
+        self._sync_thread_pid = None
+        self.skipped = {}
+
+    def _limits_for(self, name):
+        if name in self.limits:
+            return self.limits[name]
+        return self.limits.get(name.split(':')[0] + ':*', {})
+
+    def _buckets_for(self, name):
+        """Returns: the buckets for a provider key (created on first use)"""
+        limits = self._limits_for(name)
+        rpm, rpd = limits.get('rpm', 0), limits.get('rpd', 0)
+        wanted = []
+        if rpm:
+            wanted.append((f"{name}:minute", rpm, rpm / 60.0))
+        if rpd:
+            wanted.append((f"{name}:day", max(1.0, rpd * self.day_burst), rpd / DAY_SECONDS))
+            wanted.append((f"{name}:quota:{quota_day_key()}", rpd, 0.0))
+        buckets = []
+        for key, capacity, rate in wanted:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(key, capacity, rate)
+                self._buckets[key] = bucket
+            buckets.append(bucket)
+        return buckets
+
+    def _load_unsynced(self, name):
+        # First use of a bucket in this process: start from the stored state
+        if self._store is None:
+            return
+        with self._lock:
+            pending = [bucket for bucket in self._buckets_for(name) if not bucket.synced]
+        if pending:
+            self._sync_buckets(pending, first_use=True)
+
+    def has_capacity(self, name):
+        """True if a call to this provider would be allowed (doesn't take a token)"""
+        self._load_unsynced(name)
+        with self._lock:
+            buckets = self._buckets_for(name)
+            now = time.time()
+            for bucket in buckets:
+                bucket.refill(now)
+            return all(bucket.tokens >= 1 for bucket in buckets)
+
+    def try_acquire(self, name):
+        """Take one token from every bucket of the provider; False if any is empty"""
+        self._ensure_sync_thread()
+        self._load_unsynced(name)
+        with self._lock:
+            buckets = self._buckets_for(name)
+            now = time.time()
+            for bucket in buckets:
+                bucket.refill(now)
+            if any(bucket.tokens < 1 for bucket in buckets):
+                self.skipped[name] = self.skipped.get(name, 0) + 1
+                return False
+            for bucket in buckets:
+                bucket.take()
+            return True
+
+    def set_store(self, store):
+        """
+        store.sync(key, capacity, refill_per_second, consumed, now) merges the
+        tokens this process consumed into the stored bucket and returns the
+        stored token count (see app.py for the database implementation).
+        """
+        self._store = store
+
+    def _sync_buckets(self, buckets, first_use=False):
+        """
+        Store round trips run outside self._lock, so try_acquire() on loaded
+        buckets never waits for the database. _sync_lock keeps two syncs from
+        pushing the same consumption twice.
+        """
+        with self._sync_lock:
+            with self._lock:
+                # Another thread may have loaded the bucket while we waited
+                snapshot = [(bucket, bucket.unsynced) for bucket in buckets if not (first_use and bucket.synced)]
+            results = []
+            for bucket, consumed in snapshot:
+                try:
+                    tokens = self._store.sync(bucket.key, bucket.capacity, bucket.refill_per_second, consumed, time.time())
+                except Exception as e:
+                    print(f"[WARNING] Rate limiter sync gagal untuk {bucket.key}: {str(e)[:100]}")
+                    # Keep the local state; the background sync retries
+                    tokens = None
+                results.append((bucket, consumed, tokens))
+            with self._lock:
+                now = time.time()
+                for bucket, consumed, tokens in results:
+                    bucket.synced = True
+                    if tokens is None:
+                        continue
+                    bucket.unsynced -= consumed
+                    # Stored tokens already include the pushed consumption; keep only what was taken since
+                    bucket.tokens = tokens - bucket.unsynced
+                    bucket.updated_at = now
+
+    def sync(self):
+        """Push local consumption to the store and pick up the shared state"""
+        if self._store is None:
+            return
+        with self._lock:
+            # Yesterday's quota counters are no longer needed locally
+            today = quota_day_key()
+            for key in [k for k in self._buckets if ':quota:' in k and not k.endswith(today)]:
+                del self._buckets[key]
+            buckets = list(self._buckets.values())
+        self._sync_buckets(buckets)
+
+    def _ensure_sync_thread(self):
+        if self._store is None or self._sync_thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._sync_thread_pid == os.getpid():
+                return
+            self._sync_thread_pid = os.getpid()
+            threading.Thread(target=self._sync_loop, name="rate-limiter-sync", daemon=True).start()
+
+    def _sync_loop(self):
+        while True:
+            time.sleep(self.sync_interval)
+            self.sync()
+
+    def get_state(self):
+        with self._lock:
+            now = time.time()
+            state = {}
+            for key, bucket in self._buckets.items():
+                bucket.refill(now)
+                state[key] = {
+                    'tokens': round(bucket.tokens, 2),
+                    'capacity': round(bucket.capacity, 2)
+                }
+            return {'buckets': state, 'skipped': dict(self.skipped), 'persistent': self._store is not None}
+
+
+rate_limiter = ProviderRateLimiter(
+    day_burst=float(os.getenv('RATE_LIMIT_DAY_BURST', '0.05')),
+    sync_interval=float(os.getenv('RATE_LIMIT_SYNC_S', '5'))
+)
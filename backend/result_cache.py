@@ -0,0 +1,102 @@
+"""
+Bounded in-process result cache (LRU eviction + TTL), keyed on a hash of the
+normalized review text.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace so near-identical reviews share a key"""
+    return ' '.join((text or '').lower().split())
+
+
+def text_hash(text, *parts):
+    """
+    Content address for a review: sha256 of the normalized text plus any
+    extra key parts (model version, provider, prompt version, ...).
+    """
+    digest = hashlib.sha256(normalize_text(text).encode('utf-8'))
+    for part in parts:
+        digest.update(b'\x00')
+        digest.update(str(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class LRUResultCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL and hit/miss counters.
+    Values are copied on the way in and out so callers can't mutate cached results.
+    """
+
+    def __init__(self, max_size=1024, ttl_seconds=3600, name='cache'):
+        self.name = name
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key):
+        """Returns: cached value or None (counts a hit or a miss)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if self.ttl_seconds <= 0 or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy(value)
+                # Expired
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (_copy(value), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (e.g. when the model behind the cached results changes)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+def _copy(value):
+    if isinstance(value, dict):
+        return dict(value)
+    return value
@@ -0,0 +1,120 @@
+"""
+Keyset pagination for /api/reviews.
+
+Reviews are listed newest first, ordered on (created_at, id) so the order is
+total even when timestamps collide. A page continues strictly after the last
+row of the previous one:
+
+    WHERE (created_at, id) < (:last_created_at, :last_id)
+    ORDER BY created_at DESC, id DESC LIMIT :limit
+
+which the (created_at, id) index answers with a range scan, however deep the
+page (OFFSET would read and discard every row before it). With a sentiment
+filter the (sentiment, created_at, id) index does the same. Indexes are
+declared on the Review model; benchmark_reviews_pagination.py checks the plans.
+
+The row comparison can't page past a NULL created_at, so the column is NOT
+NULL: rows stored before that get UNKNOWN_CREATED_AT (backfill_created_at),
+which lists them last.
+
+The helpers take the model (Review) or a Table's .c, so the benchmark builds
+exactly the queries the endpoint runs.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, tuple_, update
+
+SENTIMENTS = ('positive', 'negative', 'neutral')
+
+# (name, columns) of the indexes the page queries rely on
+REVIEW_PAGE_INDEXES = [
+    ('ix_review_created_at_id', ('created_at', 'id')),
+    ('ix_review_sentiment_created_at_id', ('sentiment', 'created_at', 'id')),
+]
+
+
+# created_at of reviews stored before the column was NOT NULL
+UNKNOWN_CREATED_AT = datetime(1970, 1, 1)
+
+
+def backfill_created_at(session, table):
+    """
+    Give rows without created_at UNKNOWN_CREATED_AT.
+    session: a Session or Connection; table: the review Table
+    Returns: number of rows updated
+    """
+    return session.execute(
+        update(table).where(table.c.created_at.is_(None)).values(created_at=UNKNOWN_CREATED_AT)
+    ).rowcount
+
+
+def encode_cursor(created_at, review_id):
+    """Returns: opaque cursor for the page after this row"""
+    raw = json.dumps([created_at.isoformat(), review_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns: (created_at, id). Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, review_id = json.loads(raw)
+        # TypeError: created_at / id missing or of the wrong type (e.g. null)
+        return datetime.fromisoformat(created_at), int(review_id)
+    except (TypeError, ValueError):
+        raise ValueError("cursor tidak valid")
+
+
+def parse_date_bound(value, end=False):
+    """
+    Parse a date_from / date_to value (ISO date or datetime).
+    A plain date as the end bound covers that whole day.
+    Returns: datetime or None. Raises ValueError if it can't be parsed.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"tanggal tidak valid: {value}")
+    if parsed.tzinfo is not None:
+        # created_at is stored as naive UTC
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    if end and len(value.strip()) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def page_conditions(columns, sentiment=None, date_from=None, date_to=None, after=None):
+    """
+    columns: Review, or a review Table's .c
+    after: (created_at, id) of the previous page's last row, or None for the first page
+    Returns: WHERE conditions for one page (date_to is exclusive)
+    """
+    conditions = []
+    if sentiment:
+        conditions.append(columns.sentiment == sentiment)
+    if date_from is not None:
+        conditions.append(columns.created_at >= date_from)
+    if date_to is not None:
+        conditions.append(columns.created_at < date_to)
+    if after is not None:
+        conditions.append(tuple_(columns.created_at, columns.id) < tuple_(*after))
+    return [and_(*conditions)] if conditions else []
+
+
+def page_order(columns):
+    return (columns.created_at.desc(), columns.id.desc())
+
+
+def split_page(rows, limit, key=lambda row: (row.created_at, row.id)):
+    """
+    rows: up to limit + 1 rows of a page query
+    Returns: (rows of this page, next cursor or None when it's the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
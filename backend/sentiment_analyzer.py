@@ -1,12 +1,174 @@
 from transformers import pipeline
 import os
+import queue
 import threading
+import time
+
+from result_cache import LRUResultCache, text_hash
+from sentiment_lexicon import SENTIMENT_MATCHER
+
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+
+# Inference backend: 'torch' (transformers pipeline) or 'onnx' (onnxruntime, int8)
+SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'torch').lower()
+
+# Pre-baked local model (see bake_model.py): loaded offline with mmap-ed weights
+MODEL_DIR = os.getenv('SENTIMENT_MODEL_DIR', '')
+
+# Long reviews: RoBERTa only sees 512 tokens (510 + <s> and </s>), so longer
+# reviews are split into overlapping windows that run in the same batch
+MAX_MODEL_TOKENS = 512
+LONG_TEXT_MODE = os.getenv('SENTIMENT_LONG_TEXT_MODE', 'true').lower() == 'true'
+WINDOW_TOKENS = min(int(os.getenv('SENTIMENT_WINDOW_TOKENS', '510')), MAX_MODEL_TOKENS - 2)
+WINDOW_OVERLAP = min(int(os.getenv('SENTIMENT_WINDOW_OVERLAP', '64')), WINDOW_TOKENS // 2)
+MAX_FORWARD_BATCH = int(os.getenv('SENTIMENT_MAX_FORWARD_BATCH', '32'))
+
+# Cascade: the fast classifier answers when it is confident enough, only
+# uncertain reviews go on to the transformer
+CASCADE_MODE = os.getenv('SENTIMENT_CASCADE', 'false').lower() == 'true'
+CASCADE_THRESHOLD = float(os.getenv('SENTIMENT_CASCADE_THRESHOLD', '0.9'))
+
+# Run the transformer in separate inference processes (0 = in the request threads)
+INFERENCE_PROCESSES = int(os.getenv('SENTIMENT_INFERENCE_PROCESSES', '0'))
 
 # Initialize sentiment analysis pipeline
 sentiment_pipeline = None
+active_backend = None
+model_revision = None
+# Seconds spent in each load phase of the last (re)load, reported by /api/health
+load_timings = {}
 model_loading = False
 preload_started = False
 model_loading_lock = threading.Lock()
+# Bumped on every (re)load so cached results from an older model are never served
+model_generation = 0
+
+# Cache of final sentiment results, keyed on normalized text + model version
+sentiment_cache = LRUResultCache(
+    max_size=int(os.getenv('SENTIMENT_CACHE_SIZE', '2048')) if os.getenv('SENTIMENT_CACHE_ENABLED', 'true').lower() == 'true' else 0,
+    ttl_seconds=float(os.getenv('SENTIMENT_CACHE_TTL_SECONDS', '3600')),
+    name='sentiment'
+)
+
+
+def _load_torch_pipeline(timings):
+    """Load the sentiment model through the PyTorch transformers pipeline"""
+    global model_revision
+    
+    if MODEL_DIR and os.path.isdir(MODEL_DIR):
+        try:
+            from local_model import load_local_pipeline, read_manifest
+            
+            print(f"[INFO] Memuat model sentiment analysis dari {MODEL_DIR} (offline)...")
+            loaded = load_local_pipeline(MODEL_DIR, timings)
+            model_revision = read_manifest(MODEL_DIR).get('commit')
+            timings['source'] = 'local'
+            return loaded
+        except Exception as e:
+            print(f"[WARNING] Model lokal gagal dimuat, mengunduh dari Hugging Face Hub: {e}")
+            timings.clear()
+    
+    print("[INFO] Mengunduh model sentiment analysis... (pertama kali bisa memakan waktu 5-10 menit)")
+    print(f"       Model: {MODEL_NAME} (~500MB)")
+    timings['source'] = 'hub'
+    phase_start = time.perf_counter()
+    # Using a pre-trained model for sentiment analysis
+    # Use device_map="cpu" to force CPU usage and reduce memory
+    try:
+        loaded = pipeline(
+            "sentiment-analysis",
+            model=MODEL_NAME,
+            return_all_scores=True,
+            device=-1  # Use CPU (-1) instead of GPU to reduce memory usage
+        )
+    except Exception as e:
+        # Fallback without device specification
+        print(f"[WARNING] Error setting device, using default: {e}")
+        loaded = pipeline(
+            "sentiment-analysis",
+            model=MODEL_NAME,
+            return_all_scores=True
+        )
+    timings['download_and_load_s'] = round(time.perf_counter() - phase_start, 3)
+    model_revision = getattr(getattr(getattr(loaded, 'model', None), 'config', None), '_commit_hash', None)
+    return loaded
+
+
+def _load_onnx_pipeline():
+    """Load the int8 ONNX Runtime pipeline (same {'label', 'score'} contract)"""
+    from onnx_sentiment import load_onnx_pipeline
+    
+    print("[INFO] Memuat model sentiment analysis (ONNX Runtime)...")
+    return load_onnx_pipeline(
+        quantized=os.getenv('SENTIMENT_ONNX_QUANTIZED', 'true').lower() == 'true',
+        auto_export=os.getenv('SENTIMENT_ONNX_AUTO_EXPORT', 'true').lower() == 'true'
+    )
+
+
+def _load_pipeline():
+    """Load the pipeline for the configured backend, falling back to torch"""
+    global active_backend, load_timings
+    
+    timings = {}
+    load_start = time.perf_counter()
+    try:
+        if SENTIMENT_BACKEND == 'onnx':
+            try:
+                loaded = _load_onnx_pipeline()
+                active_backend = 'onnx'
+                timings['source'] = 'onnx'
+                return loaded
+            except Exception as e:
+                print(f"[WARNING] ONNX backend gagal dimuat, menggunakan torch: {e}")
+        
+        loaded = _load_torch_pipeline(timings)
+        active_backend = 'torch'
+        _prepare_for_sharing(loaded)
+        return loaded
+    finally:
+        timings['total_s'] = round(time.perf_counter() - load_start, 3)
+        load_timings = timings
+        print(f"[INFO] Model load timings: {timings}")
+
+
+def _prepare_for_sharing(pipe):
+    """
+    Make torch weights safe to share copy-on-write with forked gunicorn workers:
+    inference never writes to them, so the pages stay shared.
+    """
+    model = getattr(pipe, 'model', None)
+    if model is None:
+        return
+    try:
+        model.eval()
+        for param in model.parameters():
+            param.requires_grad_(False)
+        # Optionally move weights to explicit shared memory (needs a /dev/shm
+        # larger than the model, Docker defaults to 64MB)
+        if os.getenv('SENTIMENT_SHARE_MEMORY', 'false').lower() == 'true':
+            model.share_memory()
+            print("[INFO] Model weights moved to shared memory")
+    except Exception as e:
+        print(f"[WARNING] Could not prepare model for sharing: {e}")
+
+
+def configure_worker_process(num_workers=1):
+    """
+    Called in each forked gunicorn worker (post_fork).
+    Sizes torch intra-op threads so N workers don't oversubscribe the cores,
+    and gives ONNX Runtime a fresh session (its thread pools don't survive fork).
+    """
+    if inference_pool is not None:
+        inference_pool.start(num_workers)
+        return
+    if sentiment_pipeline is None:
+        return
+    if active_backend == 'onnx' and hasattr(sentiment_pipeline, 'reset_after_fork'):
+        sentiment_pipeline.reset_after_fork()
+    elif active_backend == 'torch':
+        import torch
+        threads = int(os.getenv('SENTIMENT_TORCH_THREADS', '0')) or max(1, (os.cpu_count() or 1) // max(1, num_workers))
+        torch.set_num_threads(threads)
 
 
 def get_sentiment_pipeline(allow_loading=True):
@@ -17,7 +179,7 @@ def get_sentiment_pipeline(allow_loading=True):
         allow_loading: If False, don't trigger loading (for request handlers)
                       If True, can trigger loading (for background preload)
     """
-    global sentiment_pipeline, model_loading, preload_started
+    global sentiment_pipeline, model_loading, preload_started, model_generation
     
     # If already loaded, return it
     if sentiment_pipeline is not None:
@@ -39,25 +201,9 @@ def get_sentiment_pipeline(allow_loading=True):
             model_loading = True
             preload_started = True
             try:
-                print("[INFO] Mengunduh model sentiment analysis... (pertama kali bisa memakan waktu 5-10 menit)")
-                print("       Model: cardiffnlp/twitter-roberta-base-sentiment-latest (~500MB)")
-                # Using a pre-trained model for sentiment analysis
-                # Use device_map="cpu" to force CPU usage and reduce memory
-                try:
-                    sentiment_pipeline = pipeline(
-                        "sentiment-analysis",
-                        model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                        return_all_scores=True,
-                        device=-1  # Use CPU (-1) instead of GPU to reduce memory usage
-                    )
-                except Exception as e:
-                    # Fallback without device specification
-                    print(f"[WARNING] Error setting device, using default: {e}")
-                    sentiment_pipeline = pipeline(
-                        "sentiment-analysis",
-                        model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                        return_all_scores=True
-                    )
+                sentiment_pipeline = _load_pipeline()
+                model_generation += 1
+                sentiment_cache.clear()
                 print("[SUCCESS] Model berhasil dimuat!")
             except Exception as e:
                 print(f"[ERROR] Failed to load model: {e}")
@@ -69,150 +215,496 @@ def get_sentiment_pipeline(allow_loading=True):
     return sentiment_pipeline
 
 
-def analyze_sentiment(text):
+def reload_sentiment_pipeline():
     """
-    Analyze sentiment of the review text.
+    Drop the loaded pipeline and load it again (e.g. after changing backend files).
+    Cached sentiment results are invalidated by the reload.
+    """
+    global sentiment_pipeline
+    with model_loading_lock:
+        if model_loading:
+            return None
+        sentiment_pipeline = None
+    return get_sentiment_pipeline(allow_loading=True)
+
+
+def get_model_version():
+    """Identifies the model currently serving results (part of the cache key)"""
+    if inference_pool is not None and inference_pool.model_version:
+        return inference_pool.model_version
+    return f"{MODEL_NAME}@{model_revision}:{active_backend}:{model_generation}"
+
+
+def _cache_key(text):
+    return text_hash(text, get_model_version())
+
+
+def _apply_keyword_overrides(text, results):
+    """
+    Turn raw pipeline scores for one review into the final sentiment,
+    applying the Indonesian keyword overrides on top of the model output.
     Returns: {'label': 'positive'/'negative'/'neutral', 'score': float}
     """
-    try:
-        pipeline = get_sentiment_pipeline()
-        results = pipeline(text)[0]
-        
-        # Find the highest score
-        best_result = max(results, key=lambda x: x['score'])
-        label = best_result['label'].lower()
-        score = best_result['score']
-        
-        # Normalize labels to our expected format
-        # Handle different label formats from the model
-        label_lower = label.lower()
+    # Find the highest score
+    best_result = max(results, key=lambda x: x['score'])
+    label = best_result['label'].lower()
+    score = best_result['score']
+    
+    # Normalize labels to our expected format
+    # Handle different label formats from the model
+    label_lower = label.lower()
+    
+    if 'positive' in label_lower or 'pos' in label_lower or 'label_2' in label_lower:
+        normalized_label = 'positive'
+    elif 'negative' in label_lower or 'neg' in label_lower or 'label_0' in label_lower:
+        normalized_label = 'negative'
+    elif 'neutral' in label_lower or 'label_1' in label_lower:
+        normalized_label = 'neutral'
+    else:
+        # Default to neutral if label doesn't match
+        normalized_label = 'neutral'
+    
+    # Additional check for negative keywords (especially for Indonesian)
+    # More aggressive detection for Indonesian language
+    # One pass over the text returns every lexicon category that occurs in it
+    text_lower = text.lower()
+    hits = SENTIMENT_MATCHER.match(text_lower)
+    
+    # Check for negative slang/colloquial expressions
+    has_negative_slang = 'negative_slang' in hits
+    
+    # Check for frustration patterns (short reviews with exclamations/interjections)
+    is_short_frustrated = len(text.strip()) < 50 and 'frustration' in hits
+    
+    # Check for positive and negative patterns
+    has_positive = 'strong_positive' in hits
+    has_negative = 'strong_negative' in hits
+    
+    # Get all scores
+    negative_score = next((r['score'] for r in results if 'neg' in r['label'].lower() or 'label_0' in r['label'].lower()), 0)
+    positive_score = next((r['score'] for r in results if 'pos' in r['label'].lower() or 'label_2' in r['label'].lower()), 0)
+    neutral_score = next((r['score'] for r in results if 'neutral' in r['label'].lower() or 'label_1' in r['label'].lower()), 0)
+    
+    # Priority 0: Check for strong positive indicators
+    if has_positive:
+        # Check for very strong positive words
+        has_very_positive = 'very_positive' in hits
         
-        if 'positive' in label_lower or 'pos' in label_lower or 'label_2' in label_lower:
+        if has_very_positive and (normalized_label == 'neutral' or normalized_label == 'negative'):
+            normalized_label = 'positive'
+            score = max(positive_score, 0.7)  # High confidence for very positive words
+            print(f"[WARNING] Override: Detected very positive keywords, changing to positive (score: {score:.2f})")
+        elif normalized_label == 'neutral' and positive_score > 0.2:
             normalized_label = 'positive'
-        elif 'negative' in label_lower or 'neg' in label_lower or 'label_0' in label_lower:
+            score = max(positive_score, 0.65)
+            print(f"[WARNING] Override: Detected positive keywords, changing from neutral to positive (score: {score:.2f})")
+    
+    # Priority 1: Check for negative slang/frustration (very strong indicator)
+    elif has_negative_slang or is_short_frustrated:
+        if normalized_label != 'negative':
             normalized_label = 'negative'
-        elif 'neutral' in label_lower or 'label_1' in label_lower:
-            normalized_label = 'neutral'
-        else:
-            # Default to neutral if label doesn't match
-            normalized_label = 'neutral'
-        
-        # Additional check for negative keywords (especially for Indonesian)
-        # More aggressive detection for Indonesian language
-        text_lower = text.lower()
-        
-        # Strong positive indicators (especially Indonesian)
-        strong_positive_indicators = [
-            'menarik', 'ketagihan', 'suka', 'sangat suka', 'love', 'loved',
-            'bagus', 'baik', 'excellent', 'sempurna', 'perfect', 'menakjubkan', 'amazing',
-            'recommended', 'rekomendasi', 'puas', 'satisfied', 'senang', 'happy',
-            'worth', 'layak', 'value', 'nilai', 'mantap', 'top', 'terbaik', 'best',
-            'cepat', 'fast', 'efisien', 'efficient', 'mudah', 'easy', 'simple',
-            'enak', 'lezat', 'tasty', 'delicious', 'wow', 'keren', 'cool', 'great'
-        ]
-        
-        # Strong negative indicators (especially Indonesian)
-        strong_negative_indicators = [
-            'tidak sesuai', 'tidak memuaskan', 'tidak layak', 'tidak recommended',
-            'tidak bagus', 'tidak baik', 'tidak puas', 'tidak worth',
-            'tidak sesuai ekspektasi', 'tidak sesuai harapan', 'tidak sesuai dengan',
-            'kecewa', 'buruk', 'jelek', 'rusak', 'masalah', 'cacat', 'menyesal',
-            'mahal', 'overpriced', 'waste', 'disappointed', 'terrible', 'awful',
-            'not worth', 'poor quality', 'bad quality', 'does not meet', 'doesn\'t meet',
-            'kurang', 'lemah', 'gagal', 'gajelas', 'gaje', 'gak jelas', 'tidak jelas',
-            'aneh', 'weird', 'strange', 'tidak enak', 'tidak nyaman', 'tidak nyaman',
-            'bau', 'busuk', 'tidak fresh', 'tidak segar', 'tidak layak konsumsi'
-        ]
-        
-        # Indonesian slang/colloquial negative words (kata-kata kasar/frustrasi)
-        negative_slang = [
-            'gajelas', 'gaje', 'gak jelas', 'gak jelas', 'gak jelas',
-            'apalah', 'apaan', 'apa ini', 'apa sih', 'gimana sih',
-            'woi', 'weh', 'waduh', 'astaga', 'ya ampun',
-            'sampah', 'rubbish', 'trash', 'junk', 'garbage',
-            'ngaco', 'ngawur', 'sembarangan', 'asal-asalan'
-        ]
-        
-        # Check for negative slang/colloquial expressions
-        has_negative_slang = any(slang in text_lower for slang in negative_slang)
-        
-        # Check for frustration patterns (short reviews with exclamations/interjections)
-        is_short_frustrated = len(text.strip()) < 50 and any(word in text_lower for word in [
-            'woi', 'weh', 'apalah', 'apaan', 'gajelas', 'gaje', 'gimana', 'kenapa'
-        ])
-        
-        # Check for positive and negative patterns
-        has_positive = any(indicator in text_lower for indicator in strong_positive_indicators)
-        has_negative = any(indicator in text_lower for indicator in strong_negative_indicators)
-        
-        # Get all scores
-        negative_score = next((r['score'] for r in results if 'neg' in r['label'].lower() or 'label_0' in r['label'].lower()), 0)
-        positive_score = next((r['score'] for r in results if 'pos' in r['label'].lower() or 'label_2' in r['label'].lower()), 0)
-        neutral_score = next((r['score'] for r in results if 'neutral' in r['label'].lower() or 'label_1' in r['label'].lower()), 0)
-        
-        # Priority 0: Check for strong positive indicators
-        if has_positive:
-            # Check for very strong positive words
-            very_positive_words = ['menarik', 'ketagihan', 'suka', 'love', 'bagus', 'baik', 'excellent', 'sempurna', 'mantap', 'terbaik']
-            has_very_positive = any(word in text_lower for word in very_positive_words)
-            
-            if has_very_positive and (normalized_label == 'neutral' or normalized_label == 'negative'):
-                normalized_label = 'positive'
-                score = max(positive_score, 0.7)  # High confidence for very positive words
-                print(f"[WARNING] Override: Detected very positive keywords, changing to positive (score: {score:.2f})")
-            elif normalized_label == 'neutral' and positive_score > 0.2:
-                normalized_label = 'positive'
-                score = max(positive_score, 0.65)
-                print(f"[WARNING] Override: Detected positive keywords, changing from neutral to positive (score: {score:.2f})")
-        
-        # Priority 1: Check for negative slang/frustration (very strong indicator)
-        elif has_negative_slang or is_short_frustrated:
-            if normalized_label != 'negative':
-                normalized_label = 'negative'
-                score = max(negative_score, 0.7)  # High confidence for slang/frustration
-                print(f"[WARNING] Override: Detected negative slang/frustration, changing to negative (score: {score:.2f})")
+            score = max(negative_score, 0.7)  # High confidence for slang/frustration
+            print(f"[WARNING] Override: Detected negative slang/frustration, changing to negative (score: {score:.2f})")
+    
+    # Priority 2: More aggressive override for Indonesian negative patterns
+    elif has_negative:
+        # Check for specific strong negative patterns
+        has_very_negative = 'very_negative' in hits
         
-        # Priority 2: More aggressive override for Indonesian negative patterns
-        elif has_negative:
-            # Check for specific strong negative patterns
-            very_negative_patterns = [
-                'tidak sesuai', 'tidak memuaskan', 'tidak layak', 'kecewa',
-                'buruk', 'jelek', 'rusak', 'masalah', 'cacat', 'gajelas', 'gaje',
-                'tidak enak', 'bau', 'busuk', 'aneh', 'weird'
-            ]
-            has_very_negative = any(pattern in text_lower for pattern in very_negative_patterns)
-            
-            # If model says neutral/positive but text has very negative words, override
-            if (normalized_label == 'neutral' or normalized_label == 'positive') and has_very_negative:
-                normalized_label = 'negative'
-                score = max(negative_score, 0.65)  # Set minimum score to 0.65
-                print(f"[WARNING] Override: Detected very negative keywords, changing from {normalized_label} to negative (score: {score:.2f})")
-            # If model says neutral but has any negative indicator
-            elif normalized_label == 'neutral' and has_negative:
-                # More aggressive: override even if negative_score is low
+        # If model says neutral/positive but text has very negative words, override
+        if (normalized_label == 'neutral' or normalized_label == 'positive') and has_very_negative:
+            normalized_label = 'negative'
+            score = max(negative_score, 0.65)  # Set minimum score to 0.65
+            print(f"[WARNING] Override: Detected very negative keywords, changing from {normalized_label} to negative (score: {score:.2f})")
+        # If model says neutral but has any negative indicator
+        elif normalized_label == 'neutral' and has_negative:
+            # More aggressive: override even if negative_score is low
+            normalized_label = 'negative'
+            score = max(negative_score, 0.6)
+            print(f"[WARNING] Override: Detected negative keywords, changing from neutral to negative (score: {score:.2f})")
+    
+    # Priority 3: For short reviews with negative tone, be more aggressive
+    elif len(text.strip()) < 30:
+        # Check if it's likely negative based on tone
+        if 'negative_tone' in hits:
+            if normalized_label == 'neutral' and negative_score > 0.15:  # Lower threshold for short reviews
                 normalized_label = 'negative'
-                score = max(negative_score, 0.6)
-                print(f"[WARNING] Override: Detected negative keywords, changing from neutral to negative (score: {score:.2f})")
+                score = max(negative_score, 0.65)
+                print(f"[WARNING] Override: Short review with negative tone, changing to negative (score: {score:.2f})")
+    
+    return {
+        'label': normalized_label,
+        'score': float(score)
+    }
+
+
+def _fallback_result():
+    return {
+        'label': 'neutral',
+        'score': 0.5,
+        'tier': 'fallback'
+    }
+
+
+def is_model_ready():
+    """True once the transformer pipeline is loaded (non-blocking)"""
+    if inference_pool is not None:
+        return inference_pool.is_ready()
+    return sentiment_pipeline is not None
+
+
+def _fast_tier(text):
+    """
+    Returns: (confidence, sentiment) from the fast classifier, where confidence
+             is its raw top-label probability (before keyword overrides)
+    """
+    from fast_classifier import get_fast_classifier
+    
+    results = get_fast_classifier().predict(text)
+    confidence = max(r['score'] for r in results)
+    sentiment = _apply_keyword_overrides(text, results)
+    sentiment['tier'] = 'fast'
+    return confidence, sentiment
+
+
+def analyze_sentiment_fast(text):
+    """
+    Analyze sentiment with the lightweight hashed n-gram classifier.
+    Used while the transformer model is still loading; the keyword overrides
+    are applied the same way as for the transformer.
+    Returns: {'label': 'positive'/'negative'/'neutral', 'score': float, 'tier': 'fast'}
+    """
+    try:
+        return _fast_tier(text)[1]
+    except Exception as e:
+        print(f"Fast sentiment analysis error: {str(e)}")
+        return _fallback_result()
+
+
+class CascadeStats:
+    """Per-tier counters for the fast -> transformer cascade"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fast = 0
+        self.transformer = 0
+    
+    def record(self, tier, count=1):
+        with self._lock:
+            setattr(self, tier, getattr(self, tier) + count)
+    
+    def get_stats(self):
+        with self._lock:
+            total = self.fast + self.transformer
+            return {
+                'enabled': CASCADE_MODE,
+                'threshold': CASCADE_THRESHOLD,
+                'fast': self.fast,
+                'transformer': self.transformer,
+                'fast_ratio': round(self.fast / total, 4) if total else 0.0
+            }
+
+
+cascade_stats = CascadeStats()
+
+
+def _cascade_fast_answer(text):
+    """Returns: the fast tier's sentiment if it clears the cascade threshold, else None"""
+    try:
+        confidence, sentiment = _fast_tier(text)
+    except Exception as e:
+        print(f"Fast sentiment analysis error: {str(e)}")
+        return None
+    if confidence >= CASCADE_THRESHOLD:
+        cascade_stats.record('fast')
+        return sentiment
+    cascade_stats.record('transformer')
+    return None
+
+
+def _split_into_windows(tokenizer, text):
+    """
+    Split a review into overlapping token windows that each fit the model.
+    Returns: list of (window_text, weight) where weight is the number of tokens
+             the window adds on top of the previous one (weights sum to the
+             review length in tokens)
+    """
+    # Byte-level BPE never produces more tokens than UTF-8 bytes, so short
+    # reviews skip the extra tokenization pass entirely
+    if not LONG_TEXT_MODE or tokenizer is None or len(text.encode('utf-8')) <= WINDOW_TOKENS:
+        return [(text, 1)]
+    
+    ids = tokenizer(text, add_special_tokens=False)['input_ids']
+    if len(ids) <= WINDOW_TOKENS:
+        return [(text, len(ids))]
+    
+    windows = []
+    step = WINDOW_TOKENS - WINDOW_OVERLAP
+    for start in range(0, len(ids), step):
+        chunk = ids[start:start + WINDOW_TOKENS]
+        weight = len(chunk) if start == 0 else len(chunk) - WINDOW_OVERLAP
+        windows.append((tokenizer.decode(chunk), weight))
+        if start + WINDOW_TOKENS >= len(ids):
+            break
+    return windows
+
+
+def _combine_windows(window_results, weights):
+    """Length-weighted average of each label's score across windows"""
+    if len(window_results) == 1:
+        return window_results[0]
+    total = float(sum(weights))
+    combined = {}
+    for results, weight in zip(window_results, weights):
+        for r in results:
+            combined[r['label']] = combined.get(r['label'], 0.0) + r['score'] * weight / total
+    return [{'label': label, 'score': score} for label, score in combined.items()]
+
+
+def _analyze_uncached_batch(texts):
+    """
+    Run texts through the pipeline as one padded batch and apply the keyword overrides.
+    Long reviews contribute one batch item per window.
+    Successful results are stored in the sentiment cache.
+    """
+    if not texts:
+        return []
+    
+    try:
+        pipeline = get_sentiment_pipeline()
+        tokenizer = getattr(pipeline, 'tokenizer', None)
         
-        # Priority 3: For short reviews with negative tone, be more aggressive
-        elif len(text.strip()) < 30:
-            # Check if it's likely negative based on tone
-            negative_tone_words = ['woi', 'apalah', 'gajelas', 'gaje', 'jelek', 'buruk', 'aneh']
-            if any(word in text_lower for word in negative_tone_words):
-                if normalized_label == 'neutral' and negative_score > 0.15:  # Lower threshold for short reviews
-                    normalized_label = 'negative'
-                    score = max(negative_score, 0.65)
-                    print(f"[WARNING] Override: Short review with negative tone, changing to negative (score: {score:.2f})")
+        # Flatten all windows of all reviews into a single batch
+        window_texts = []
+        spans = []
+        for text in texts:
+            windows = _split_into_windows(tokenizer, text)
+            spans.append((len(window_texts), [weight for _, weight in windows]))
+            window_texts.extend(window for window, _ in windows)
         
+        window_results = pipeline(
+            window_texts,
+            batch_size=min(len(window_texts), MAX_FORWARD_BATCH),
+            truncation=True,
+            max_length=MAX_MODEL_TOKENS
+        )
+    except Exception as e:
+        # Fallback to neutral for the whole batch if the model call fails
+        print(f"Sentiment analysis error: {str(e)}")
+        return [_fallback_result() for _ in texts]
+    
+    sentiments = []
+    for text, (start, weights) in zip(texts, spans):
+        try:
+            results = _combine_windows(window_results[start:start + len(weights)], weights)
+            sentiment = _apply_keyword_overrides(text, results)
+            sentiment['windows'] = len(weights)
+            sentiment['tier'] = 'transformer'
+            sentiment_cache.set(_cache_key(text), sentiment)
+        except Exception as e:
+            print(f"Sentiment analysis error: {str(e)}")
+            sentiment = _fallback_result()
+        sentiments.append(sentiment)
+    return sentiments
+
+
+def _compute_uncached(texts):
+    """
+    Score texts with the transformer: in an inference process when the pool is
+    enabled, otherwise in the calling thread. While no inference process is
+    ready (starting, or being replaced after it died) the fast classifier
+    answers - loading the model in a request thread is what the pool avoids.
+    """
+    if inference_pool is not None:
+        if not inference_pool.is_ready():
+            print("[WARNING] No sentiment inference process ready, using fast sentiment classifier")
+            return [analyze_sentiment_fast(text) for text in texts]
+        sentiments = inference_pool.submit(texts)
+        if sentiments is None:
+            print("[WARNING] Sentiment inference process timed out")
+            return [_fallback_result() for _ in texts]
+        for text, sentiment in zip(texts, sentiments):
+            if sentiment.get('tier') == 'transformer':
+                sentiment_cache.set(_cache_key(text), sentiment)
+        return sentiments
+    return _analyze_uncached_batch(texts)
+
+
+def analyze_sentiment_batch(texts):
+    """
+    Analyze sentiment of several review texts with a single padded forward pass.
+    Cached reviews (and, in cascade mode, reviews the fast classifier is sure
+    about) are answered without the model; keyword overrides are still
+    applied per review.
+    Returns: list of {'label': 'positive'/'negative'/'neutral', 'score': float,
+             'windows': int, 'tier': str} in the same order as texts
+    """
+    texts = list(texts)
+    sentiments = [sentiment_cache.get(_cache_key(text)) for text in texts]
+    if CASCADE_MODE:
+        for i, text in enumerate(texts):
+            if sentiments[i] is None:
+                sentiments[i] = _cascade_fast_answer(text)
+    missing = [i for i, sentiment in enumerate(sentiments) if sentiment is None]
+    if missing:
+        computed = _compute_uncached([texts[i] for i in missing])
+        for i, sentiment in zip(missing, computed):
+            sentiments[i] = sentiment
+    return sentiments
+
+
+class _PendingSentiment:
+    """A single analyze_sentiment call waiting for its micro-batch to finish"""
+    
+    def __init__(self, text):
+        self.text = text
+        self.result = None
+        self.done = threading.Event()
+
+
+class SentimentMicroBatcher:
+    """
+    Collects concurrent analyze_sentiment calls for a few milliseconds and runs
+    them as one padded batch through the sentiment pipeline.
+    
+    A lone request is never held back: the worker only waits for more items
+    while other callers are actually in flight.
+    """
+    
+    def __init__(self, max_batch_size=16, max_wait_ms=5):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._worker = None
+        self._worker_pid = None
+        self.batches_run = 0
+        self.items_run = 0
+    
+    def _ensure_worker(self):
+        # Threads don't survive fork, so a forked worker process starts its own
+        if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+                return
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._inflight = 0
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name="sentiment-micro-batcher", daemon=True)
+            self._worker.start()
+    
+    def submit(self, text):
+        """Queue text for the next micro-batch and block until its result is ready"""
+        self._ensure_worker()
+        item = _PendingSentiment(text)
+        with self._lock:
+            self._inflight += 1
+        try:
+            self._queue.put(item)
+            item.done.wait()
+        finally:
+            with self._lock:
+                self._inflight -= 1
+        return item.result
+    
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            # Only wait if other callers are still about to enqueue
+            with self._lock:
+                waiting_for_more = self._inflight > len(batch)
+            remaining = deadline - time.monotonic()
+            if not waiting_for_more or remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                results = _compute_uncached([item.text for item in batch])
+            except Exception as e:
+                print(f"[ERROR] Micro-batch sentiment analysis failed: {e}")
+                results = [_fallback_result() for _ in batch]
+            self.batches_run += 1
+            self.items_run += len(batch)
+            for item, result in zip(batch, results):
+                item.result = result
+                item.done.set()
+    
+    def get_stats(self):
         return {
-            'label': normalized_label,
-            'score': float(score)
+            'batches': self.batches_run,
+            'items': self.items_run,
+            'avg_batch_size': round(self.items_run / self.batches_run, 2) if self.batches_run else 0.0,
+            'inflight': self._inflight
         }
+
+
+micro_batching_enabled = os.getenv('SENTIMENT_MICRO_BATCHING', 'true').lower() == 'true'
+micro_batcher = SentimentMicroBatcher(
+    max_batch_size=int(os.getenv('SENTIMENT_BATCH_MAX_SIZE', '16')),
+    max_wait_ms=float(os.getenv('SENTIMENT_BATCH_MAX_WAIT_MS', '5'))
+)
+
+
+inference_pool = None
+if INFERENCE_PROCESSES > 0:
+    from inference_worker import InferencePool
+    
+    inference_pool = InferencePool(
+        num_processes=INFERENCE_PROCESSES,
+        torch_threads=int(os.getenv('SENTIMENT_TORCH_THREADS', '0')),
+        max_batch_items=MAX_FORWARD_BATCH,
+        timeout=float(os.getenv('SENTIMENT_INFERENCE_TIMEOUT', '60'))
+    )
+
+
+def start_inference_pool(num_workers=1):
+    """Start the inference processes for this process; False when the pool is disabled"""
+    if inference_pool is None:
+        return False
+    inference_pool.start(num_workers)
+    return True
+
+
+def analyze_sentiment(text):
+    """
+    Analyze sentiment of the review text.
+    Repeated reviews are served from the result cache. With SENTIMENT_CASCADE
+    the fast classifier answers when its confidence clears the threshold.
+    Remaining calls are grouped into micro-batches when SENTIMENT_MICRO_BATCHING
+    is enabled, and run in an inference process with SENTIMENT_INFERENCE_PROCESSES.
+    Reviews longer than the model's 512 tokens are scored over sliding windows.
+    Returns: {'label': 'positive'/'negative'/'neutral', 'score': float, 'windows': int,
+              'tier': 'transformer'/'fast'/'fallback'}
+    """
+    try:
+        cached = sentiment_cache.get(_cache_key(text))
+        if cached is not None:
+            return cached
+        if CASCADE_MODE:
+            fast = _cascade_fast_answer(text)
+            if fast is not None:
+                return fast
+        if micro_batching_enabled:
+            return micro_batcher.submit(text)
+        return _compute_uncached([text])[0]
     except Exception as e:
         # Fallback to neutral if analysis fails
         print(f"Sentiment analysis error: {str(e)}")
-        return {
-            'label': 'neutral',
-            'score': 0.5
-        }
+        return _fallback_result()
 
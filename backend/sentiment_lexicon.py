@@ -0,0 +1,75 @@
+"""
+Keyword lexicons used by the sentiment overrides in sentiment_analyzer.
+
+Each category is a list of lowercase phrases matched as substrings of the
+lowercased review. SENTIMENT_MATCHER is compiled once at import, so one pass
+over the text gives every category hit.
+"""
+from lexicon_matcher import LexiconMatcher
+
+SENTIMENT_LEXICON = {
+    # Strong positive indicators (especially Indonesian)
+    'strong_positive': [
+        'menarik', 'ketagihan', 'suka', 'sangat suka', 'love', 'loved',
+        'bagus', 'baik', 'excellent', 'sempurna', 'perfect', 'menakjubkan', 'amazing',
+        'recommended', 'rekomendasi', 'puas', 'satisfied', 'senang', 'happy',
+        'worth', 'layak', 'value', 'nilai', 'mantap', 'top', 'terbaik', 'best',
+        'cepat', 'fast', 'efisien', 'efficient', 'mudah', 'easy', 'simple',
+        'enak', 'lezat', 'tasty', 'delicious', 'wow', 'keren', 'cool', 'great'
+    ],
+
+    # Strong negative indicators (especially Indonesian)
+    'strong_negative': [
+        'tidak sesuai', 'tidak memuaskan', 'tidak layak', 'tidak recommended',
+        'tidak bagus', 'tidak baik', 'tidak puas', 'tidak worth',
+        'tidak sesuai ekspektasi', 'tidak sesuai harapan', 'tidak sesuai dengan',
+        'kecewa', 'buruk', 'jelek', 'rusak', 'masalah', 'cacat', 'menyesal',
+        'mahal', 'overpriced', 'waste', 'disappointed', 'terrible', 'awful',
+        'not worth', 'poor quality', 'bad quality', 'does not meet', 'doesn\'t meet',
+        'kurang', 'lemah', 'gagal', 'gajelas', 'gaje', 'gak jelas', 'tidak jelas',
+        'aneh', 'weird', 'strange', 'tidak enak', 'tidak nyaman',
+        'bau', 'busuk', 'tidak fresh', 'tidak segar', 'tidak layak konsumsi'
+    ],
+
+    # Indonesian slang/colloquial negative words (kata-kata kasar/frustrasi)
+    'negative_slang': [
+        'gajelas', 'gaje', 'gak jelas',
+        'apalah', 'apaan', 'apa ini', 'apa sih', 'gimana sih',
+        'woi', 'weh', 'waduh', 'astaga', 'ya ampun',
+        'sampah', 'rubbish', 'trash', 'junk', 'garbage',
+        'ngaco', 'ngawur', 'sembarangan', 'asal-asalan'
+    ],
+
+    # Interjections that signal frustration in short reviews (< 50 chars)
+    'frustration': [
+        'woi', 'weh', 'apalah', 'apaan', 'gajelas', 'gaje', 'gimana', 'kenapa'
+    ],
+
+    # Very strong positive words - override neutral/negative model output
+    'very_positive': [
+        'menarik', 'ketagihan', 'suka', 'love', 'bagus', 'baik', 'excellent',
+        'sempurna', 'mantap', 'terbaik'
+    ],
+
+    # Very strong negative patterns - override neutral/positive model output
+    'very_negative': [
+        'tidak sesuai', 'tidak memuaskan', 'tidak layak', 'kecewa',
+        'buruk', 'jelek', 'rusak', 'masalah', 'cacat', 'gajelas', 'gaje',
+        'tidak enak', 'bau', 'busuk', 'aneh', 'weird'
+    ],
+
+    # Negative tone in very short reviews (< 30 chars)
+    'negative_tone': [
+        'woi', 'apalah', 'gajelas', 'gaje', 'jelek', 'buruk', 'aneh'
+    ],
+}
+
+SENTIMENT_MATCHER = LexiconMatcher(SENTIMENT_LEXICON)
+
+# Neutral seed phrases for training the fast classifier (fast_classifier.py);
+# not used by the override rules
+NEUTRAL_SEED_PHRASES = [
+    'biasa saja', 'biasa aja', 'lumayan', 'standar', 'cukup', 'oke', 'ok',
+    'sesuai deskripsi', 'barang sampai', 'sudah diterima', 'barang diterima',
+    'average', 'okay', 'not bad', 'so so', 'normal', 'it is fine', 'nothing special'
+]
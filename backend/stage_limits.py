@@ -0,0 +1,41 @@
+"""
+Per-process caps on the analysis stages in flight.
+
+A sentiment stage (model inference) or key point stage (provider calls)
+can't be interrupted once it runs, so every path that runs one takes a slot
+of its kind first: analyze_review and its stream variant, the bulk
+/api/analyze-reviews, the ingest runner and the key point enricher. That way
+ANALYZE_STAGE_MAX_INFLIGHT bounds the stages of one kind per process
+whatever mix of requests and background jobs is running.
+
+Request paths don't wait for a slot, they answer with their fallback right
+away (try_acquire); background paths wait for one (stage_slot).
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+# Stages of one kind running at once, including timed-out ones that haven't returned yet
+ANALYZE_STAGE_MAX_INFLIGHT = int(os.getenv('ANALYZE_STAGE_MAX_INFLIGHT', '4'))
+STAGES = ('sentiment', 'key_points')
+
+_slots = {name: threading.BoundedSemaphore(max(1, ANALYZE_STAGE_MAX_INFLIGHT)) for name in STAGES}
+
+
+def try_acquire(name):
+    """Returns: True if a slot of this kind was taken (give it back with release)"""
+    return _slots[name].acquire(blocking=False)
+
+
+def release(name):
+    _slots[name].release()
+
+
+@contextmanager
+def stage_slot(name):
+    """Hold a slot of this kind for the block, waiting while they're all taken"""
+    _slots[name].acquire()
+    try:
+        yield
+    finally:
+        _slots[name].release()
@@ -3,32 +3,22 @@
 # This script ensures PORT is set correctly
 
 # Get PORT from environment (Render sets this automatically)
-PORT=${PORT:-5000}
+export PORT=${PORT:-5000}
+
+# The model is loaded once in the gunicorn master and shared copy-on-write by
+# all workers (see gunicorn.conf.py), so extra workers cost little memory.
+# Check per-worker unique memory (worker.uss_mb) in /api/health before scaling up.
+export WEB_CONCURRENCY=${WEB_CONCURRENCY:-1}
+export GUNICORN_THREADS=${GUNICORN_THREADS:-2}
 
 echo "=========================================="
 echo "Starting ReviewInsight Backend"
 echo "=========================================="
 echo "PORT: $PORT"
-echo "Workers: 1 (reduced for memory efficiency)"
-echo "Threads: 2"
+echo "Workers: $WEB_CONCURRENCY (model shared between workers)"
+echo "Threads: $GUNICORN_THREADS"
 echo "Timeout: 300s (increased for AI processing)"
 echo "=========================================="
 
-# Use single worker to reduce memory usage (torch + transformers are heavy)
-# Render free tier has limited memory, so we use 1 worker instead of 2
 # Increased timeout to 300s because AI model processing can take time
-exec gunicorn \
-    --bind 0.0.0.0:$PORT \
-    --workers 1 \
-    --threads 2 \
-    --timeout 300 \
-    --worker-class gthread \
-    --worker-connections 1000 \
-    --max-requests 1000 \
-    --max-requests-jitter 50 \
-    --preload \
-    --log-level info \
-    --access-logfile - \
-    --error-logfile - \
-    app:app
-
+exec gunicorn --config gunicorn.conf.py app:app
@@ -0,0 +1,81 @@
+"""
+Tests for the bulk analysis endpoint (POST /api/analyze-reviews in app.py)
+
+Usage:
+    python -m pytest test_analyze_reviews.py
+"""
+import time
+
+import stage_limits
+
+
+def _stub_stages(backend, monkeypatch, key_points_delay=0.0):
+    def sentiments(texts):
+        return [{'label': 'positive', 'score': 0.9, 'tier': 'transformer'} for _ in texts]
+
+    def key_points(texts):
+        time.sleep(key_points_delay)
+        return [f'• remote {text}' for text in texts]
+
+    monkeypatch.setattr(backend, '_analyze_sentiments_bulk', sentiments)
+    monkeypatch.setattr(backend, '_extract_key_points_bulk', key_points)
+    monkeypatch.setattr(backend, 'extract_key_points_local', lambda text: f'• local {text}')
+    monkeypatch.setattr(backend, '_safe_sentiment_fast', lambda text: {'label': 'neutral', 'score': 0.5, 'tier': 'fast'})
+
+
+def _post(backend, reviews):
+    return backend.app.test_client().post('/api/analyze-reviews', json={'reviews': reviews}).get_json()
+
+
+def test_invalid_items_fail_alone(backend_app, monkeypatch):
+    _stub_stages(backend_app, monkeypatch)
+    body = _post(backend_app, ['bagus', '', {'review_text': 'jelek'}, 42, {'text': 'x'}])
+
+    assert body['processed'] == 2
+    assert body['failed'] == 3
+    results = body['results']
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    for i in (1, 3, 4):
+        assert results[i]['error'] == 'review_text is required'
+    assert results[0]['key_points'] == '• remote bagus'
+    assert results[2]['sentiment'] == 'positive'
+    assert results[0]['id'] and results[2]['id']
+
+
+def test_late_key_points_stage_falls_back(backend_app, monkeypatch):
+    _stub_stages(backend_app, monkeypatch, key_points_delay=1.0)
+    monkeypatch.setattr(backend_app, 'KEY_POINTS_STAGE_TIMEOUT_S', 0.05)
+    started = time.monotonic()
+    body = _post(backend_app, ['bagus', 'jelek'])
+
+    assert time.monotonic() - started < 1.0
+    assert body['failed'] == 0
+    assert body['stage_timings_ms']['key_points_timed_out'] is True
+    assert [result['key_points'] for result in body['results']] == ['• local bagus', '• local jelek']
+    # Sentiment finished in time and is kept
+    assert all(result['sentiment'] == 'positive' for result in body['results'])
+
+
+def test_stage_without_slot_falls_back(backend_app, monkeypatch):
+    _stub_stages(backend_app, monkeypatch)
+    monkeypatch.setattr(stage_limits, 'try_acquire', lambda name: name != 'sentiment')
+    body = _post(backend_app, ['bagus'])
+
+    assert body['stage_timings_ms']['sentiment_overloaded'] is True
+    assert body['results'][0]['sentiment_tier'] == 'fast'
+    assert body['results'][0]['key_points'] == '• remote bagus'
+
+
+def test_failed_save_still_returns_results(backend_app, monkeypatch):
+    _stub_stages(backend_app, monkeypatch)
+
+    def failing_commit():
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(backend_app.db.session, 'commit', failing_commit)
+    body = _post(backend_app, ['bagus', ''])
+
+    assert body['processed'] == 1
+    assert body['results'][0]['warning'] == 'Review tidak dapat disimpan ke database'
+    assert 'id' not in body['results'][0]
+    assert body['results'][1]['error'] == 'review_text is required'
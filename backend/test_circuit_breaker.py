@@ -0,0 +1,54 @@
+"""
+Tests for the provider circuit breakers (circuit_breaker.py)
+
+Usage:
+    python -m pytest test_circuit_breaker.py
+"""
+import requests
+
+from circuit_breaker import OPEN, CLOSED, CircuitBreaker, QuotaExceededError, is_quota_error
+
+CONNECTION_ERROR = (
+    "HTTPSConnectionPool(host='api.groq.com', port=443): Max retries exceeded with url: "
+    "/openai/v1/chat/completions (Caused by NewConnectionError('Failed to establish a new connection'))"
+)
+
+
+def _http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} Client Error", response=response)
+
+
+def test_connection_error_is_not_a_quota_error():
+    assert not is_quota_error(requests.ConnectionError(CONNECTION_ERROR))
+    assert not is_quota_error(requests.ConnectTimeout(CONNECTION_ERROR))
+    assert not is_quota_error(CONNECTION_ERROR)
+
+
+def test_quota_errors():
+    assert is_quota_error(QuotaExceededError("Groq API quota habis"))
+    assert is_quota_error(_http_error(429))
+    assert is_quota_error("429 Resource has been exhausted (e.g. check quota).")
+    assert is_quota_error("RESOURCE_EXHAUSTED")
+    assert not is_quota_error(_http_error(500))
+
+
+def test_connection_error_counts_toward_threshold():
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30.0, quota_cooldown=3600.0)
+    breaker.record_failure(requests.ConnectionError(CONNECTION_ERROR))
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+    breaker.record_failure(requests.ConnectTimeout(CONNECTION_ERROR))
+    assert breaker.state == CLOSED
+    breaker.record_failure(requests.ConnectionError(CONNECTION_ERROR))
+    assert breaker.state == OPEN
+    # Opened by the failure threshold, not for the quota cooldown
+    assert breaker.get_state()['open_for_s'] <= 30.0
+
+
+def test_quota_error_opens_immediately():
+    breaker = CircuitBreaker('test', failure_threshold=3, quota_cooldown=60.0)
+    breaker.record_failure(QuotaExceededError("Groq API quota habis", retry_after=120))
+    assert breaker.state == OPEN
+    assert breaker.get_state()['open_for_s'] > 60.0
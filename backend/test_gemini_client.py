@@ -0,0 +1,65 @@
+"""
+Tests for the Gemini client registry (gemini_client.py)
+
+Usage:
+    python -m pytest test_gemini_client.py
+"""
+import pytest
+
+import gemini_client
+import key_points_extractor
+from circuit_breaker import CLOSED, get_breaker
+from gemini_client import GeminiClientRegistry, GeminiModelsExhaustedError
+
+MODELS = ['model-a', 'model-b', 'model-c', 'model-d']
+
+
+class QuotaModel:
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def generate_content(self, prompt):
+        self.calls.append(self.name)
+        raise Exception("429 Resource has been exhausted (e.g. check quota).")
+
+
+class PassThroughClient:
+    def call(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    calls = []
+    registry = GeminiClientRegistry(quota_cooldown=60)
+    monkeypatch.setattr(gemini_client.genai, 'configure', lambda api_key: None)
+    monkeypatch.setattr(registry, '_available_models', lambda: list(MODELS))
+    monkeypatch.setattr(registry, 'get_model', lambda name: QuotaModel(name, calls))
+    monkeypatch.setattr(gemini_client, 'get_provider_client', lambda name: PassThroughClient())
+    monkeypatch.setattr(gemini_client.rate_limiter, 'try_acquire', lambda name: True)
+    registry.calls = calls
+    return registry
+
+
+def test_only_tried_models_cool_down(registry):
+    with pytest.raises(GeminiModelsExhaustedError):
+        registry.generate('key', 'prompt', max_attempts=3)
+    assert registry.calls == MODELS[:3]
+    assert registry.candidate_models() == ['model-d']
+
+
+def test_exhausted_models_do_not_open_the_gemini_circuit(registry, monkeypatch):
+    monkeypatch.setattr(key_points_extractor, 'gemini_registry', registry)
+    monkeypatch.setenv('GEMINI_API_KEY', 'key')
+    breaker = get_breaker('gemini')
+    breaker.record_success()
+
+    with pytest.raises(GeminiModelsExhaustedError):
+        key_points_extractor._call_provider('gemini', key_points_extractor.extract_key_points_gemini, 'review', cache=False)
+    assert breaker.state == CLOSED
+    # The model that wasn't tried yet still gets its turn
+    with pytest.raises(GeminiModelsExhaustedError):
+        key_points_extractor._call_provider('gemini', key_points_extractor.extract_key_points_gemini, 'review', cache=False)
+    assert registry.calls == MODELS
+    assert breaker.state == CLOSED
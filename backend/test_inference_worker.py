@@ -0,0 +1,155 @@
+"""
+Tests for the out-of-process sentiment inference pool (inference_worker.py)
+
+Usage:
+    python -m pytest test_inference_worker.py
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import inference_worker
+from inference_worker import CHILD_ENV, InferencePool
+
+# Stand-ins for the packages of the torch-free ONNX image. The spawned
+# inference processes get the parent's sys.path, so they import these too.
+TORCH_STUB = 'raise ImportError("No module named \'torch\'")\n'
+
+ONNXRUNTIME_STUB = '''
+import os
+
+
+class SessionOptions:
+    intra_op_num_threads = 0
+    graph_optimization_level = None
+
+
+class GraphOptimizationLevel:
+    ORT_ENABLE_ALL = 99
+
+
+class _Input:
+    def __init__(self, name):
+        self.name = name
+
+
+class InferenceSession:
+    def __init__(self, path, options, providers=None):
+        with open(os.environ['FAKE_ORT_THREADS_FILE'], 'w') as f:
+            f.write(str(options.intra_op_num_threads))
+
+    def get_inputs(self):
+        return [_Input('input_ids'), _Input('attention_mask')]
+'''
+
+TRANSFORMERS_STUB = '''
+def pipeline(*args, **kwargs):
+    raise RuntimeError("the torch pipeline must not be loaded")
+
+
+class _Config:
+    id2label = {0: 'negative', 1: 'neutral', 2: 'positive'}
+
+
+class AutoConfig:
+    @staticmethod
+    def from_pretrained(model_dir):
+        return _Config()
+
+
+class AutoTokenizer:
+    @staticmethod
+    def from_pretrained(model_dir):
+        return object()
+'''
+
+
+def _stub_onnx_model(tmp_path, monkeypatch):
+    """Returns: the file the fake ONNX Runtime session writes its thread count to"""
+    stubs = tmp_path / 'stubs'
+    stubs.mkdir()
+    (stubs / 'torch.py').write_text(TORCH_STUB)
+    (stubs / 'onnxruntime.py').write_text(ONNXRUNTIME_STUB)
+    (stubs / 'transformers.py').write_text(TRANSFORMERS_STUB)
+    model_dir = tmp_path / 'onnx_model'
+    model_dir.mkdir()
+    (model_dir / 'model.int8.onnx').write_bytes(b'')
+    threads_file = tmp_path / 'ort_threads'
+
+    monkeypatch.syspath_prepend(str(stubs))
+    monkeypatch.setenv('SENTIMENT_BACKEND', 'onnx')
+    monkeypatch.setenv('SENTIMENT_ONNX_DIR', str(model_dir))
+    monkeypatch.setenv('SENTIMENT_ONNX_AUTO_EXPORT', 'false')
+    monkeypatch.delenv('SENTIMENT_ONNX_THREADS', raising=False)
+    monkeypatch.delenv('SENTIMENT_MODEL_DIR', raising=False)
+    monkeypatch.setenv('FAKE_ORT_THREADS_FILE', str(threads_file))
+    return threads_file
+
+
+def _wait_ready(pool, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not pool.is_ready() and not pool.failures and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+
+def test_onnx_pool_starts_without_torch(tmp_path, monkeypatch):
+    threads_file = _stub_onnx_model(tmp_path, monkeypatch)
+
+    pool = InferencePool(num_processes=1, torch_threads=2, timeout=5.0)
+    pool.start()
+    try:
+        _wait_ready(pool)
+        assert pool.failures == []
+        assert pool.is_ready()
+        assert pool.model_version.endswith(':onnx:1')
+        # The process's thread share went to the ONNX Runtime session
+        assert threads_file.read_text() == '2'
+    finally:
+        pool.shutdown()
+
+
+def test_killed_process_is_replaced(tmp_path, monkeypatch):
+    _stub_onnx_model(tmp_path, monkeypatch)
+    monkeypatch.setattr(inference_worker, 'RESTART_INTERVAL_S', 0.0)
+
+    pool = InferencePool(num_processes=1, torch_threads=1, timeout=5.0)
+    pool.start()
+    try:
+        _wait_ready(pool)
+        assert pool.is_ready()
+        killed = pool._processes[0]
+        os.kill(killed.pid, signal.SIGKILL)
+        killed.join(timeout=10)
+        assert not pool.is_ready()
+        assert pool.get_stats()['dead'] == 1
+
+        # The results reader notices within a second and spawns a new process
+        _wait_ready(pool)
+        assert pool.is_ready()
+        assert pool._processes[0].pid != killed.pid
+        stats = pool.get_stats()
+        assert stats['restarts'] == 1
+        assert stats['dead'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_inference_child_skips_app_startup(tmp_path):
+    # What an inference process spawned under `python app.py` does when it re-imports app.py
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'test.db'}", **{CHILD_ENV: '1'})
+    env.pop('SENTIMENT_LOAD_BEFORE_FORK', None)
+    env.pop('SENTIMENT_PRELOAD_AFTER_FORK', None)
+    script = (
+        "import threading, app, ingest_jobs, key_point_enrichment\n"
+        "print('RUNNERS', ingest_jobs.ingest_runner._thread_pid, key_point_enrichment.key_point_enricher._thread_pid)\n"
+        "print('THREADS', sorted(t.name for t in threading.enumerate()))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, timeout=120
+    ).stdout
+    assert 'RUNNERS None None' in output
+    assert "THREADS ['MainThread']" in output
+    assert 'Model preloading started' not in output
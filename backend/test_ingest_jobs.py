@@ -0,0 +1,130 @@
+"""
+Tests for the ingest runner (ingest_jobs.py)
+
+Usage:
+    python -m pytest test_ingest_jobs.py
+"""
+import ingest_jobs
+from ingest_jobs import IngestRunner
+
+
+class MemoryStore:
+    """In-memory job queue; commit_chunk can be made to fail like a dropped connection"""
+
+    def __init__(self, job):
+        self.job = dict(job, status='queued', worker_id=None, rows_failed=0, error=None)
+        self.reviews = []
+        self.fail_commits = set()
+        self.commits = 0
+
+    def claim_job(self, worker_id, stale_after):
+        if self.job['status'] != 'queued':
+            return None
+        self.job.update(status='running', worker_id=worker_id)
+        return dict(self.job)
+
+    def _owned(self, job_id, worker_id):
+        return self.job['id'] == job_id and self.job['worker_id'] == worker_id and self.job['status'] == 'running'
+
+    def heartbeat(self, job_id, worker_id):
+        return self._owned(job_id, worker_id)
+
+    def commit_chunk(self, job_id, worker_id, rows, processed, failed):
+        self.commits += 1
+        if self.commits in self.fail_commits:
+            raise ConnectionError("server closed the connection unexpectedly")
+        if not self._owned(job_id, worker_id):
+            return False
+        self.reviews.extend(rows)
+        self.job['rows_processed'] += processed
+        self.job['rows_failed'] += failed
+        return True
+
+    def release_job(self, job_id, worker_id):
+        if self._owned(job_id, worker_id):
+            self.job.update(status='queued', worker_id=None)
+
+    def finish_job(self, job_id, worker_id, status, error=None):
+        if self.job['id'] == job_id and self.job['worker_id'] == worker_id:
+            self.job.update(status=status, error=error)
+
+
+def _fake_analyze_chunk(texts, key_points_mode='providers', provider_wait=30.0):
+    valid = [text for text in texts if text]
+    rows = [{'review_text': text, 'sentiment': 'neutral', 'key_points': None} for text in valid]
+    return rows, len(texts) - len(valid)
+
+
+def _runner(store, monkeypatch):
+    monkeypatch.setattr(ingest_jobs, 'analyze_chunk', _fake_analyze_chunk)
+    runner = IngestRunner(chunk_size=2, workers=1, max_inflight=1, poll_interval=0.01, keep_files=True)
+    runner.set_store(store)
+    runner.worker_id = 'worker-1'
+    runner._wait_for_model = lambda job: None
+    return runner
+
+
+def _write_jsonl(path, count):
+    path.write_text(''.join(f'{{"review_text": "review {i}"}}\n' for i in range(count)), encoding='utf-8')
+
+
+def test_job_resumes_after_failed_commit(tmp_path, monkeypatch):
+    path = tmp_path / 'reviews.jsonl'
+    _write_jsonl(path, 5)
+    store = MemoryStore({'id': 1, 'file_path': str(path), 'file_format': 'jsonl', 'text_field': None,
+                         'rows_processed': 0})
+    store.fail_commits = {2}
+    runner = _runner(store, monkeypatch)
+
+    runner._run(runner._store.claim_job(runner.worker_id, 300))
+    # Back in the queue after the first committed chunk, not failed
+    assert store.job['status'] == 'queued'
+    assert store.job['rows_processed'] == 2
+
+    runner._run(runner._store.claim_job(runner.worker_id, 300))
+    assert store.job['status'] == 'completed'
+    assert store.job['rows_processed'] == 5
+    assert [row['review_text'] for row in store.reviews] == [f'review {i}' for i in range(5)]
+
+
+def test_failed_completion_is_retried_not_fatal(tmp_path, monkeypatch):
+    path = tmp_path / 'reviews.jsonl'
+    _write_jsonl(path, 2)
+    store = MemoryStore({'id': 1, 'file_path': str(path), 'file_format': 'jsonl', 'text_field': None,
+                         'rows_processed': 0})
+    runner = _runner(store, monkeypatch)
+    finish_job = store.finish_job
+
+    def failing_finish(*args, **kwargs):
+        raise ConnectionError("server closed the connection unexpectedly")
+
+    store.finish_job = failing_finish
+    runner._run(store.claim_job(runner.worker_id, 300))
+    assert store.job['status'] == 'queued'
+    assert runner.current_job is None
+
+    store.finish_job = finish_job
+    runner._run(store.claim_job(runner.worker_id, 300))
+    assert store.job['status'] == 'completed'
+    assert len(store.reviews) == 2
+
+
+def test_malformed_file_fails_the_job(tmp_path, monkeypatch):
+    path = tmp_path / 'reviews.csv'
+    path.write_text('id,rating\n1,5\n', encoding='utf-8')
+    store = MemoryStore({'id': 1, 'file_path': str(path), 'file_format': 'csv', 'text_field': None,
+                         'rows_processed': 0})
+    runner = _runner(store, monkeypatch)
+
+    runner._run(store.claim_job(runner.worker_id, 300))
+    assert store.job['status'] == 'failed'
+    assert 'Kolom review' in store.job['error']
+
+
+def test_missing_file_fails_the_job(tmp_path, monkeypatch):
+    store = MemoryStore({'id': 1, 'file_path': str(tmp_path / 'missing.jsonl'), 'file_format': 'jsonl',
+                         'text_field': None, 'rows_processed': 0})
+    runner = _runner(store, monkeypatch)
+
+    runner._run(store.claim_job(runner.worker_id, 300))
+    assert store.job['status'] == 'failed'
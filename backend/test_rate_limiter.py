@@ -0,0 +1,69 @@
+"""
+Tests for the provider token buckets (rate_limiter.py)
+
+Usage:
+    python -m pytest test_rate_limiter.py
+"""
+import threading
+import time
+
+from rate_limiter import ProviderRateLimiter
+
+
+class SlowStore:
+    """In-memory store whose sync() can be held up like a slow database"""
+
+    def __init__(self):
+        self.tokens = {}
+        self.release = threading.Event()
+        self.release.set()
+        self.entered = threading.Event()
+
+    def sync(self, key, capacity, refill_per_second, consumed, now):
+        self.entered.set()
+        self.release.wait(10)
+        tokens = self.tokens.get(key, capacity) - consumed
+        self.tokens[key] = tokens
+        return tokens
+
+
+def _limiter(store):
+    limiter = ProviderRateLimiter(limits={'groq': {'rpm': 60, 'rpd': 0}}, sync_interval=3600)
+    limiter.set_store(store)
+    # No background sync thread; the test syncs by hand
+    limiter._ensure_sync_thread = lambda: None
+    return limiter
+
+
+def test_acquire_does_not_wait_for_store_sync():
+    store = SlowStore()
+    limiter = _limiter(store)
+    assert limiter.try_acquire('groq')
+
+    store.release.clear()
+    store.entered.clear()
+    syncing = threading.Thread(target=limiter.sync)
+    syncing.start()
+    try:
+        assert store.entered.wait(5)
+        start = time.monotonic()
+        assert limiter.try_acquire('groq')
+        assert limiter.has_capacity('groq')
+        limiter.get_state()
+        assert time.monotonic() - start < 1.0
+    finally:
+        store.release.set()
+        syncing.join(5)
+
+    # The token taken during the sync is pushed by the next one, not lost or doubled
+    limiter.sync()
+    assert store.tokens['groq:minute'] == 58
+    assert limiter._buckets['groq:minute'].unsynced == 0
+
+
+def test_first_use_loads_stored_state():
+    store = SlowStore()
+    store.tokens['groq:minute'] = 0.5
+    limiter = _limiter(store)
+    assert not limiter.has_capacity('groq')
+    assert not limiter.try_acquire('groq')
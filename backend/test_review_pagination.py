@@ -0,0 +1,108 @@
+"""
+Tests for keyset pagination of /api/reviews (review_pagination.py)
+
+Usage:
+    python -m pytest test_review_pagination.py
+"""
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, select
+
+from review_pagination import (
+    UNKNOWN_CREATED_AT, backfill_created_at, decode_cursor, encode_cursor, page_conditions, page_order, split_page
+)
+
+metadata = MetaData()
+# The review table as it was before created_at became NOT NULL
+review = Table(
+    'review', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('sentiment', String(20), nullable=False),
+    Column('created_at', DateTime),
+)
+
+
+def _raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _all_pages(conn, limit, sentiment=None):
+    seen = []
+    after = None
+    while True:
+        rows = conn.execute(
+            select(review).where(*page_conditions(review.c, sentiment, after=after))
+            .order_by(*page_order(review.c)).limit(limit + 1)
+        ).all()
+        rows, cursor = split_page(rows, limit)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            return seen
+        after = decode_cursor(cursor)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 1, 15, 10, 30, 0, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+@pytest.mark.parametrize('cursor', [
+    _raw_cursor([None, 1]),
+    _raw_cursor(['2024-01-15T10:30:00', None]),
+    _raw_cursor(['2024-01-15T10:30:00']),
+    _raw_cursor({'created_at': '2024-01-15'}),
+    _raw_cursor(['kemarin', 1]),
+    'bukan-cursor!',
+    '',
+])
+def test_malformed_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_ties_and_backfilled_rows_once():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    tie = datetime(2024, 1, 15, 10, 30)
+    with engine.begin() as conn:
+        conn.execute(insert(review), [
+            {'id': 1, 'sentiment': 'positive', 'created_at': None},
+            {'id': 2, 'sentiment': 'negative', 'created_at': tie},
+            {'id': 3, 'sentiment': 'positive', 'created_at': tie},
+            {'id': 4, 'sentiment': 'positive', 'created_at': tie},
+            {'id': 5, 'sentiment': 'negative', 'created_at': None},
+            {'id': 6, 'sentiment': 'positive', 'created_at': datetime(2024, 2, 1)},
+        ])
+        assert backfill_created_at(conn, review) == 2
+        assert conn.execute(select(review.c.created_at).where(review.c.id == 1)).scalar() == UNKNOWN_CREATED_AT
+
+        # Newest first, ties by id descending, backfilled rows last
+        for limit in (1, 2, 4, 10):
+            assert _all_pages(conn, limit) == [6, 4, 3, 2, 5, 1]
+        assert _all_pages(conn, 1, sentiment='positive') == [6, 4, 3, 1]
+
+
+def test_bad_cursor_is_rejected_by_the_endpoint(backend_app):
+    response = backend_app.app.test_client().get('/api/reviews', query_string={'cursor': _raw_cursor([None, 1])})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'cursor tidak valid'
+
+
+def test_legacy_clients_get_a_bare_list(backend_app):
+    client = backend_app.app.test_client()
+    with backend_app.app.app_context():
+        backend_app.db.session.add_all([
+            backend_app.Review(review_text=f'review {i}', sentiment='positive') for i in range(3)
+        ])
+        backend_app.db.session.commit()
+
+    legacy = client.get('/api/reviews')
+    assert legacy.headers['Deprecation'] == 'true'
+    assert [review['review_text'] for review in legacy.get_json()] == ['review 2', 'review 1', 'review 0']
+
+    page = client.get('/api/reviews', query_string={'limit': 2}).get_json()
+    assert [review['review_text'] for review in page['reviews']] == ['review 2', 'review 1']
+    assert page['next_cursor'] is not None
@@ -0,0 +1,168 @@
+"""
+Offline extractive key point provider (TextRank).
+
+A review is split into clauses, every clause becomes a TF-IDF vector over
+hashed tokens, and PageRank over the clauses' cosine similarity graph ranks
+them. The top clauses, shortened to a few words, are the key points. Nothing
+leaves the process: it's the provider that still works without network access
+or quota, ahead of the keyword heuristic in extract_key_points_simple.
+
+In batch mode the IDF comes from the whole batch, which gives better weights
+than the handful of clauses in a single review.
+"""
+import re
+import zlib
+
+import numpy as np
+
+# Token hash space; collisions only merge the weights of rare tokens
+HASH_DIM = 1 << 18
+
+STOPWORDS = frozenset([
+    # Indonesian
+    'yang', 'dan', 'di', 'ke', 'dari', 'ini', 'itu', 'saya', 'aku', 'gue', 'kami', 'kita', 'untuk',
+    'dengan', 'ada', 'juga', 'sangat', 'sekali', 'banget', 'sih', 'ya', 'nya', 'jadi', 'karena',
+    'tapi', 'namun', 'atau', 'pada', 'akan', 'sudah', 'udah', 'lagi', 'aja', 'saja', 'kok', 'deh',
+    'dong', 'nih', 'kak', 'gan', 'yg', 'dgn', 'utk', 'tp', 'dr', 'krn', 'pun', 'masih', 'bisa',
+    # English
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'it', 'its', 'this', 'that', 'and',
+    'or', 'but', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'i', 'my', 'me', 'we', 'our', 'you',
+    'very', 'so', 'too', 'really', 'just', 'have', 'has', 'had', 'do', 'does', 'did', 'as', 'they'
+])
+
+# Clause boundaries: sentence punctuation, commas and contrast words
+CLAUSE_SPLIT = re.compile(r'[.!?;\n]+|,\s+|\s+(?:tapi|namun|padahal|sedangkan|but|however|although)\s+', re.IGNORECASE)
+TOKEN = re.compile(r'\w+', re.UNICODE)
+# Dropped from the start of a point
+LEADING_FILLERS = re.compile(r'^(?:(?:dan|tapi|namun|terus|trus|lalu|juga|and|but|also|so)\s+)+', re.IGNORECASE)
+
+_bucket_cache = {}
+
+
+def _bucket(token):
+    bucket = _bucket_cache.get(token)
+    if bucket is None:
+        if len(_bucket_cache) > 200000:
+            _bucket_cache.clear()
+        bucket = _bucket_cache[token] = zlib.crc32(token.encode('utf-8')) & (HASH_DIM - 1)
+    return bucket
+
+
+class TextRankExtractor:
+    def __init__(self, damping=0.85, min_points=3, max_points=5, max_words=10, min_tokens=2,
+                 redundancy=0.8):
+        self.damping = damping
+        self.min_points = min_points
+        self.max_points = max_points
+        self.max_words = max_words
+        # Clauses with fewer content tokens aren't ranked
+        self.min_tokens = min_tokens
+        # A clause this similar to one already picked is skipped
+        self.redundancy = redundancy
+
+    def _clauses(self, text):
+        """Returns: [(clause, [token bucket, ...]), ...] for the clauses worth ranking"""
+        clauses = []
+        for clause in CLAUSE_SPLIT.split(text):
+            clause = clause.strip(' \t-•*"\'')
+            if not clause:
+                continue
+            buckets = [_bucket(t) for t in TOKEN.findall(clause.lower()) if t not in STOPWORDS and not t.isdigit()]
+            if len(buckets) >= self.min_tokens:
+                clauses.append((clause, buckets))
+        return clauses
+
+    def _rank(self, clauses, idf=None):
+        """
+        idf: HASH_DIM array over a batch (extract_many), or None to weight by
+             the review's own clauses
+        Returns: (PageRank score per clause, clause cosine similarity matrix)
+        """
+        n = len(clauses)
+        vocab = {}
+        rows, cols = [], []
+        for i, (_, buckets) in enumerate(clauses):
+            for bucket in buckets:
+                rows.append(i)
+                cols.append(vocab.setdefault(bucket, len(vocab)))
+        tf = np.zeros((n, len(vocab)))
+        np.add.at(tf, (rows, cols), 1.0)
+
+        if idf is None:
+            df = np.count_nonzero(tf, axis=0)
+            weights = np.log((1.0 + n) / (1.0 + df)) + 1.0
+        else:
+            weights = idf[np.fromiter(vocab, dtype=np.int64, count=len(vocab))]
+        vectors = tf * weights
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0.0)
+        out_weight = similarity.sum(axis=1, keepdims=True)
+        # Clauses sharing no token with any other link to all of them evenly
+        transition = np.where(out_weight > 0, similarity / np.where(out_weight > 0, out_weight, 1.0), 1.0 / n)
+        # PageRank fixed point r = (1 - d) / n + d * T^T r, solved directly (n is small)
+        scores = np.linalg.solve(np.eye(n) - self.damping * transition.T, np.full(n, (1.0 - self.damping) / n))
+        return scores, similarity
+
+    def _point(self, clause):
+        clause = re.sub(r'\s*\([^)]*\)', '', clause)
+        clause = LEADING_FILLERS.sub('', clause).strip()
+        words = clause.split()
+        if len(words) > self.max_words:
+            words = words[:self.max_words]
+        point = ' '.join(words).rstrip(',:;-')
+        return point[:1].upper() + point[1:]
+
+    def _summarize(self, clauses, idf=None):
+        if len(clauses) < 2:
+            return None
+        scores, similarity = self._rank(clauses, idf)
+        order = [int(i) for i in np.argsort(-scores, kind='stable')]
+
+        picked = []
+        for i in order:
+            if len(picked) >= self.max_points:
+                break
+            if not any(similarity[i, j] >= self.redundancy for j in picked):
+                picked.append(i)
+        # Don't let the redundancy check drop below min_points when there are enough clauses
+        for i in order:
+            if len(picked) >= self.min_points:
+                break
+            if i not in picked:
+                picked.append(i)
+
+        points = []
+        # Points keep the review's order
+        for i in sorted(picked):
+            point = self._point(clauses[i][0])
+            if point and point not in points:
+                points.append(point)
+        return "\n".join(f"• {point}" for point in points) if points else None
+
+    def extract(self, text):
+        """
+        Returns: 3-5 "• point" lines (2 when the review only has two clauses),
+                 or None when the review is too short to rank
+        """
+        return self._summarize(self._clauses(text or ''))
+
+    def extract_many(self, texts):
+        """
+        Batch variant of extract with the IDF taken from the whole batch.
+        Returns: key points per review, None where it's too short to rank
+        """
+        parsed = [self._clauses(text or '') for text in texts]
+        if not parsed:
+            return []
+        df = np.zeros(HASH_DIM)
+        for clauses in parsed:
+            buckets = {bucket for _, clause_buckets in clauses for bucket in clause_buckets}
+            if buckets:
+                df[np.fromiter(buckets, dtype=np.int64, count=len(buckets))] += 1.0
+        idf = np.log((1.0 + len(parsed)) / (1.0 + df)) + 1.0
+        return [self._summarize(clauses, idf) for clauses in parsed]
+
+
+textrank = TextRankExtractor()
@@ -57,6 +57,8 @@ const getApiBaseUrl = () => {
 };
 
 const API_BASE_URL = getApiBaseUrl();
+// Reviews per page of GET /reviews (sending limit selects the paged response)
+const REVIEWS_PAGE_SIZE = 50;
 
 // Debug log
 console.log('[API] API_BASE_URL:', API_BASE_URL);
@@ -76,6 +78,9 @@ function AppContent() {
   const [mobileMenuOpen, setMobileMenuOpen] = useState(false);
   const [deletingId, setDeletingId] = useState(null);
   const [deleteConfirm, setDeleteConfirm] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [sentimentFilter, setSentimentFilter] = useState('');
   
   const [emblaRef, emblaApi] = useEmblaCarousel({ 
     loop: true,
@@ -85,7 +90,7 @@ function AppContent() {
 
   useEffect(() => {
     fetchReviews();
-  }, []);
+  }, [sentimentFilter]);
 
   useEffect(() => {
     if (emblaApi && allReviews.length > 0) {
@@ -101,12 +106,47 @@ function AppContent() {
     }
   }, [emblaApi, allReviews]);
 
+  useEffect(() => {
+    // Deferred key points: poll the review until the backend has filled them in
+    if (!recentReview?.id || recentReview.key_points_status !== 'pending') {
+      return;
+    }
+    const poll = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${API_BASE_URL}/reviews/${recentReview.id}`);
+        if (response.data && !response.data.error) {
+          setRecentReview((current) => (current && current.id === response.data.id ? { ...current, ...response.data } : current));
+          if (response.data.key_points_status !== 'pending') {
+            setAllReviews((reviews) => reviews.map((review) => (review.id === response.data.id ? response.data : review)));
+          }
+        }
+      } catch (err) {
+        console.error('Error polling review:', err);
+      }
+    }, 1500);
+
+    return () => clearTimeout(poll);
+  }, [recentReview]);
+
+  const reviewsParams = (cursor) => {
+    const params = { limit: REVIEWS_PAGE_SIZE };
+    if (sentimentFilter) {
+      params.sentiment = sentimentFilter;
+    }
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    return params;
+  };
+
   const fetchReviews = async () => {
     setLoadingReviews(true);
     setError(null);
     try {
-      const response = await axios.get(`${API_BASE_URL}/reviews`);
-      setAllReviews(response.data);
+      // First page only; older reviews are loaded on demand with the cursor
+      const response = await axios.get(`${API_BASE_URL}/reviews`, { params: reviewsParams() });
+      setAllReviews(response.data.reviews || []);
+      setNextCursor(response.data.next_cursor || null);
     } catch (err) {
       console.error('Error fetching reviews:', err);
       if (err.code === 'ECONNREFUSED' || err.message?.includes('ECONNREFUSED') || !err.response) {
@@ -120,6 +160,26 @@ function AppContent() {
     }
   };
 
+  const loadMoreReviews = async () => {
+    if (!nextCursor) {
+      return;
+    }
+    setLoadingMore(true);
+    setError(null);
+    try {
+      const response = await axios.get(`${API_BASE_URL}/reviews`, { params: reviewsParams(nextCursor) });
+      const loadedIds = new Set(allReviews.map((review) => review.id));
+      setAllReviews([...allReviews, ...(response.data.reviews || []).filter((review) => !loadedIds.has(review.id))]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (err) {
+      console.error('Error loading more reviews:', err);
+      const errorMessage = err.response?.data?.error || err.message || 'Gagal memuat review';
+      setError(`Gagal memuat review: ${errorMessage}`);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDeleteReview = async (reviewId) => {
     setDeletingId(reviewId);
     setError(null);
@@ -160,7 +220,10 @@ function AppContent() {
 
       setRecentReview(response.data);
       setReviewText('');
-      fetchReviews();
+      // The new review is the newest one: put it on top instead of reloading the list
+      if (response.data.id && (!sentimentFilter || response.data.sentiment === sentimentFilter)) {
+        setAllReviews((reviews) => [response.data, ...reviews.filter((review) => review.id !== response.data.id)]);
+      }
     } catch (err) {
       console.error('Error analyzing review:', err);
       if (err.code === 'ECONNREFUSED' || err.message?.includes('ECONNREFUSED') || !err.response) {
@@ -656,6 +719,12 @@ function AppContent() {
                             </div>
                           </div>
 
+                          {recentReview.key_points_status === 'pending' && (
+                            <div className="text-sm sm:text-base text-gray-500 dark:text-gray-400">
+                              Poin penting sedang diproses...
+                            </div>
+                          )}
+
                           {recentReview.key_points && (
                             <div>
                               <h4 className="text-sm sm:text-base font-semibold mb-2 sm:mb-3 text-gray-900 dark:text-gray-100">
@@ -687,22 +756,35 @@ function AppContent() {
                     Semua Review
                   </CardTitle>
                   <CardDescription className="mt-1 text-sm text-gray-600 dark:text-gray-400">
-                    Total {allReviews.length} review
+                    {allReviews.length} review ditampilkan
                   </CardDescription>
                 </div>
-                <Button
-                  variant="outline"
-                  size="icon"
-                  onClick={fetchReviews}
-                  disabled={loadingReviews}
-                  className="border-gray-300 dark:border-gray-700 hover:bg-gray-100 dark:hover:bg-gray-800 self-start sm:self-auto"
-                  aria-label="Refresh reviews"
-                >
-                  <RefreshCw className={cn(
-                    "h-4 w-4 sm:h-5 sm:w-5",
-                    loadingReviews && "animate-spin"
-                  )} />
-                </Button>
+                <div className="flex items-center gap-2 self-start sm:self-auto">
+                  <select
+                    value={sentimentFilter}
+                    onChange={(e) => setSentimentFilter(e.target.value)}
+                    className="h-9 sm:h-10 rounded-md border border-gray-300 dark:border-gray-700 bg-white dark:bg-gray-900 px-3 text-sm text-gray-700 dark:text-gray-300"
+                    aria-label="Filter sentimen"
+                  >
+                    <option value="">Semua sentimen</option>
+                    <option value="positive">Positif</option>
+                    <option value="negative">Negatif</option>
+                    <option value="neutral">Netral</option>
+                  </select>
+                  <Button
+                    variant="outline"
+                    size="icon"
+                    onClick={fetchReviews}
+                    disabled={loadingReviews}
+                    className="border-gray-300 dark:border-gray-700 hover:bg-gray-100 dark:hover:bg-gray-800"
+                    aria-label="Refresh reviews"
+                  >
+                    <RefreshCw className={cn(
+                      "h-4 w-4 sm:h-5 sm:w-5",
+                      loadingReviews && "animate-spin"
+                    )} />
+                  </Button>
+                </div>
               </div>
               <CardContent>
                 {loadingReviews ? (
@@ -786,6 +868,19 @@ function AppContent() {
                         </motion.div>
                       ))}
                     </AnimatePresence>
+                    {nextCursor && (
+                      <div className="flex justify-center pt-2">
+                        <Button
+                          variant="outline"
+                          onClick={loadMoreReviews}
+                          disabled={loadingMore}
+                          className="border-gray-300 dark:border-gray-700 hover:bg-gray-100 dark:hover:bg-gray-800"
+                        >
+                          {loadingMore && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+                          Muat lebih banyak
+                        </Button>
+                      </div>
+                    )}
                   </div>
                 )}
               </CardContent>